@@ -0,0 +1,291 @@
+# benchmarks/load.py
+"""
+In-process load test of the whole API.
+
+Builds the app with create_app() against a temporary SQLite file (or any
+--database-url, e.g. a local Postgres -- its tables are dropped), seeds a
+synthetic group (benchmarks/synthetic.py) and drives each scenario from
+--concurrency threads, each with its own test client. Every request takes
+the full path (hooks, JWT, validation, SQL, serialization) without a
+network in between, so differences come from the code and the database.
+
+Scenarios:
+  login-storm        members logging in at once
+  contribution-day   members recording contributions and checking them
+  admin-lists        an admin paging through the list views
+
+Throughput and p50/p95/p99 per endpoint are compared with a committed
+baseline (benchmarks/baselines/load-<dialect>.json); a p95 or throughput
+more than --tolerance worse is reported as a regression. Baselines are only
+comparable on the machine that recorded them: re-record before a change,
+then measure after it.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --members 2000 --concurrency 16 --check
+    python -m benchmarks.load --save-baseline
+    python -m benchmarks.load --database-url postgresql://localhost/chama_bench --set USER_CACHE_TTL=30
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from flask_jwt_extended import create_access_token
+
+from benchmarks import synthetic
+from server.app import create_app
+from server.db_pool import engine_options
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+# ----------------- Scenarios -----------------
+# Each takes (ctx, rng, i) and returns (label, method, path, json body, headers)
+def login_storm(ctx, rng, i):
+    member_id = rng.choice(ctx["members"])
+    body = {"email": synthetic.member_email(member_id), "password": synthetic.PASSWORD}
+    return "POST /auth/login", "POST", "/auth/login", body, None
+
+
+def contribution_day(ctx, rng, i):
+    member_id = rng.choice(ctx["members"])
+    headers = ctx["tokens"][member_id]
+    roll = rng.random()
+    if roll < 0.6:
+        body = {"payname": "contribution", "amount": str(rng.randrange(100, 5000)),
+                "method": "mpesa", "receipt": f"CD{ctx['run']}{i:08d}"}
+        return "POST /payments", "POST", "/payments", body, headers
+    if roll < 0.85:
+        return "GET /payments/me", "GET", "/payments/me", None, headers
+    return "GET /member/summary", "GET", "/member/summary", None, headers
+
+
+ADMIN_LISTS = (
+    ("GET /payments/all", "/payments/all?limit=50"),
+    ("GET /loans", "/loans?per_page=25"),
+    ("GET /admin/users", "/admin/users"),
+    ("GET /admin/shares", "/admin/shares"),
+    ("GET /admin/ledger", "/admin/ledger"),
+)
+
+
+def admin_lists(ctx, rng, i):
+    label, path = ADMIN_LISTS[i % len(ADMIN_LISTS)]
+    return label, "GET", path, None, ctx["admin"]
+
+
+# name -> (request factory, default number of requests)
+SCENARIOS = {
+    "login-storm": (login_storm, 100),
+    "contribution-day": (contribution_day, 600),
+    "admin-lists": (admin_lists, 300),
+}
+
+
+# ----------------- Running -----------------
+def run_scenario(app, ctx, make_request, requests, concurrency, warmup, seed):
+    """[(label, status, seconds)] for `requests` requests over `concurrency` threads, and the wall time."""
+    results = []
+    results_lock = threading.Lock()
+    counter = itertools.count()
+
+    def worker(number):
+        client = app.test_client()
+        rng = random.Random(seed * 1000 + number)
+        own = []
+        while True:
+            i = next(counter)
+            if i >= warmup + requests:
+                break
+            label, method, path, body, headers = make_request(ctx, rng, i)
+            start = time.perf_counter()
+            response = client.open(path, method=method, json=body, headers=headers)
+            response.get_data()
+            if i >= warmup:
+                own.append((label, response.status_code, time.perf_counter() - start))
+        with results_lock:
+            results.extend(own)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def summarize(results, wall_seconds):
+    by_label = defaultdict(list)
+    errors = defaultdict(int)
+    for label, status, seconds in results:
+        by_label[label].append(seconds * 1000)
+        if status >= 400:
+            errors[label] += 1
+    summary = {}
+    for label, latencies in sorted(by_label.items()):
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0]
+        summary[label] = {
+            "requests": len(latencies),
+            "errors": errors[label],
+            "rps": round(len(latencies) / wall_seconds, 1),
+            "p50_ms": round(p50, 2),
+            "p95_ms": round(p95, 2),
+            "p99_ms": round(p99, 2),
+        }
+    return summary
+
+
+def compare(current, baseline, tolerance):
+    """{key: [regression messages]} for endpoints slower or less productive than the baseline."""
+    regressions = {}
+    for key, now in current.items():
+        then = baseline.get(key)
+        if not then:
+            continue
+        problems = []
+        if now["p95_ms"] > then["p95_ms"] * (1 + tolerance):
+            problems.append(f"p95 {then['p95_ms']} -> {now['p95_ms']} ms")
+        if now["rps"] < then["rps"] * (1 - tolerance):
+            problems.append(f"throughput {then['rps']} -> {now['rps']} req/s")
+        if now["errors"] > then["errors"]:
+            problems.append(f"errors {then['errors']} -> {now['errors']}")
+        if problems:
+            regressions[key] = problems
+    return regressions
+
+
+def _delta(now, then):
+    return f"{(now - then) / then * 100:+.0f}%" if then else "n/a"
+
+
+def print_report(current, baseline, regressions):
+    print(f"{'scenario / endpoint':<40} {'n':>5} {'err':>4} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+          f" {'p95 vs base':>12} {'req/s vs base':>14}")
+    for key, row in current.items():
+        then = baseline.get(key)
+        p95_delta = _delta(row["p95_ms"], then["p95_ms"]) if then else "new"
+        rps_delta = _delta(row["rps"], then["rps"]) if then else "new"
+        flag = "  REGRESSION" if key in regressions else ""
+        print(f"{key:<40} {row['requests']:>5} {row['errors']:>4} {row['rps']:>8.1f} {row['p50_ms']:>8.2f}"
+              f" {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {p95_delta:>12} {rps_delta:>14}{flag}")
+    for key, problems in regressions.items():
+        print(f"regression in {key}: {', '.join(problems)}")
+
+
+def _setting(item):
+    key, _, value = item.partition("=")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def build_app(database_url, concurrency, overrides):
+    config = {
+        "SQLALCHEMY_DATABASE_URI": database_url,
+        # a pool sized like a gunicorn worker with one thread per concurrent client
+        "SQLALCHEMY_ENGINE_OPTIONS": engine_options(database_url, {**os.environ, "GUNICORN_THREADS": str(concurrency)}),
+        "QUERY_BUDGET_MODE": "off",
+        "RATE_LIMIT_ENABLED": False,  # every client shares one IP here
+        "MAIL_SUPPRESS_SEND": True,
+        "MAIL_OUTBOX_AUTOSTART": False,
+    }
+    config.update(overrides)
+    return create_app(config, env="production")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", help="default: a temporary SQLite file (other databases are dropped and reseeded)")
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--payments-per-member", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, help="requests per scenario (default: per scenario)")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        help="config override (value parsed as JSON when possible); repeatable")
+    parser.add_argument("--baseline", help="default: benchmarks/baselines/load-<dialect>.json")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 when a regression is found")
+    args = parser.parse_args()
+
+    temp_path = None
+    database_url = args.database_url
+    if not database_url:
+        fd, temp_path = tempfile.mkstemp(suffix=".db", prefix="chama-load-")
+        os.close(fd)
+        database_url = f"sqlite:///{temp_path}"
+
+    try:
+        app = build_app(database_url, args.concurrency, dict(map(_setting, args.overrides)))
+        with app.app_context():
+            start = time.perf_counter()
+            counts = synthetic.seed_database(args.members, args.payments_per_member, seed=args.seed)
+            print(f"seeded {', '.join(f'{n} {t}' for t, n in counts.items())} in {time.perf_counter() - start:.1f}s")
+            members = list(range(2, args.members + 2))
+            ctx = {
+                "members": members,
+                "tokens": {m: {"Authorization": "Bearer " + create_access_token(
+                    identity=str(m), additional_claims={"role": "member"})} for m in members},
+                "admin": {"Authorization": "Bearer " + create_access_token(
+                    identity="1", additional_claims={"role": "admin"})},
+                "run": os.getpid() % 10000,
+            }
+            dialect = app.extensions["sqlalchemy"].engine.dialect.name
+
+        current = {}
+        for name in args.scenarios:
+            make_request, default_requests = SCENARIOS[name]
+            results, wall = run_scenario(app, ctx, make_request, args.requests or default_requests,
+                                         args.concurrency, args.warmup, args.seed)
+            for label, row in summarize(results, wall).items():
+                current[f"{name} {label}"] = row
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"load-{dialect}.json")
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as fh:
+            baseline = json.load(fh)["results"]
+    regressions = compare(current, baseline, args.tolerance)
+    print(f"{dialect}, {args.members} members, concurrency {args.concurrency}, "
+          f"baseline {os.path.relpath(baseline_path) if baseline else 'none'}")
+    print_report(current, baseline, regressions)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        meta = {
+            "recorded": time.strftime("%Y-%m-%d"),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+            "members": args.members,
+            "payments_per_member": args.payments_per_member,
+            "concurrency": args.concurrency,
+        }
+        with open(baseline_path, "w") as fh:
+            json.dump({"meta": meta, "results": current}, fh, indent=2)
+            fh.write("\n")
+        print(f"baseline written to {os.path.relpath(baseline_path)}")
+    if args.check and regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/password_hashing.py
+"""
+Login throughput at different password hashing settings.
+
+Simulates a burst of concurrent logins (one thread per in-flight request,
+like gunicorn gthread workers) verifying a password with each method and
+pool size, and reports verifications per second and latency.
+
+    python -m benchmarks.password_hashing
+    python -m benchmarks.password_hashing --methods scrypt pbkdf2:sha256:600000 --workers 0 2 4
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from server.passwords import PasswordHasher
+
+DEFAULT_METHODS = ["scrypt", "scrypt:16384:8:1", "pbkdf2:sha256:600000", "pbkdf2:sha256:260000"]
+
+
+def run(method, workers, logins, concurrency):
+    hasher = PasswordHasher(method=method, workers=workers, max_pending=concurrency, timeout=120)
+    stored = hasher.hash("correct horse")  # also warms the pool
+    latencies = []
+
+    def login(_):
+        start = time.perf_counter()
+        assert hasher.verify(stored, "correct horse")
+        latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        list(clients.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+
+    latencies.sort()
+    return {
+        "method": hasher.method,
+        "workers": workers,
+        "logins_per_s": logins / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS)
+    parser.add_argument("--workers", nargs="+", type=int, default=[0, 2, 4])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'method':<24} {'workers':>7} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for method in args.methods:
+        for workers in args.workers:
+            r = run(method, workers, args.logins, args.concurrency)
+            print(f"{r['method']:<24} {r['workers']:>7} {r['logins_per_s']:>10.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
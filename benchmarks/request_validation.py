@@ -0,0 +1,69 @@
+# benchmarks/request_validation.py
+"""
+Request parsing cost: reqparse vs the precompiled Schema.
+
+Both validate the same loan application body inside one request context
+(as a handler would), including the range checks the routes used to do by
+hand after parse_args().
+
+    python -m benchmarks.request_validation
+    python -m benchmarks.request_validation --iterations 50000
+"""
+import argparse
+import time
+
+from flask import Flask
+from flask_restful import reqparse
+
+from server.routes.Loan_routes import loan_schema
+
+BODY = {"amount": 25000, "interest": 0.12, "year": 3, "monthrepay": 830.36}
+
+loan_parser = reqparse.RequestParser()
+loan_parser.add_argument("amount", type=float, required=True, help="Loan amount is required")
+loan_parser.add_argument("interest", type=float, required=False, default=0.08)
+loan_parser.add_argument("year", type=int, required=True, help="Loan year is required")
+loan_parser.add_argument("monthrepay", type=float, required=False)
+
+
+def with_reqparse():
+    data = loan_parser.parse_args()
+    if data["amount"] <= 0:
+        return None
+    if not (0 <= data["interest"] <= 5):
+        return None
+    if data["year"] <= 0 or data["year"] > 50:
+        return None
+    if data["monthrepay"] is not None and data["monthrepay"] <= 0:
+        return None
+    return data
+
+
+def with_schema():
+    return loan_schema.parse()
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    with app.test_request_context("/loans/apply", method="POST", json=BODY):
+        assert dict(with_reqparse()) == with_schema()
+        old = timed(with_reqparse, args.iterations)
+        new = timed(with_schema, args.iterations)
+
+    print(f"{'reqparse + manual checks':<26} {old * 1e6:8.2f} us/request")
+    print(f"{'Schema.parse':<26} {new * 1e6:8.2f} us/request   ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/serialization.py
+"""
+Encoding cost of a large list response.
+
+Builds N payment-shaped rows (as projected Row-like tuples) and times the old
+path (dict comprehension with per-value Decimal checks + stdlib json) against
+the compiled serializer + server.serialization.dumps.
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 20000 --repeat 10
+"""
+import argparse
+import json
+import time
+from collections import namedtuple
+from decimal import Decimal
+
+from server.serialization import dumps, orjson, rows_serializer
+
+PaymentRow = namedtuple(
+    "PaymentRow", "paymentId memberId firstname payname amount method receipt"
+)
+
+
+def make_rows(n):
+    return [
+        PaymentRow(i, i % 500 + 1, f"Member{i % 500}", "contribution",
+                   Decimal(f"{i % 100000}.{i % 100:02d}"), "mpesa", f"RCPT{i:08d}")
+        for i in range(1, n + 1)
+    ]
+
+
+def baseline(rows):
+    out = [
+        {k: float(v) if isinstance(v, Decimal) else v for k, v in row._asdict().items()}
+        for row in rows
+    ]
+    return json.dumps({"payments": out}).encode("utf-8")
+
+
+def compiled(rows):
+    serialize = rows_serializer(rows)
+    return dumps({"payments": [serialize(row) for row in rows]})
+
+
+def best_of(fn, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    assert json.loads(baseline(rows)) == json.loads(compiled(rows))
+
+    old = best_of(baseline, rows, args.repeat)
+    new = best_of(compiled, rows, args.repeat)
+    print(f"encoder: {'orjson' if orjson else 'json (orjson not installed)'}, rows: {args.rows}")
+    print(f"{'stdlib to_dict + json':<26} {old * 1000:8.2f} ms")
+    print(f"{'compiled + dumps':<26} {new * 1000:8.2f} ms   ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
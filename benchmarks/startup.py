@@ -0,0 +1,141 @@
+# benchmarks/startup.py
+"""
+Worker start-up cost and what warm-up saves.
+
+Each run is a fresh Python process (so imports are cold) that imports the
+app, builds it with create_app(), optionally runs server.warmup.warm() as
+gunicorn's post_worker_init does, then times its first requests: an admin
+list view (first database connection) and a login (first password hash,
+which spawns the hashing processes). Medians over --repeat runs.
+
+With --gunicorn it also boots gunicorn.conf.py with and without
+preload_app and times how long until the first response is served.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5 --gunicorn
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEMBERS = 50
+
+
+def child(database_url, warm):
+    """One cold start in this process; prints its timings as JSON."""
+    timings = {}
+    start = time.perf_counter()
+    from server.app import create_app
+    timings["import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app = create_app({"SQLALCHEMY_DATABASE_URI": database_url, "MAIL_OUTBOX_AUTOSTART": False,
+                      "QUERY_BUDGET_MODE": "off"}, env="production")
+    timings["create_app"] = time.perf_counter() - start
+
+    if warm:
+        from server.warmup import warm as warm_app
+        start = time.perf_counter()
+        warm_app(app)
+        timings["warm"] = time.perf_counter() - start
+
+    from flask_jwt_extended import create_access_token
+    from benchmarks.synthetic import PASSWORD, member_email
+    with app.app_context():
+        admin = {"Authorization": "Bearer " + create_access_token(identity="1", additional_claims={"role": "admin"})}
+    client = app.test_client()
+    for name, call in (
+        ("first list request", lambda: client.get("/admin/users", headers=admin)),
+        ("first login", lambda: client.post("/auth/login", json={"email": member_email(2), "password": PASSWORD})),
+        ("second login", lambda: client.post("/auth/login", json={"email": member_email(3), "password": PASSWORD})),
+    ):
+        start = time.perf_counter()
+        response = call()
+        timings[name] = time.perf_counter() - start
+        assert response.status_code == 200, (name, response.status_code)
+    print(json.dumps(timings))
+
+
+def run_child(database_url, warm):
+    args = [sys.executable, "-m", "benchmarks.startup", "--child", database_url] + (["--warm"] if warm else [])
+    out = subprocess.run(args, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def gunicorn_ready_seconds(database_url, preload, workers=2, timeout=60):
+    """Seconds from launching gunicorn until a request is answered."""
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, PORT=str(port), WEB_CONCURRENCY=str(workers),
+               GUNICORN_PRELOAD=str(preload), INTERNAL_API_TOKEN="startup-bench", MAIL_OUTBOX_AUTOSTART="False")
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "server.wsgi:app"],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/internal/pool",
+                                     headers={"X-Internal-Token": "startup-bench"})
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError("gunicorn did not answer in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _print_runs(title, runs):
+    print(title)
+    for key in runs[0]:
+        print(f"  {key:<20} {statistics.median(r[key] for r in runs) * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--gunicorn", action="store_true", help="also time gunicorn boots")
+    parser.add_argument("--child", metavar="DATABASE_URL", help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.warm)
+
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="chama-startup-")
+    os.close(fd)
+    database_url = f"sqlite:///{path}"
+    try:
+        from server.app import create_app
+        from benchmarks.synthetic import seed_database
+        app = create_app({"SQLALCHEMY_DATABASE_URI": database_url, "MAIL_OUTBOX_AUTOSTART": False,
+                          "PASSWORD_HASH_WORKERS": 0}, env="production")
+        with app.app_context():
+            seed_database(MEMBERS, payments_per_member=4)
+
+        _print_runs("cold worker", [run_child(database_url, warm=False) for _ in range(args.repeat)])
+        _print_runs("warmed worker", [run_child(database_url, warm=True) for _ in range(args.repeat)])
+        if args.gunicorn:
+            for preload in (False, True):
+                seconds = statistics.median(gunicorn_ready_seconds(database_url, preload) for _ in range(args.repeat))
+                print(f"gunicorn preload_app={preload}: first response after {seconds * 1000:.0f} ms")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/synthetic.py
+"""
+Synthetic chama data for benchmarks.
+
+generate() builds a deterministic group (same seed, same rows): one admin and
+N members, each with a share account, a history of payments and, for some,
+a loan. seed_database() writes it straight to the tables with bulk INSERTs
+and rebuilds the group ledger, so a group of thousands of members is ready
+in seconds instead of going through the API.
+
+    python -m benchmarks.synthetic --members 2000 --database-url sqlite:////tmp/chama-bench.db
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from server.amortization import monthly_payment
+from server.extensions import db
+from server.ledger import rebuild_ledger
+from server.models import Loanapp, Payments, Shares, User
+from server.passwords import password_hasher
+
+PASSWORD = "bench-password"
+ADMIN_EMAIL = "admin@bench.chama"
+PAYNAMES = (("contribution", 80), ("loan repayment", 12), ("fine", 5), ("registration", 3))
+METHODS = (("mpesa", 85), ("bank", 10), ("cash", 5))
+CHUNK = 1000
+
+
+def member_email(member_id):
+    return f"m{member_id}@bench.chama"
+
+
+def _money(rng, low, high):
+    return Decimal(rng.randrange(low * 100, high * 100)) / 100
+
+
+def _pick(rng, weighted):
+    return rng.choices([v for v, _ in weighted], weights=[w for _, w in weighted])[0]
+
+
+def generate(members=500, payments_per_member=24, loan_ratio=0.3, seed=1):
+    """Row dicts per table; memberId 1 is the admin, members are 2..members+1."""
+    rng = random.Random(seed)
+    users = [dict(memberId=1, firstname="Bench", lastname="Admin", email=ADMIN_EMAIL,
+                  phoneno="0700000000", role="admin", email_verified=True)]
+    shares, payments, loans = [], [], []
+    for member_id in range(2, members + 2):
+        users.append(dict(
+            memberId=member_id, firstname=f"Member{member_id}",
+            lastname=rng.choice(("Otieno", "Wanjiku", "Mwangi", "Achieng")),
+            email=member_email(member_id), phoneno=f"07{member_id:08d}", role="member", email_verified=True,
+        ))
+        penalties = Decimal(rng.choice((50, 100, 200))) if rng.random() < 0.1 else Decimal(0)
+        shares.append(dict(memberId=member_id, shares=_money(rng, 100, 50000), dividends=Decimal(0), penalties=penalties))
+        for _ in range(rng.randint(payments_per_member // 2, payments_per_member * 3 // 2)):
+            payments.append(dict(memberId=member_id, payname=_pick(rng, PAYNAMES), amount=_money(rng, 100, 5000),
+                                 method=_pick(rng, METHODS), receipt=f"S{len(payments) + 1:09d}"))
+        if rng.random() < loan_ratio:
+            amount, year = _money(rng, 5000, 200000), rng.randint(1, 3)
+            loans.append(dict(memberId=member_id, amount=amount, interest=Decimal("0.08"), year=year,
+                              monthrepay=Decimal(f"{float(monthly_payment(amount, 0.08, year)):.2f}")))
+    return {"users": users, "shares": shares, "payments": payments, "loans": loans}
+
+
+def _bulk_insert(model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(insert(model), rows[start:start + CHUNK])
+
+
+def seed_database(members=500, payments_per_member=24, loan_ratio=0.3, seed=1):
+    """Replace every table's contents with a synthetic group (needs an app context)."""
+    data = generate(members, payments_per_member, loan_ratio, seed)
+    db.drop_all()
+    db.create_all()
+    # one hash for everyone: hashing thousands of passwords would dominate seeding
+    password_hash = password_hasher.hash(PASSWORD)
+    for row in data["users"]:
+        row["password_hash"] = password_hash
+    _bulk_insert(User, data["users"])
+    _bulk_insert(Shares, data["shares"])
+    _bulk_insert(Payments, data["payments"])
+    _bulk_insert(Loanapp, data["loans"])
+    rebuild_ledger()
+    db.session.commit()
+    return {table: len(rows) for table, rows in data.items()}
+
+
+def main():
+    from server.app import create_app
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", required=True, help="database to fill (its tables are dropped first)")
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--payments-per-member", type=int, default=24)
+    parser.add_argument("--loan-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": args.database_url, "MAIL_OUTBOX_AUTOSTART": False})
+    start = time.perf_counter()
+    with app.app_context():
+        counts = seed_database(args.members, args.payments_per_member, args.loan_ratio, args.seed)
+    print(", ".join(f"{n} {table}" for table, n in counts.items()), f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
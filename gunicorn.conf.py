@@ -0,0 +1,71 @@
+# gunicorn.conf.py
+"""
+Production gunicorn settings (gunicorn -c gunicorn.conf.py server.wsgi:app).
+
+The app is imported once in the master (preload_app) and forked, so workers
+start without re-importing everything. Each worker drops the database
+connections it inherited, then warms up (server/warmup.py) before it
+accepts requests.
+
+Sizing: WEB_CONCURRENCY workers (default 2 x cores + 1) of GUNICORN_THREADS
+threads (default 4). Both are exported so server/db_pool.py sizes each
+worker's connection pool to match. Set GUNICORN_PRELOAD=false to import
+the app in every worker instead, e.g. to pick up code changes on a HUP.
+"""
+import multiprocessing
+import os
+import time
+
+os.environ.setdefault("APP_ENV", "production")
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = _env_int("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+threads = _env_int("GUNICORN_THREADS", 4)
+worker_class = "gthread"
+preload_app = os.getenv("GUNICORN_PRELOAD", "True").lower() in ("true", "1", "t", "yes")
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+os.environ["WEB_CONCURRENCY"] = str(workers)
+os.environ["GUNICORN_THREADS"] = str(threads)
+
+_started = time.monotonic()
+
+
+def on_starting(server):
+    from server.metrics import clear_directory
+
+    directory = os.getenv("METRICS_DIR")
+    if directory and os.path.isdir(directory):
+        clear_directory(directory)
+
+
+def when_ready(server):
+    server.log.info("Master ready in %.2fs (preload_app=%s)", time.monotonic() - _started, preload_app)
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from server.db_pool import dispose_inherited
+
+        dispose_inherited(worker.app.wsgi())
+
+
+def post_worker_init(worker):
+    # runs before the worker's first accept(), so no request reaches a cold worker
+    from server.warmup import warm
+
+    try:
+        done = warm(worker.app.wsgi())
+    except Exception:
+        # serve anyway; the pool connects lazily once the database is back
+        worker.log.exception("Warm-up failed in worker %s", worker.pid)
+        return
+    worker.log.info("Worker %s warm: %s", worker.pid, ", ".join(f"{k} {v}" for k, v in done.items()))
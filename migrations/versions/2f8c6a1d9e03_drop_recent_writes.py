@@ -0,0 +1,29 @@
+"""Drop recent writes
+
+Revision ID: 2f8c6a1d9e03
+Revises: 7d2a9c4e1f85
+Create Date: 2026-10-18 23:40:16.530218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f8c6a1d9e03'
+down_revision = '7d2a9c4e1f85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # read-your-writes marks now travel with the client (see server/replicas.py)
+    op.drop_table('recent_writes')
+
+
+def downgrade():
+    op.create_table('recent_writes',
+    sa.Column('memberId', sa.Integer(), nullable=False),
+    sa.Column('sticky_until', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('memberId')
+    )
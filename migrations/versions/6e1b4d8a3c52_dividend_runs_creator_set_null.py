@@ -0,0 +1,32 @@
+"""Null dividend runs' creator when the admin is deleted
+
+Revision ID: 6e1b4d8a3c52
+Revises: 2f8c6a1d9e03
+Create Date: 2026-10-18 23:58:04.271936
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1b4d8a3c52'
+down_revision = '2f8c6a1d9e03'
+branch_labels = None
+depends_on = None
+
+# Postgres' name for the unnamed constraint 1d6b0f93e4a7 created; SQLite's
+# reflected copy gets the same one through the naming convention
+FK_NAME = 'dividend_runs_created_by_fkey'
+NAMING = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def upgrade():
+    with op.batch_alter_table('dividend_runs', schema=None, naming_convention=NAMING) as batch_op:
+        batch_op.drop_constraint(FK_NAME, type_='foreignkey')
+        batch_op.create_foreign_key(FK_NAME, 'users', ['created_by'], ['memberId'], ondelete='SET NULL')
+
+
+def downgrade():
+    with op.batch_alter_table('dividend_runs', schema=None, naming_convention=NAMING) as batch_op:
+        batch_op.drop_constraint(FK_NAME, type_='foreignkey')
+        batch_op.create_foreign_key(FK_NAME, 'users', ['created_by'], ['memberId'])
@@ -0,0 +1,35 @@
+"""Add users search index
+
+Revision ID: 7d2a9c4e1f85
+Revises: b83d5f1e6c29
+Create Date: 2026-10-18 21:05:42.117390
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a9c4e1f85'
+down_revision = 'b83d5f1e6c29'
+branch_labels = None
+depends_on = None
+
+# must match server.member_search.search_text()
+SEARCH_TEXT = (
+    "lower(coalesce(firstname, '') || ' ' || coalesce(lastname, '') || ' ' "
+    "|| coalesce(email, '') || ' ' || coalesce(phoneno, ''))"
+)
+
+
+def upgrade():
+    # Postgres only; other databases search the in-memory index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(f'CREATE INDEX ix_users_search_trgm ON users USING gin (({SEARCH_TEXT}) gin_trgm_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_users_search_trgm', table_name='users')
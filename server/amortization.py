@@ -0,0 +1,101 @@
+# server/amortization.py
+"""
+Loan amortization (reducing balance, fixed monthly instalment).
+
+A loan of `amount` at annual rate `interest` (0.08 = 8%) over `year` years is
+repaid in n = 12 * year equal instalments A = P*r / (1 - (1+r)^-n), r = interest/12.
+Every function works on whole NumPy arrays: balances use the closed form
+B_k = P*(1+r)^k - A*((1+r)^k - 1)/r, so a schedule (or the whole portfolio,
+as a loans x months matrix) is computed without a Python loop per month.
+"""
+import numpy as np
+
+MONTHS_PER_YEAR = 12
+
+
+def _as_arrays(principal, annual_rate, years):
+    principal = np.asarray(principal, dtype=float)
+    rate = np.asarray(annual_rate, dtype=float) / MONTHS_PER_YEAR
+    months = np.asarray(years, dtype=int) * MONTHS_PER_YEAR
+    return principal, rate, months
+
+
+def _instalment(principal, rate, months):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = principal * rate / (1 - (1 + rate) ** -months)
+    return np.where(rate == 0, principal / months, annuity)
+
+
+def monthly_payment(principal, annual_rate, years):
+    """Fixed instalment for one loan or an array of loans."""
+    return _instalment(*_as_arrays(principal, annual_rate, years))
+
+
+def _balances(principal, rate, payment, k):
+    """Outstanding balance after k payments (broadcasts over loans and months)."""
+    growth = (1 + rate) ** k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity_part = payment * (growth - 1) / rate
+    balance = np.where(rate == 0, principal - payment * k, principal * growth - annuity_part)
+    return np.maximum(balance, 0.0)
+
+
+def loan_schedule(principal, annual_rate, years):
+    """
+    Month-by-month schedule for one loan as a list of dicts
+    (month, payment, interest, principal, balance), rounded to cents.
+    """
+    principal, rate, months = _as_arrays(principal, annual_rate, years)
+    payment = _instalment(principal, rate, months)
+
+    k = np.arange(1, int(months) + 1)
+    opening = _balances(principal, rate, payment, k - 1)
+    interest = opening * rate
+    principal_paid = payment - interest
+    closing = _balances(principal, rate, payment, k)
+    # last instalment clears whatever rounding left behind
+    principal_paid[-1] = opening[-1]
+    closing[-1] = 0.0
+    payments = interest + principal_paid
+
+    return [
+        {"month": int(m), "payment": p, "interest": i, "principal": pp, "balance": b}
+        for m, p, i, pp, b in zip(
+            k,
+            np.round(payments, 2).tolist(),
+            np.round(interest, 2).tolist(),
+            np.round(principal_paid, 2).tolist(),
+            np.round(closing, 2).tolist(),
+        )
+    ]
+
+
+def portfolio_projection(principals, annual_rates, years, horizon=None):
+    """
+    Aggregate cash flow of many loans, assuming they all start now.
+    Builds a loans x months matrix in one pass and sums it per month.
+    Returns a dict of per-month lists: month, payment, interest, principal, balance.
+    """
+    principal, rate, months = _as_arrays(principals, annual_rates, years)
+    if principal.size == 0:
+        return {"month": [], "payment": [], "interest": [], "principal": [], "balance": []}
+
+    horizon = int(horizon or months.max())
+    payment = _instalment(principal, rate, months)[:, None]
+    principal_c, rate_c, months_c = principal[:, None], rate[:, None], months[:, None]
+
+    k = np.arange(1, horizon + 1)[None, :]
+    active = k <= months_c
+    opening = _balances(principal_c, rate_c, payment, k - 1)
+    closing = np.where(active, _balances(principal_c, rate_c, payment, k), 0.0)
+    closing = np.where(k == months_c, 0.0, closing)
+    interest = np.where(active, opening * rate_c, 0.0)
+    principal_paid = np.where(active, opening - closing, 0.0)
+
+    return {
+        "month": k[0].tolist(),
+        "payment": np.round((interest + principal_paid).sum(axis=0), 2).tolist(),
+        "interest": np.round(interest.sum(axis=0), 2).tolist(),
+        "principal": np.round(principal_paid.sum(axis=0), 2).tolist(),
+        "balance": np.round(closing.sum(axis=0), 2).tolist(),
+    }
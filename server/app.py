@@ -1,26 +1,64 @@
 from flask import Flask
 from server.extensions import db, jwt, migrate,cors
-from server.config import Config
+from server.config import get_config
 from flask_restful import Api
 from server.extensions import mail
+from server.mail_outbox import outbox
+from server.passwords import password_hasher
+from server import db_pool
+from server.replicas import replica_router
+from server.metrics import metrics
+from server.rate_limit import rate_limiter
+from server.query_budget import query_budgets
+from server.slow_queries import slow_query_log
+from server.revocation import revocations
+from server.member_search import member_search
+from server.query_plans import check_query_plans_command
+from server.serialization import output_json
 from server.routes.User_auth_route import Register,Login,VerifyEmail,RequestPasswordReset,ResetPassword
-from server.routes.User_route import AssignRole,ListUsers,GetSingleUser,DeleteUser,Me,MemberProfile,AdminUsers
-from server.routes.Loan_routes import ApplyLoan,MyLoans,AllLoans,UpdateLoan,DeleteLoan
-from server.routes.Payments_route import MakePayment,ViewMyPayments,ViewAllPayments,DeletePayment
-from server.routes.Shares_routes import MemberShares,AdminShares
+from server.routes.User_route import AssignRole,ListUsers,GetSingleUser,DeleteUser,Me,MemberProfile,MemberSummary,AdminUsers,SearchUsers
+from server.routes.Loan_routes import ApplyLoan,MyLoans,AllLoans,UpdateLoan,DeleteLoan,LoanSchedule,LoanProjection
+from server.routes.Payments_route import MakePayment,ViewMyPayments,ViewAllPayments,DeletePayment,BulkPayments
+from server.routes.Shares_routes import MemberShares,AdminShares,DividendRuns
+from server.routes.Export_routes import AdminExport
+from server.routes.Ledger_routes import GroupTotals
+from server.routes.Internal_routes import PoolStats,Metrics,SlowQueries
+from server.ledger import ledger_cli
 
-def create_app():
+def create_app(config=None, env=None):
+    """
+    env: config profile (development, production, testing), default APP_ENV.
+    config: optional mapping that overrides the profile, e.g. a different
+    SQLALCHEMY_DATABASE_URI for tests and benchmarks.
+    """
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(get_config(env))
+    if config:
+        app.config.update(config)
+        if "SQLALCHEMY_DATABASE_URI" in config and "SQLALCHEMY_ENGINE_OPTIONS" not in config:
+            app.config["SQLALCHEMY_ENGINE_OPTIONS"] = db_pool.engine_options(config["SQLALCHEMY_DATABASE_URI"])
     cors.init_app(app)
     # Initialize extensions
     db.init_app(app)
+    db_pool.init_app(app)
+    metrics.init_app(app)  # first, so its timing wraps the other request hooks
+    rate_limiter.init_app(app)  # before anything that queries, so a 429 costs nothing
+    replica_router.init_app(app)
+    query_budgets.init_app(app)  # after the router, so only the view's statements count
+    slow_query_log.init_app(app)
     jwt.init_app(app)
+    revocations.init_app(app)
     migrate.init_app(app, db)
     mail.init_app(app)
+    outbox.init_app(app)
+    password_hasher.init_app(app)
+    member_search.init_app(app)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(ledger_cli)
     
     # Set up API
     api = Api(app)
+    api.representations["application/json"] = output_json
     #login and register
     api.add_resource(Register, "/auth/register")
     api.add_resource(Login, "/auth/login")
@@ -29,10 +67,12 @@ def create_app():
     api.add_resource(ResetPassword, "/auth/reset-password")
     api.add_resource(AssignRole, "/users/<int:user_id>/role")
     api.add_resource(ListUsers, "/users")
+    api.add_resource(SearchUsers, "/users/search")
     api.add_resource(GetSingleUser, "/users/<int:user_id>")
     api.add_resource(DeleteUser, "/users/<int:user_id>/delete")
     api.add_resource(AdminUsers, "/admin/users")
     api.add_resource(MemberProfile, "/member/profile")
+    api.add_resource(MemberSummary, "/member/summary")
     api.add_resource(Me, "/me")
 
     # Loan routes
@@ -41,6 +81,8 @@ def create_app():
     api.add_resource(AllLoans, "/loans")
     api.add_resource(UpdateLoan, "/loans/<int:loan_id>")
     api.add_resource(DeleteLoan, "/loans/<int:loan_id>")
+    api.add_resource(LoanSchedule, "/loans/<int:loan_id>/schedule")
+    api.add_resource(LoanProjection, "/loans/projection")
     
     # Member
     api.add_resource(MakePayment, "/payments")
@@ -49,9 +91,19 @@ def create_app():
     # Admin
     api.add_resource(ViewAllPayments, "/payments/all")
     api.add_resource(DeletePayment, "/payments/<int:payment_id>")
+    api.add_resource(BulkPayments, "/payments/bulk")
     #shares
     api.add_resource(MemberShares, "/shares")  # for logged-in member
     api.add_resource(AdminShares, "/admin/shares", "/admin/shares/<int:member_id>")
+    api.add_resource(DividendRuns, "/admin/dividends/runs")
+    #group totals
+    api.add_resource(GroupTotals, "/admin/ledger")
+    #exports (streamed)
+    api.add_resource(AdminExport, "/admin/export/<string:dataset>")
+    #operational
+    api.add_resource(PoolStats, "/internal/pool")
+    api.add_resource(Metrics, "/metrics")
+    api.add_resource(SlowQueries, "/internal/slow-queries")
     return app
 
 if __name__ == '__main__':
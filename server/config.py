@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from server.db_pool import engine_options
 
 # Load variables from .env file
 load_dotenv()
@@ -10,9 +11,52 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 class Config:
     # Security
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+    # Connection pool (see server/db_pool.py): DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    # DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_MAX_CONNECTIONS, DB_PGBOUNCER, DB_STATEMENT_TIMEOUT_MS
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+
+    # Read replica (see server/replicas.py): GET requests read from it when set
+    REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+    SQLALCHEMY_BINDS = (
+        {"replica": {"url": REPLICA_DATABASE_URL, **engine_options(REPLICA_DATABASE_URL)}}
+        if REPLICA_DATABASE_URL else {}
+    )
+    # Seconds a member's reads stay on the primary after they write
+    REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 10))
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret")
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
 
+    # Identity resolution (see server/identity.py)
+    # Seconds to keep a member's identity in the process-local cache; 0 disables it
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 0))
+    # Let role_required use the "role" claim Login puts in the JWT instead of the DB;
+    # safe now that a role change revokes the member's tokens (see server/revocation.py)
+    TRUST_JWT_ROLE_CLAIM = os.getenv("TRUST_JWT_ROLE_CLAIM", "False").lower() in ("true", "1", "t", "yes")
+
+    # Token revocation (see server/revocation.py)
+    # Seconds before a worker sees revocations made by other workers; 0 checks on every request
+    REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", 1))
+    # How far back each sync re-reads: longer than any transaction that revokes, plus clock skew
+    REVOCATION_SYNC_OVERLAP_SECONDS = int(os.getenv("REVOCATION_SYNC_OVERLAP_SECONDS", 60))
+    # Members the in-memory denylist is sized for, and its false-positive rate
+    REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", 10000))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", 0.01))
+
+    # Member search for /users/search (see server/member_search.py):
+    # "trigram" (Postgres + pg_trgm), "memory" (per-process prefix index) or "auto"
+    MEMBER_SEARCH_BACKEND = os.getenv("MEMBER_SEARCH_BACKEND", "auto")
+
+    # Password hashing (see server/passwords.py)
+    # werkzeug method string, e.g. "scrypt", "scrypt:16384:8:1", "pbkdf2:sha256:600000";
+    # stored hashes made with other settings are upgraded on the next successful login
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    # Processes doing the hashing; 0 hashes inline on the request thread
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    # Hashes allowed to run or wait at once (default 4 per worker) before Login answers 503
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 0)) or None
+    PASSWORD_HASH_TIMEOUT = int(os.getenv("PASSWORD_HASH_TIMEOUT", 10))
+
  
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -25,9 +69,90 @@ class Config:
     MAIL_USERNAME = os.getenv("MAIL_USERNAME")
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
+
+    # Loans: allowed difference between a submitted monthrepay and the amortized instalment
+    LOAN_MONTHREPAY_TOLERANCE = float(os.getenv("LOAN_MONTHREPAY_TOLERANCE", 1.0))
+
+    # Email outbox (see server/mail_outbox.py)
+    MAIL_OUTBOX_WORKERS = int(os.getenv("MAIL_OUTBOX_WORKERS", 2))
+    # Start sender threads inside the web process; set False when running `flask outbox run` separately
+    MAIL_OUTBOX_AUTOSTART = os.getenv("MAIL_OUTBOX_AUTOSTART", "True").lower() in ("true", "1", "t", "yes")
+    MAIL_OUTBOX_BATCH_SIZE = int(os.getenv("MAIL_OUTBOX_BATCH_SIZE", 20))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("MAIL_OUTBOX_MAX_ATTEMPTS", 6))
+    MAIL_OUTBOX_BACKOFF_SECONDS = int(os.getenv("MAIL_OUTBOX_BACKOFF_SECONDS", 30))
+    MAIL_OUTBOX_MAX_BACKOFF_SECONDS = int(os.getenv("MAIL_OUTBOX_MAX_BACKOFF_SECONDS", 3600))
+    MAIL_OUTBOX_POLL_SECONDS = int(os.getenv("MAIL_OUTBOX_POLL_SECONDS", 10))
+    MAIL_OUTBOX_LEASE_SECONDS = int(os.getenv("MAIL_OUTBOX_LEASE_SECONDS", 300))
    
+    # Lets monitoring call /internal/* with an X-Internal-Token header instead of an admin JWT
+    INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+
+    # Per-resource SQL statement budgets (see server/query_budget.py): off, warn or raise;
+    # unset means raise under TESTING, warn under DEBUG
+    QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE")
+
+    # Rate limits for Login, Register and password reset (see server/rate_limit.py):
+    # "<count>/<second|minute|hour|day>" per client IP and per email, "" for no limit
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True").lower() in ("true", "1", "t", "yes")
+    # memory (per worker process) or database (shared by all workers)
+    RATE_LIMIT_STORAGE = os.getenv("RATE_LIMIT_STORAGE", "memory")
+    # Proxies in front of the app; the client IP is read from X-Forwarded-For.
+    # Production defaults to 1, the router in front of the Procfile's dynos
+    RATE_LIMIT_PROXY_COUNT = int(os.getenv("RATE_LIMIT_PROXY_COUNT", 0))
+    RATE_LIMIT_LOGIN_IP = os.getenv("RATE_LIMIT_LOGIN_IP", "20/minute")
+    RATE_LIMIT_LOGIN_EMAIL = os.getenv("RATE_LIMIT_LOGIN_EMAIL", "5/minute")
+    RATE_LIMIT_REGISTER_IP = os.getenv("RATE_LIMIT_REGISTER_IP", "5/minute")
+    RATE_LIMIT_REGISTER_EMAIL = os.getenv("RATE_LIMIT_REGISTER_EMAIL", "3/hour")
+    RATE_LIMIT_PASSWORD_RESET_IP = os.getenv("RATE_LIMIT_PASSWORD_RESET_IP", "5/minute")
+    RATE_LIMIT_PASSWORD_RESET_EMAIL = os.getenv("RATE_LIMIT_PASSWORD_RESET_EMAIL", "3/hour")
+
+    # Slow-query log (see server/slow_queries.py); 0 turns it off
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 250))
+    SLOW_QUERY_SAMPLE_SECONDS = int(os.getenv("SLOW_QUERY_SAMPLE_SECONDS", 30))
+    SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", 200))
+    SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "True").lower() in ("true", "1", "t", "yes")
+
+    # Metrics (see server/metrics.py): a directory shared by all gunicorn workers of this host
+    METRICS_DIR = os.getenv("METRICS_DIR")
+    METRICS_FLUSH_SECONDS = int(os.getenv("METRICS_FLUSH_SECONDS", 5))
+
     # Frontend base URL
     FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
-    # Debug mode for development
+    DEBUG = False
+    # flask-restful turns unhandled exceptions into 500s unless they propagate;
+    # they have to, so flask-jwt-extended's handlers answer 401/422 (Flask
+    # otherwise only sets this in debug mode)
+    PROPAGATE_EXCEPTIONS = True
+
+
+# Profiles, chosen with APP_ENV (gunicorn.conf.py defaults it to production)
+class DevelopmentConfig(Config):
     DEBUG = True
+
+
+class ProductionConfig(Config):
+    DEBUG = False
+    RATE_LIMIT_PROXY_COUNT = int(os.getenv("RATE_LIMIT_PROXY_COUNT", 1))
+
+
+class TestingConfig(Config):
+    TESTING = True
+    MAIL_SUPPRESS_SEND = True
+    MAIL_OUTBOX_AUTOSTART = False
+    PASSWORD_HASH_WORKERS = 0
+
+
+CONFIGS = {
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
+    "testing": TestingConfig,
+}
+
+
+def get_config(env=None):
+    """Config class for env, by default the APP_ENV variable (development when unset)."""
+    env = env or os.getenv("APP_ENV", "development")
+    if env not in CONFIGS:
+        raise ValueError(f"APP_ENV must be one of {', '.join(CONFIGS)}, not {env!r}")
+    return CONFIGS[env]
@@ -0,0 +1,180 @@
+# server/db_pool.py
+"""
+Database connection pool settings and pool statistics.
+
+engine_options() turns DB_* environment variables into
+SQLALCHEMY_ENGINE_OPTIONS. Pools are per process, so under gunicorn the
+connection budget (DB_MAX_CONNECTIONS, what the server or PgBouncer allows
+this service) is split across WEB_CONCURRENCY workers, and each worker's
+pool defaults to one connection per GUNICORN_THREADS thread plus as much
+overflow again:
+
+    pool_size + max_overflow <= DB_MAX_CONNECTIONS // WEB_CONCURRENCY
+
+Connections are pre-pinged and recycled (DB_POOL_RECYCLE) so a quiet night
+behind a firewall or proxy doesn't leave dead sockets in the pool, and
+checkouts give up after DB_POOL_TIMEOUT seconds instead of hanging a request.
+
+DB_PGBOUNCER=true is for PgBouncer in transaction mode: PgBouncer does the
+pooling, so the app holds no idle connections (NullPool), and no session
+state is relied on -- the statement timeout is applied with SET LOCAL in
+each transaction because PgBouncer rejects it as a startup option.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+def _env_int(env, name, default):
+    value = env.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(env, name, default):
+    value = env.get(name)
+    if value in (None, ""):
+        return default
+    return value.lower() in ("true", "1", "t", "yes")
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def recreate(self):
+        # keep the counters when the engine is disposed/recreated
+        pool = super().recreate()
+        pool.waits, pool.wait_seconds = self.waits, self.wait_seconds
+        pool.max_wait_seconds, pool.timeouts = self.max_wait_seconds, self.timeouts
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.waits += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+def engine_options(uri, env=os.environ):
+    """SQLALCHEMY_ENGINE_OPTIONS for uri from DB_* environment variables."""
+    options = {"pool_pre_ping": _env_bool(env, "DB_POOL_PRE_PING", True)}
+    if not uri or uri in ("sqlite://", "sqlite:///:memory:"):
+        # in-memory SQLite must keep its single shared connection
+        return options
+
+    statement_timeout = _env_int(env, "DB_STATEMENT_TIMEOUT_MS", 0)
+    if _env_bool(env, "DB_PGBOUNCER", False):
+        options["poolclass"] = NullPool
+        return options
+
+    workers = max(1, _env_int(env, "WEB_CONCURRENCY", 1))
+    threads = max(1, _env_int(env, "GUNICORN_THREADS", 1))
+    pool_size = _env_int(env, "DB_POOL_SIZE", threads)
+    max_overflow = _env_int(env, "DB_MAX_OVERFLOW", threads)
+    budget = _env_int(env, "DB_MAX_CONNECTIONS", 0)
+    if budget:
+        per_worker = max(1, budget // workers)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = max(0, min(max_overflow, per_worker - pool_size))
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=_env_int(env, "DB_POOL_TIMEOUT", 10),
+        pool_recycle=_env_int(env, "DB_POOL_RECYCLE", 1800),
+    )
+    if statement_timeout and uri.startswith("postgres"):
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return options
+
+
+def init_app(app):
+    """Per-transaction statement timeout for PgBouncer mode."""
+    from server.extensions import db
+
+    timeout = app.config.get("DB_STATEMENT_TIMEOUT_MS", 0)
+    if not timeout:
+        return
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != "postgresql" or not isinstance(engine.pool, NullPool):
+        return
+
+    @event.listens_for(engine, "begin")
+    def _statement_timeout(conn):
+        conn.execute(text(f"SET LOCAL statement_timeout = {int(timeout)}"))
+
+
+def dispose_inherited(app):
+    """
+    Drop connections a forked worker inherited from the gunicorn master
+    (preload_app) without closing them, which would break the master's or a
+    sibling's socket; the worker then opens its own.
+    """
+    from server.extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def warm_pool(engine):
+    """Open pool_size connections now, so early requests don't pay for connecting."""
+    pool = engine.pool
+    size = pool.size() if isinstance(pool, QueuePool) else 1
+    connections = []
+    try:
+        for _ in range(size):
+            conn = engine.connect()
+            conn.exec_driver_sql("SELECT 1")
+            connections.append(conn)
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
+
+
+def pool_stats(engine):
+    """Snapshot of the engine's pool for /internal/pool (this process only)."""
+    pool = engine.pool
+    stats = {"pid": os.getpid(), "pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, TimedQueuePool):
+        with pool._stats_lock:
+            stats["wait"] = {
+                "checkouts": pool.waits,
+                "total_ms": round(pool.wait_seconds * 1000, 3),
+                "avg_ms": round(pool.wait_seconds * 1000 / pool.waits, 3) if pool.waits else 0.0,
+                "max_ms": round(pool.max_wait_seconds * 1000, 3),
+                "timeouts": pool.timeouts,
+            }
+    return stats
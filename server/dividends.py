@@ -0,0 +1,82 @@
+# server/dividends.py
+"""
+Set-based dividend distribution.
+
+A declared pool is split in proportion to Shares.shares:
+    dividend = round(pool * shares / total_shares, 2)
+optionally minus the member's penalties (floored at zero; penalties
+themselves are left untouched). The preview and the run use the same SQL
+expression, so what the dry run shows is exactly what one UPDATE applies.
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import Numeric, case, func, literal, update
+from server.extensions import db
+from server.ledger import record_dividends
+from server.models.DividendRun import DividendRun
+from server.models.Shares import Shares
+
+
+def _allocation(pool, total_shares, net_of_penalties):
+    """SQL expression for one member's dividend."""
+    share = func.round(
+        literal(pool, Numeric(14, 2)) * Shares.shares / literal(total_shares, Numeric(14, 2)), 2
+    )
+    if net_of_penalties:
+        return case((share > Shares.penalties, share - Shares.penalties), else_=0)
+    return share
+
+
+def _totals():
+    total_shares, old_dividends, members = db.session.query(
+        func.coalesce(func.sum(Shares.shares), 0),
+        func.coalesce(func.sum(Shares.dividends), 0),
+        func.count(Shares.memberId),
+    ).one()
+    return Decimal(str(total_shares)), Decimal(str(old_dividends)), members
+
+
+def preview_dividends(pool, net_of_penalties=False):
+    """Per-member allocations for a pool, without changing anything."""
+    total_shares, _, members = _totals()
+    if total_shares <= 0:
+        return total_shares, []
+    allocation = _allocation(pool, total_shares, net_of_penalties).label("dividend")
+    rows = (
+        db.session.query(Shares.memberId, Shares.shares, Shares.penalties, allocation)
+        .order_by(Shares.memberId)
+        .all()
+    )
+    return total_shares, rows
+
+
+def run_dividends(pool, net_of_penalties=False, created_by=None):
+    """
+    Apply the distribution to every member with one UPDATE and record the run.
+    Runs in the caller's transaction; the caller commits.
+    Returns the DividendRun, or None if nobody holds shares.
+    """
+    total_shares, old_dividends, members = _totals()
+    if total_shares <= 0:
+        return None
+
+    db.session.execute(
+        update(Shares).values(dividends=_allocation(pool, total_shares, net_of_penalties))
+    )
+    distributed = Decimal(str(
+        db.session.query(func.coalesce(func.sum(Shares.dividends), 0)).scalar()
+    )).quantize(Decimal("0.01"))
+    record_dividends(old_dividends, distributed)
+
+    run = DividendRun(
+        pool=pool,
+        net_of_penalties=net_of_penalties,
+        total_shares=total_shares,
+        members=members,
+        distributed=distributed,
+        created_by=created_by,
+        created_at=datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+    db.session.add(run)
+    return run
@@ -0,0 +1,136 @@
+# server/identity.py
+import threading
+import time
+from dataclasses import dataclass
+
+from flask import current_app, g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from server.extensions import db
+from server.models.User import User
+
+
+@dataclass(frozen=True)
+class UserIdentity:
+    """
+    Read-only snapshot of the columns a request needs to know who is calling.
+    It is safe to keep between requests because it is not bound to a session.
+    """
+    memberId: int
+    firstname: str
+    lastname: str
+    email: str
+    phoneno: str
+    role: str
+    email_verified: bool
+    token_version: int = 0
+
+    @classmethod
+    def from_model(cls, user):
+        return cls(
+            memberId=user.memberId,
+            firstname=user.firstname,
+            lastname=user.lastname,
+            email=user.email,
+            phoneno=user.phoneno,
+            role=user.role,
+            email_verified=bool(user.email_verified),
+            token_version=user.token_version or 0,
+        )
+
+    def to_dict(self):
+        return {
+            "memberId": self.memberId,
+            "firstname": self.firstname,
+            "lastname": self.lastname,
+            "email": self.email,
+            "phoneno": self.phoneno,
+            "role": self.role,
+            "email_verified": self.email_verified
+        }
+
+
+class TTLUserCache:
+    """Process-local memberId -> UserIdentity cache with a fixed time-to-live."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, member_id, ttl):
+        with self._lock:
+            entry = self._entries.get(member_id)
+            if entry is None:
+                return None
+            identity, stored_at = entry
+            if time.monotonic() - stored_at > ttl:
+                del self._entries[member_id]
+                return None
+            return identity
+
+    def set(self, member_id, identity):
+        with self._lock:
+            self._entries[member_id] = (identity, time.monotonic())
+
+    def invalidate(self, member_id):
+        with self._lock:
+            self._entries.pop(member_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = TTLUserCache()
+
+
+def _cache_ttl():
+    return current_app.config.get("USER_CACHE_TTL", 0) or 0
+
+
+def load_identity(member_id, token_version=0):
+    """
+    Return the UserIdentity for member_id, using the TTL cache when enabled.
+    A cached entry older than token_version (the token's "ver" claim) is
+    reloaded: the token was issued after a revocation, e.g. a role change,
+    that this process may not have seen.
+    """
+    ttl = _cache_ttl()
+    if ttl > 0:
+        identity = user_cache.get(member_id, ttl)
+        if identity is not None and identity.token_version >= token_version:
+            return identity
+
+    user = db.session.get(User, member_id)
+    if not user:
+        return None
+
+    identity = UserIdentity.from_model(user)
+    if ttl > 0:
+        user_cache.set(member_id, identity)
+    return identity
+
+
+def current_user():
+    """
+    Resolve the caller from the JWT once per request and share it with
+    role_required and the handler. Returns None if the user no longer exists.
+    """
+    if "current_user" in g:
+        return g.current_user
+
+    try:
+        member_id = int(get_jwt_identity())
+    except (TypeError, ValueError):
+        member_id = None
+
+    g.current_user = load_identity(member_id, get_jwt().get("ver") or 0) if member_id is not None else None
+    return g.current_user
+
+
+def invalidate_user(member_id):
+    """Drop a user from the cache after their row changes (role, deletion...)."""
+    try:
+        user_cache.invalidate(int(member_id))
+    except (TypeError, ValueError):
+        pass
+    g.pop("current_user", None)
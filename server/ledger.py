@@ -0,0 +1,202 @@
+# server/ledger.py
+"""
+Incrementally maintained group ledger.
+
+Write paths call the record_* helpers before committing, so each group_ledger
+row changes in the same transaction as the payment/shares/loan it reflects
+(a rollback undoes both). Each helper is one atomic
+"total = total + delta" upsert, so concurrent writers don't lose updates.
+Group-level reads are then a lookup of a handful of rows, however long the
+history is. `flask ledger rebuild` recomputes everything from the base tables.
+"""
+from decimal import Decimal
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, update
+from server.extensions import db
+from server.sql import dialect_insert
+from server.models.GroupLedger import GroupLedger
+from server.models.Loanapp import Loanapp
+from server.models.Payments import Payments
+from server.models.Shares import Shares
+
+PAYMENTS = "payments"
+SHARES = "shares"
+DIVIDENDS = "dividends"
+PENALTIES = "penalties"
+LOANS = "loans"
+
+
+def _money(value):
+    return Decimal(str(value or 0))
+
+
+def _bump(metric, amount=0, count=0):
+    """Atomically add amount/count to a metric row, creating it if needed."""
+    table = GroupLedger.__table__
+    amount = _money(amount)
+    stmt = dialect_insert(table)
+    if stmt is not None:
+        stmt = stmt.values(metric=metric, total=amount, count=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["metric"],
+            set_={"total": table.c.total + stmt.excluded.total, "count": table.c.count + stmt.excluded.count},
+        )
+        db.session.execute(stmt)
+        return
+
+    result = db.session.execute(
+        update(table)
+        .where(table.c.metric == metric)
+        .values(total=table.c.total + amount, count=table.c.count + count)
+    )
+    if not result.rowcount:
+        db.session.execute(table.insert().values(metric=metric, total=amount, count=count))
+
+
+def payname_metric(payname):
+    return f"{PAYMENTS}:{payname}"
+
+# ----------------- Write-path hooks -----------------
+def record_payment(payname, amount, sign=1):
+    """A payment was added (sign=1) or deleted (sign=-1)."""
+    amount = _money(amount) * sign
+    _bump(PAYMENTS, amount, sign)
+    _bump(payname_metric(payname), amount, sign)
+
+
+def record_payments(rows):
+    """Many payments inserted at once; one bump per payname."""
+    by_payname = {}
+    for row in rows:
+        total, count = by_payname.get(row["payname"], (Decimal(0), 0))
+        by_payname[row["payname"]] = (total + _money(row["amount"]), count + 1)
+    if not by_payname:
+        return
+    _bump(PAYMENTS, sum(t for t, _ in by_payname.values()), sum(c for _, c in by_payname.values()))
+    for payname, (total, count) in by_payname.items():
+        _bump(payname_metric(payname), total, count)
+
+
+def record_shares(old=None, new=None):
+    """
+    A shares record changed. old/new are (shares, dividends, penalties)
+    tuples, None when the record is being created/deleted.
+    """
+    old_values = [_money(v) for v in old] if old else [Decimal(0)] * 3
+    new_values = [_money(v) for v in new] if new else [Decimal(0)] * 3
+    count = (1 if new else 0) - (1 if old else 0)
+    for metric, before, after in zip((SHARES, DIVIDENDS, PENALTIES), old_values, new_values):
+        _bump(metric, after - before, count)
+
+
+def record_dividends(old_total, new_total):
+    """Every member's dividends were rewritten at once (dividend run)."""
+    _bump(DIVIDENDS, _money(new_total) - _money(old_total), 0)
+
+
+def record_loan(old_amount=None, new_amount=None):
+    """Outstanding principal changed; None means no loan before/after."""
+    count = (1 if new_amount is not None else 0) - (1 if old_amount is not None else 0)
+    _bump(LOANS, _money(new_amount) - _money(old_amount), count)
+
+# ----------------- Reads -----------------
+def ledger_snapshot():
+    """All metrics in one query, shaped for the API."""
+    rows = {row.metric: row for row in GroupLedger.query.all()}
+
+    def total(metric):
+        return float(rows[metric].total) if metric in rows else 0.0
+
+    def count(metric):
+        return rows[metric].count if metric in rows else 0
+
+    prefix = payname_metric("")
+    return {
+        "contributions": {
+            "total": total(PAYMENTS),
+            "count": count(PAYMENTS),
+            "by_payname": {
+                metric[len(prefix):]: {"total": float(row.total), "count": row.count}
+                for metric, row in rows.items()
+                if metric.startswith(prefix) and row.count
+            },
+        },
+        "shares": {"total": total(SHARES), "members": count(SHARES)},
+        "dividends": total(DIVIDENDS),
+        "penalties": total(PENALTIES),
+        "loans": {"principal": total(LOANS), "count": count(LOANS)},
+    }
+
+# ----------------- Recovery -----------------
+def compute_ledger():
+    """{metric: (total, count)} computed from the base tables."""
+    computed = {}
+    total, count = db.session.query(func.coalesce(func.sum(Payments.amount), 0), func.count(Payments.paymentId)).one()
+    computed[PAYMENTS] = (_money(total), count)
+    for payname, total, count in (
+        db.session.query(Payments.payname, func.sum(Payments.amount), func.count(Payments.paymentId))
+        .group_by(Payments.payname)
+    ):
+        computed[payname_metric(payname)] = (_money(total), count)
+
+    shares, dividends, penalties, count = db.session.query(
+        func.coalesce(func.sum(Shares.shares), 0),
+        func.coalesce(func.sum(Shares.dividends), 0),
+        func.coalesce(func.sum(Shares.penalties), 0),
+        func.count(Shares.memberId),
+    ).one()
+    computed[SHARES] = (_money(shares), count)
+    computed[DIVIDENDS] = (_money(dividends), count)
+    computed[PENALTIES] = (_money(penalties), count)
+
+    total, count = db.session.query(func.coalesce(func.sum(Loanapp.amount), 0), func.count(Loanapp.memberId)).one()
+    computed[LOANS] = (_money(total), count)
+    return computed
+
+
+def rebuild_ledger():
+    """Replace every ledger row with freshly computed values (caller commits)."""
+    computed = compute_ledger()
+    GroupLedger.query.delete()
+    db.session.add_all(
+        GroupLedger(metric=metric, total=total, count=count)
+        for metric, (total, count) in computed.items()
+    )
+    return computed
+
+
+def ledger_drift():
+    """Metrics whose stored value differs from the base tables: {metric: (stored, computed)}."""
+    stored = {row.metric: (_money(row.total), row.count) for row in GroupLedger.query.all()}
+    computed = compute_ledger()
+    drift = {}
+    for metric in stored.keys() | computed.keys():
+        have = stored.get(metric, (Decimal(0), 0))
+        want = computed.get(metric, (Decimal(0), 0))
+        if have != want:
+            drift[metric] = (have, want)
+    return drift
+
+# ----------------- CLI -----------------
+ledger_cli = AppGroup("ledger", help="Group ledger aggregates.")
+
+
+@ledger_cli.command("rebuild")
+def rebuild_command():
+    """Recompute all aggregates from payments, shares and loanapps."""
+    computed = rebuild_ledger()
+    db.session.commit()
+    click.echo(f"Rebuilt {len(computed)} ledger metric(s)")
+
+
+@ledger_cli.command("check")
+def check_command():
+    """Compare stored aggregates with the base tables; exit 1 on drift."""
+    drift = ledger_drift()
+    for metric, (have, want) in sorted(drift.items()):
+        click.echo(f"{metric}: stored {have}, actual {want}")
+    if drift:
+        raise SystemExit(1)
+    click.echo("Ledger is consistent")
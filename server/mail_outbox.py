@@ -0,0 +1,259 @@
+# server/mail_outbox.py
+"""
+Transactional email outbox.
+
+Handlers write an EmailOutbox row in the same transaction as the data the
+email is about (enqueue_email) and call outbox.notify() after committing.
+A small pool of background threads drains due rows over one SMTP connection
+per batch, retrying failures with exponential backoff until
+MAIL_OUTBOX_MAX_ATTEMPTS, after which the row is parked as "dead".
+
+For local testing point MAIL_SERVER/MAIL_PORT at a stand-in SMTP server
+(e.g. `python -m aiosmtpd -n -l localhost:1025`) with MAIL_USE_TLS=False.
+"""
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from flask_mail import Message
+from sqlalchemy import and_, or_
+from server.extensions import db, mail
+from server.models.EmailOutbox import EmailOutbox
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_email(recipients, subject, body, sender=None):
+    """Add an email to the current session; it is sent once the caller commits."""
+    now = _utcnow()
+    row = EmailOutbox(
+        recipients=",".join(recipients),
+        sender=sender,
+        subject=subject,
+        body=body,
+        status="pending",
+        attempts=0,
+        next_attempt_at=now,
+        created_at=now,
+    )
+    db.session.add(row)
+    return row
+
+
+class MailOutbox:
+    """Background sender pool for the email_outbox table."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["mail_outbox"] = self
+        app.cli.add_command(outbox_cli)
+
+    # ----------------- Worker pool -----------------
+    def start(self, workers=None):
+        """
+        Start the sender threads for this process. Threads don't survive a
+        fork, so the pool is (re)started lazily in whichever process first
+        enqueues mail.
+        """
+        app = self.app
+        if workers is None:
+            workers = app.config.get("MAIL_OUTBOX_WORKERS", 2)
+        if workers <= 0:
+            return
+
+        with self._lock:
+            if self._pid == os.getpid() and any(t.is_alive() for t in self._threads):
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"mail-outbox-{i}", daemon=True)
+                for i in range(workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """Wake the senders after committing new outbox rows."""
+        if self.app.config.get("MAIL_OUTBOX_AUTOSTART", True):
+            self.start()
+        self._wake.set()
+
+    def resume(self):
+        """
+        Start the senders at worker boot (server/warmup.py) and send whatever
+        is already due. Returns the number of sender threads running.
+        """
+        self.notify()
+        return sum(t.is_alive() for t in self._threads) if self._pid == os.getpid() else 0
+
+    def _run(self):
+        poll = self.app.config.get("MAIL_OUTBOX_POLL_SECONDS", 10)
+        while not self._stop.is_set():
+            self._wake.wait(poll)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            with self.app.app_context():
+                try:
+                    self.drain()
+                except Exception as e:
+                    db.session.rollback()
+                    current_app.logger.exception("Mail outbox worker failed: %s", e)
+                finally:
+                    db.session.remove()
+
+    # ----------------- Draining -----------------
+    def drain(self):
+        """Send batches until nothing is due. Returns the number of rows handled."""
+        total = 0
+        while True:
+            handled = self.send_batch()
+            if not handled:
+                return total
+            total += handled
+
+    def _claim_batch(self):
+        """
+        Mark up to MAIL_OUTBOX_BATCH_SIZE due rows with a fresh claim token in
+        one UPDATE so concurrent workers (threads or processes) never pick
+        the same row. Rows stuck in "sending" past the lease are reclaimed.
+        """
+        config = current_app.config
+        now = _utcnow()
+        lease = timedelta(seconds=config.get("MAIL_OUTBOX_LEASE_SECONDS", 300))
+        due = or_(
+            and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == "sending", EmailOutbox.claimed_at < now - lease),
+        )
+        candidates = (
+            db.session.query(EmailOutbox.id)
+            .filter(due)
+            .order_by(EmailOutbox.id)
+            .limit(config.get("MAIL_OUTBOX_BATCH_SIZE", 20))
+            .scalar_subquery()
+        )
+
+        token = uuid.uuid4().hex
+        claimed = (
+            db.session.query(EmailOutbox)
+            .filter(EmailOutbox.id.in_(candidates), due)
+            .update(
+                {"status": "sending", "claim_token": token, "claimed_at": now},
+                synchronize_session=False,
+            )
+        )
+        db.session.commit()
+        if not claimed:
+            return []
+        return EmailOutbox.query.filter_by(claim_token=token).order_by(EmailOutbox.id).all()
+
+    def _mark_failed(self, row, error):
+        config = current_app.config
+        row.attempts += 1
+        row.last_error = str(error)[:1000]
+        row.claim_token = None
+        if row.attempts >= config.get("MAIL_OUTBOX_MAX_ATTEMPTS", 6):
+            row.status = "dead"
+            current_app.logger.error("Mail outbox: giving up on email %s: %s", row.id, error)
+            return
+        base = config.get("MAIL_OUTBOX_BACKOFF_SECONDS", 30)
+        delay = min(base * (2 ** (row.attempts - 1)), config.get("MAIL_OUTBOX_MAX_BACKOFF_SECONDS", 3600))
+        row.status = "pending"
+        row.next_attempt_at = _utcnow() + timedelta(seconds=delay)
+
+    def send_batch(self):
+        """Claim one batch and send it over a single SMTP connection."""
+        rows = self._claim_batch()
+        if not rows:
+            return 0
+
+        default_sender = current_app.config.get("MAIL_DEFAULT_SENDER") or "no-reply@example.com"
+        try:
+            with mail.connect() as conn:
+                for row in rows:
+                    try:
+                        msg = Message(
+                            subject=row.subject,
+                            sender=row.sender or default_sender,
+                            recipients=row.recipients.split(","),
+                            body=row.body,
+                        )
+                        conn.send(msg)
+                    except Exception as e:
+                        current_app.logger.warning("Mail outbox: email %s failed: %s", row.id, e)
+                        self._mark_failed(row, e)
+                    else:
+                        row.status = "sent"
+                        row.sent_at = _utcnow()
+                        row.claim_token = None
+        except Exception as e:
+            # could not connect (or the connection dropped): retry whatever is left
+            current_app.logger.warning("Mail outbox: SMTP connection failed: %s", e)
+            for row in rows:
+                if row.status == "sending":
+                    self._mark_failed(row, e)
+
+        db.session.commit()
+        return len(rows)
+
+
+outbox = MailOutbox()
+
+# ----------------- CLI -----------------
+outbox_cli = AppGroup("outbox", help="Transactional email outbox.")
+
+
+@outbox_cli.command("drain")
+def drain_command():
+    """Send everything that is due once and exit."""
+    handled = outbox.drain()
+    click.echo(f"Processed {handled} outbox email(s)")
+
+
+@outbox_cli.command("run")
+@click.option("--workers", type=int, default=None, help="Sender threads (default MAIL_OUTBOX_WORKERS).")
+def run_command(workers):
+    """Run the sender pool in the foreground (e.g. as a separate worker process)."""
+    outbox.start(workers=workers)
+    outbox.notify()
+    click.echo("Mail outbox running, Ctrl+C to stop")
+    try:
+        while True:
+            threading.Event().wait(3600)
+    except KeyboardInterrupt:
+        outbox.stop()
+
+
+@outbox_cli.command("requeue-dead")
+def requeue_dead_command():
+    """Give dead emails a fresh set of attempts."""
+    count = (
+        EmailOutbox.query.filter_by(status="dead")
+        .update({"status": "pending", "attempts": 0, "next_attempt_at": _utcnow()})
+    )
+    db.session.commit()
+    click.echo(f"Requeued {count} email(s)")
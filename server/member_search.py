@@ -0,0 +1,193 @@
+# server/member_search.py
+"""
+Member search for the admin typeahead (/users/search?q=).
+
+Matches prefixes of firstname, lastname, email and phoneno ("jo sm" finds
+John Smith, "0712" finds a phone number) and, failing enough prefix hits,
+misspellings ("jonathon" finds Jonathan). Only the top `limit` rows are
+returned, so admin screens no longer load every member to filter in the
+browser.
+
+MEMBER_SEARCH_BACKEND picks how:
+  trigram  Postgres: one indexed query against ix_users_search_trgm, a GIN
+           pg_trgm index over the four columns (see migration 7d2a9c4e1f85)
+  memory   a prefix index of the users table kept in each process and
+           rebuilt when the "users" table version (server/versioning.py)
+           moves, so an edit made by any worker is seen on the next search
+  auto     trigram on Postgres, memory elsewhere (the default)
+"""
+import bisect
+import threading
+
+from sqlalchemy import String, case, func, literal, literal_column, or_
+
+from server.extensions import db
+from server.models.TableVersion import TableVersion
+from server.models.User import User
+
+BACKENDS = ("auto", "trigram", "memory")
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MAX_QUERY_LENGTH = 100
+# share of the query's trigrams a member must have to match fuzzily
+# (pg_trgm's word_similarity_threshold defaults to 0.6)
+FUZZY_THRESHOLD = 0.6
+
+RESULT_COLUMNS = (User.memberId, User.firstname, User.lastname, User.email, User.phoneno, User.role)
+
+
+def search_text():
+    """
+    The expression ix_users_search_trgm indexes; keep the two in step. The
+    constants are inlined, not bound, so Postgres can match it to the index.
+    """
+    blank, space = literal_column("''", String), literal_column("' '", String)
+    parts = [func.coalesce(column, blank) for column in (User.firstname, User.lastname, User.email, User.phoneno)]
+    text = parts[0]
+    for part in parts[1:]:
+        text = text + space + part
+    return func.lower(text)
+
+
+def trigrams(word):
+    """pg_trgm's trigrams for one word: padded with two blanks in front, one behind."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _tokens(row):
+    """The words a member can be found by, lower-cased."""
+    email = (row.email or "").lower()
+    words = [row.firstname, row.lastname, email, email.split("@")[0], row.phoneno]
+    return {word.lower() for word in words if word}
+
+
+def trigram_query(words, limit, role=None):
+    """The Postgres search: every word in search_text() or close to one of its words."""
+    text = search_text()
+    q, first = " ".join(words), words[0]
+    query = db.session.query(*RESULT_COLUMNS)
+    for word in words:
+        # both predicates can use ix_users_search_trgm
+        query = query.filter(or_(text.contains(word, autoescape=True), literal(word).op("<%")(text)))
+    prefix_hit = or_(text.startswith(first, autoescape=True), text.contains(" " + first, autoescape=True))
+    query = query.order_by(case((prefix_hit, 0), else_=1), func.word_similarity(q, text).desc(), User.memberId)
+    if role:
+        query = query.filter(User.role == role)
+    return query.limit(limit)
+
+
+def _result(row):
+    return {
+        "memberId": row.memberId,
+        "fullName": f"{row.firstname or ''} {row.lastname or ''}".strip(),
+        "email": row.email,
+        "phoneno": row.phoneno,
+        "role": row.role,
+    }
+
+
+class PrefixIndex:
+    """Sorted (token, memberId) pairs; prefixes are a bisect, misspellings a scan of one initial."""
+
+    def __init__(self, rows, version):
+        self.version = version
+        self.rows = {row.memberId: row for row in rows}
+        self.keys = sorted((token, row.memberId) for row in rows for token in _tokens(row))
+
+    def _starting(self, prefix):
+        for token, member_id in self.keys[bisect.bisect_left(self.keys, (prefix,)):]:
+            if not token.startswith(prefix):
+                break
+            yield token, member_id
+
+    def _prefixed(self, word):
+        """memberId -> 2 if a token equals word, 1 if one starts with it."""
+        hits = {}
+        for token, member_id in self._starting(word):
+            hits[member_id] = max(hits.get(member_id, 0), 2 if token == word else 1)
+        return hits
+
+    def _fuzzy(self, word):
+        """memberId -> trigram similarity (< 1) of its closest token sharing word's first letter."""
+        grams = trigrams(word)
+        hits = {}
+        for token, member_id in self._starting(word[0]):
+            similarity = len(grams & trigrams(token)) / len(grams)
+            if similarity >= FUZZY_THRESHOLD:
+                hits[member_id] = max(hits.get(member_id, 0), min(similarity, 0.99))
+        return hits
+
+    def _match(self, words, hits_for):
+        """memberId -> summed score, for members every word hits."""
+        scores = None
+        for word in words:
+            hits = hits_for(word)
+            scores = hits if scores is None else {
+                member_id: score + hits[member_id] for member_id, score in scores.items() if member_id in hits
+            }
+        return scores
+
+    def search(self, words, limit, role=None):
+        def allowed(member_id):
+            return not role or self.rows[member_id].role == role
+
+        # every word has to prefix-match some token of the member
+        exact = {member_id: score for member_id, score in self._match(words, self._prefixed).items() if allowed(member_id)}
+        matches = [(0, -score, member_id) for member_id, score in exact.items()]
+        if len(matches) < limit and any(len(word) >= 3 for word in words):
+            # then let words of three letters or more match misspelt; these rank last
+            fuzzy = self._match(words, lambda word: {**self._fuzzy(word), **self._prefixed(word)} if len(word) >= 3
+                                else self._prefixed(word))
+            matches += [(1, -score, member_id) for member_id, score in fuzzy.items()
+                        if member_id not in exact and allowed(member_id)]
+        return [self.rows[member_id] for *_, member_id in sorted(matches)[:limit]]
+
+
+class MemberSearch:
+    def __init__(self):
+        self.backend = "auto"
+        self._lock = threading.Lock()
+        self._index = None
+
+    def init_app(self, app):
+        backend = app.config.get("MEMBER_SEARCH_BACKEND", "auto")
+        if backend not in BACKENDS:
+            raise ValueError(f"MEMBER_SEARCH_BACKEND must be one of {', '.join(BACKENDS)}")
+        self.backend = backend
+        self._index = None
+        app.extensions["member_search"] = self
+
+    def _backend(self):
+        if self.backend != "auto":
+            return self.backend
+        return "trigram" if db.session.get_bind().dialect.name == "postgresql" else "memory"
+
+    def search(self, q, limit=DEFAULT_LIMIT, role=None):
+        """Up to limit result dicts for q, best match first."""
+        words = q.lower().split()
+        if not words:
+            return []
+        if self._backend() == "trigram":
+            rows = trigram_query(words, limit, role).all()
+        else:
+            rows = self.index().search(words, limit, role)
+        return [_result(row) for row in rows]
+
+    # ----------------- In memory -----------------
+    def index(self):
+        """The prefix index, rebuilt first if the users table changed since it was built."""
+        # read the version before the rows, so a concurrent write is never
+        # stored under a version that already includes it
+        version = db.session.query(TableVersion.version).filter(TableVersion.name == "users").scalar() or 0
+        index = self._index
+        if index is None or index.version != version:
+            with self._lock:
+                index = self._index
+                if index is None or index.version != version:
+                    index = PrefixIndex(db.session.query(*RESULT_COLUMNS).all(), version)
+                    self._index = index
+        return index
+
+
+member_search = MemberSearch()
@@ -0,0 +1,285 @@
+# server/metrics.py
+"""
+Prometheus metrics for every route, without a client library.
+
+Per request: a latency histogram by route template/method/status, SQL
+statement count and DB time (from server/sql_tracking.py), and an in-flight
+gauge per route. GET /metrics renders them in the Prometheus text format.
+
+Gunicorn runs several worker processes and a scrape reaches only one of
+them, so with METRICS_DIR set each worker writes its cumulative values to
+METRICS_DIR/metrics-<pid>-<start>.json (atomically, at most every
+METRICS_FLUSH_SECONDS) and /metrics merges all files. Counters and
+histograms of workers that have exited are folded into metrics-archive.json
+so totals never go backwards; their in-flight gauges are dropped. The
+directory is emptied when the server (not a worker) starts, by
+clear_directory() in gunicorn.conf.py.
+"""
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+from flask import g, request
+from server.sql_tracking import request_stats, reset_request_stats
+
+try:
+    import fcntl
+except ImportError:  # no gunicorn (or shared METRICS_DIR) off POSIX anyway
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+# name -> (type, help, buckets)
+METRICS = {
+    "chama_http_request_duration_seconds": (
+        "histogram", "Request latency by route template, method and status.", LATENCY_BUCKETS),
+    "chama_http_requests_in_flight": ("gauge", "Requests being handled, by route.", None),
+    "chama_db_statements_per_request": (
+        "histogram", "SQL statements executed per request, by route.", STATEMENT_BUCKETS),
+    "chama_db_statements_total": ("counter", "SQL statements executed, by route.", None),
+    "chama_db_seconds_total": ("counter", "Seconds spent in SQL, by route.", None),
+}
+
+ARCHIVE = "metrics-archive.json"
+
+
+class Registry:
+    """Cumulative values of one process; keys are (name, ((label, value), ...))."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}  # key -> [per-bucket counts (last is +Inf), sum]
+
+    def inc(self, name, labels, amount=1.0):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0.0) + amount
+
+    def add_gauge(self, name, labels, amount):
+        key = (name, labels)
+        self.gauges[key] = self.gauges.get(key, 0.0) + amount
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = [[0] * (len(METRICS[name][2]) + 1), 0.0]
+        hist[0][bisect.bisect_left(METRICS[name][2], value)] += 1
+        hist[1] += value
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": [[n, list(l), v] for (n, l), v in self.counters.items()],
+                "gauges": [[n, list(l), v] for (n, l), v in self.gauges.items()],
+                "histograms": [[n, list(l), list(h[0]), h[1]] for (n, l), h in self.histograms.items()],
+            }
+
+
+def merge(snapshots, include_gauges=True):
+    """Sum snapshots into a single Registry."""
+    total = Registry()
+    for snap in snapshots:
+        for name, labels, value in snap.get("counters", ()):
+            total.inc(name, tuple(map(tuple, labels)), value)
+        if include_gauges:
+            for name, labels, value in snap.get("gauges", ()):
+                total.add_gauge(name, tuple(map(tuple, labels)), value)
+        for name, labels, counts, total_sum in snap.get("histograms", ()):
+            key = (name, tuple(map(tuple, labels)))
+            hist = total.histograms.setdefault(key, [[0] * len(counts), 0.0])
+            hist[0] = [a + b for a, b in zip(hist[0], counts)]
+            hist[1] += total_sum
+    return total
+
+
+# ----------------- Text format -----------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render(registry):
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (metric, labels), (counts, total_sum) in sorted(registry.histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + [float("inf")], counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total_sum)}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        else:
+            values = registry.counters if kind == "counter" else registry.gauges
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ----------------- Process files -----------------
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _write_json(path, data):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def clear_directory(directory):
+    """Remove every worker file and the archive; for the server (not a worker) starting."""
+    for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+        os.remove(path)
+
+
+class Metrics:
+    def __init__(self):
+        self.registry = Registry()
+        self.directory = None
+        self.flush_seconds = 5
+        self._last_flush = 0.0
+        self._started = int(time.time() * 1000)
+
+    def init_app(self, app):
+        self.directory = app.config.get("METRICS_DIR")
+        self.flush_seconds = app.config.get("METRICS_FLUSH_SECONDS", 5)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+        app.extensions["metrics"] = self
+
+    # per request
+    @staticmethod
+    def _route():
+        rule = request.url_rule
+        return rule.rule if rule is not None else "unmatched"
+
+    def _before(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_route = self._route()
+        reset_request_stats()
+        with self.registry.lock:
+            self.registry.add_gauge("chama_http_requests_in_flight", (("route", g.metrics_route),), 1)
+
+    def _after(self, response):
+        self._record(response.status_code)
+        return response
+
+    def _teardown(self, exc):
+        if "metrics_started" not in g:
+            return
+        if not g.get("metrics_recorded"):
+            self._record(500)
+        with self.registry.lock:
+            self.registry.add_gauge("chama_http_requests_in_flight", (("route", g.metrics_route),), -1)
+        self._maybe_flush()
+
+    def _record(self, status):
+        if "metrics_started" not in g:
+            return
+        g.metrics_recorded = True
+        seconds = time.perf_counter() - g.metrics_started
+        statements, db_seconds = request_stats()
+        route = (("route", g.metrics_route),)
+        with self.registry.lock:
+            self.registry.observe(
+                "chama_http_request_duration_seconds",
+                route + (("method", request.method), ("status", str(status))),
+                seconds,
+            )
+            self.registry.observe("chama_db_statements_per_request", route, statements)
+            self.registry.inc("chama_db_statements_total", route, statements)
+            self.registry.inc("chama_db_seconds_total", route, db_seconds)
+
+    # multi-process
+    def _own_file(self):
+        return os.path.join(self.directory, f"metrics-{os.getpid()}-{self._started}.json")
+
+    def _maybe_flush(self):
+        now = time.monotonic()
+        if self.directory and now - self._last_flush >= self.flush_seconds:
+            self._last_flush = now
+            self.flush()
+
+    def flush(self):
+        if self.directory:
+            _write_json(self._own_file(), self.registry.snapshot())
+
+    def _collect_files(self):
+        """Snapshots of live workers; files of exited workers are folded into the archive."""
+        archive_path = os.path.join(self.directory, ARCHIVE)
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # split live/dead under the lock, so two scrapes never fold the same files
+            files = glob.glob(os.path.join(self.directory, "metrics-*-*.json"))
+            newest = {}
+            for path in files:
+                pid, started = os.path.basename(path)[len("metrics-"):-len(".json")].split("-")
+                if newest.get(int(pid), ("", 0))[1] < int(started):
+                    newest[int(pid)] = (path, int(started))
+            live = {path for pid, (path, _) in newest.items() if _pid_alive(pid)}
+            dead = [p for p in files if p not in live]
+
+            archive = _read_json(archive_path)
+            if dead:
+                archive = merge([archive] + [_read_json(p) for p in dead], include_gauges=False).snapshot()
+                _write_json(archive_path, archive)
+                for path in dead:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:  # e.g. cleared by a restarting master
+                        pass
+        own = self._own_file()
+        return [archive] + [_read_json(p) for p in live if p != own]
+
+    def collect(self):
+        """Registry to expose: this process live, other workers from their files."""
+        own = self.registry.snapshot()
+        if not self.directory:
+            return merge([own])
+        self.flush()
+        return merge([own] + self._collect_files())
+
+
+metrics = Metrics()
@@ -0,0 +1,29 @@
+from server.extensions import db
+
+class DividendRun(db.Model):
+    """One declared dividend distribution across all members' shares."""
+    __tablename__='dividend_runs'
+
+    id=db.Column(db.Integer, primary_key=True)
+    pool=db.Column(db.Numeric(14,2), nullable=False)
+    net_of_penalties=db.Column(db.Boolean, nullable=False, default=False)
+    total_shares=db.Column(db.Numeric(14,2), nullable=False)
+    members=db.Column(db.Integer, nullable=False)
+    distributed=db.Column(db.Numeric(14,2), nullable=False)
+    created_by=db.Column(db.Integer, db.ForeignKey('users.memberId', ondelete='SET NULL'), nullable=True)
+    created_at=db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        return{
+            "id":self.id,
+            "pool":float(self.pool),
+            "net_of_penalties":self.net_of_penalties,
+            "total_shares":float(self.total_shares),
+            "members":self.members,
+            "distributed":float(self.distributed),
+            "created_by":self.created_by,
+            "created_at":self.created_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f"<DividendRun id={self.id} pool={self.pool} members={self.members} distributed={self.distributed}>"
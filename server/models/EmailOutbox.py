@@ -0,0 +1,38 @@
+from server.extensions import db
+
+class EmailOutbox(db.Model):
+    __tablename__='email_outbox'
+    # drain query: due pending rows in id order
+    __table_args__=(
+        db.Index('ix_email_outbox_status_next_attempt','status','next_attempt_at'),
+    )
+
+    id=db.Column(db.Integer, primary_key=True)
+    recipients=db.Column(db.Text, nullable=False)  # comma separated
+    sender=db.Column(db.String(120), nullable=True)
+    subject=db.Column(db.String(200), nullable=False)
+    body=db.Column(db.Text, nullable=False)
+    # pending -> sending -> sent, or back to pending with a backoff, or dead
+    status=db.Column(db.String(10), nullable=False, default="pending")
+    attempts=db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at=db.Column(db.DateTime, nullable=False)
+    claim_token=db.Column(db.String(32), nullable=True)
+    claimed_at=db.Column(db.DateTime, nullable=True)
+    last_error=db.Column(db.Text, nullable=True)
+    created_at=db.Column(db.DateTime, nullable=False)
+    sent_at=db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return{
+            "id":self.id,
+            "recipients":self.recipients.split(","),
+            "subject":self.subject,
+            "status":self.status,
+            "attempts":self.attempts,
+            "last_error":self.last_error,
+            "next_attempt_at":self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "sent_at":self.sent_at.isoformat() if self.sent_at else None
+        }
+
+    def __repr__(self):
+        return f"<EmailOutbox id={self.id} status={self.status} attempts={self.attempts} subject={self.subject}>"
@@ -0,0 +1,23 @@
+from server.extensions import db
+
+class GroupLedger(db.Model):
+    """
+    Running group-wide totals, one row per metric ("payments",
+    "payments:<payname>", "shares", "dividends", "penalties", "loans").
+    Kept current by server/ledger.py in the same transaction as each write.
+    """
+    __tablename__='group_ledger'
+
+    metric=db.Column(db.String(60), primary_key=True)
+    total=db.Column(db.Numeric(14,2), nullable=False, default=0)
+    count=db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return{
+            "metric":self.metric,
+            "total":float(self.total),
+            "count":self.count
+        }
+
+    def __repr__(self):
+        return f"<GroupLedger metric={self.metric} total={self.total} count={self.count}>"
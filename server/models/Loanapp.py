@@ -1,4 +1,5 @@
 from server.extensions import db
+from server.serialization import compile_serializer
 
 class Loanapp(db.Model):
     __tablename__='loanapps'
@@ -12,14 +13,13 @@ class Loanapp(db.Model):
     #relationship
     user=db.relationship('User',back_populates="loanapps")
 
+    _serialize=compile_serializer(
+        ("memberId","amount","interest","year","monthrepay"),
+        money=("amount","interest","monthrepay"),
+    )
+
     def to_dict(self):
-        return{
-            "memberId":self.memberId,
-            "amount":float(self.amount),
-            "interest":float(self.interest),
-            "year":self.year,
-            "monthrepay":float(self.monthrepay)
-        }
+        return self._serialize()
     def __repr__(self):
         return f"<Loanapp amount={self.amount} interest={self.interest} monthly_repay={self.monthrepay}>"
 
@@ -1,7 +1,15 @@
 from server.extensions import db
+from server.serialization import compile_serializer
 
 class Payments(db.Model):
     __tablename__='payments'
+    # keyset pagination walks paymentId desc; each filter gets a composite index
+    __table_args__=(
+        db.Index('ix_payments_memberId_paymentId','memberId','paymentId'),
+        db.Index('ix_payments_method_paymentId','method','paymentId'),
+        db.Index('ix_payments_payname_paymentId','payname','paymentId'),
+        db.Index('ix_payments_amount','amount'),
+    )
     paymentId=db.Column(db.Integer, primary_key=True)
     memberId=db.Column(db.Integer,db.ForeignKey('users.memberId'), nullable=False)
     payname=db.Column(db.String(30), nullable=False)
@@ -12,15 +20,13 @@ class Payments(db.Model):
     #relationships
     user=db.relationship('User',back_populates="payments")
     
+    _serialize=compile_serializer(
+        ("paymentId","memberId","payname","amount","method","receipt"),
+        money=("amount",),
+    )
+
     def to_dict(self):
-        return{
-        "paymentId":self.paymentId,
-        "memberId":self.memberId,
-        "payname":self.payname,
-        "amount":float(self.amount),
-        "method":self.method,
-        "receipt":self.receipt
-        }
+        return self._serialize()
     
     def __repr__(self):
         return f"<Payments paymentId={self.paymentId} memberId={self.memberId}payname={self.payname} amount={self.amount} method={self.method} receipt={self.receipt}>"
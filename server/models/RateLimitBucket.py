@@ -0,0 +1,13 @@
+from server.extensions import db
+
+class RateLimitBucket(db.Model):
+    """Token bucket shared by all workers when RATE_LIMIT_STORAGE=database (see server/rate_limit.py)."""
+    __tablename__='rate_limit_buckets'
+
+    key=db.Column(db.String(80), primary_key=True)  # policy:kind:digest
+    tokens=db.Column(db.Float, nullable=False)
+    updated_at=db.Column(db.Float, nullable=False, index=True)  # epoch seconds
+    allowed=db.Column(db.Boolean, nullable=False, default=True)  # outcome of the last hit
+
+    def __repr__(self):
+        return f"<RateLimitBucket {self.key} tokens={self.tokens:.2f}>"
@@ -1,4 +1,5 @@
 from server.extensions import db
+from server.serialization import compile_serializer
 
 class Shares(db.Model):
     __tablename__='shares'
@@ -11,13 +12,13 @@ class Shares(db.Model):
     #relationship
     user=db.relationship('User',back_populates='share')
     
+    _serialize=compile_serializer(
+        ("memberId","shares","dividends","penalties"),
+        money=("shares","dividends","penalties"),
+    )
+
     def to_dict(self):
-        return{
-            "memberId":self.memberId,
-            "shares":float(self.shares),
-            "dividends":float(self.dividends),
-            "penalties": float(self.penalties)
-        }
+        return self._serialize()
     def __repr__(self):
         return f"<Shares memberId={self.memberId} shares={self.shares} dividends={self.dividends} penalties={self.penalties}>"
 
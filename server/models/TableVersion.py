@@ -0,0 +1,12 @@
+from server.extensions import db
+
+class TableVersion(db.Model):
+    """Change counter per table, bumped in every transaction that writes to it."""
+    __tablename__='table_versions'
+
+    name=db.Column(db.String(50), primary_key=True)
+    version=db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at=db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<TableVersion {self.name} v{self.version} at {self.updated_at}>"
@@ -0,0 +1,23 @@
+from server.extensions import db
+
+class TokenRevocation(db.Model):
+    """
+    Access tokens of memberId with a "ver" claim below min_version are revoked
+    (see server/revocation.py). Rows matter until expires_at, when every token
+    they could apply to has expired anyway.
+    """
+    __tablename__='token_revocations'
+    __table_args__ = (
+        db.Index('ix_token_revocations_memberId', 'memberId'),
+        db.Index('ix_token_revocations_expires_at', 'expires_at'),
+    )
+
+    id=db.Column(db.Integer, primary_key=True)
+    memberId=db.Column(db.Integer, nullable=False)  # no FK: outlives a deleted user
+    min_version=db.Column(db.Integer, nullable=False)
+    reason=db.Column(db.String(20), nullable=False)
+    created_at=db.Column(db.DateTime, nullable=False)
+    expires_at=db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<TokenRevocation memberId={self.memberId} below v{self.min_version} ({self.reason})>"
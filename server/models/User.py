@@ -1,9 +1,14 @@
 # server/models/User.py
 from server.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from server.passwords import password_hasher
+from server.serialization import compile_serializer
 
 class User(db.Model):
     __tablename__ = 'users'
+    # ListUsers/AdminUsers filter on role
+    __table_args__ = (
+        db.Index('ix_users_role', 'role'),
+    )
 
     memberId = db.Column(db.Integer, primary_key=True)
     firstname = db.Column(db.String(25), nullable=False)
@@ -15,29 +20,30 @@ class User(db.Model):
 
     # Keep email_verified so we can mark verified users in DB
     email_verified = db.Column(db.Boolean, default=False)
+    # Login puts it in the token's "ver" claim; bumped to revoke (see server/revocation.py)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     # relationships (unchanged)
     share = db.relationship('Shares', uselist=False, back_populates='user')
     payments = db.relationship('Payments', back_populates="user", lazy=True)
     loanapps = db.relationship('Loanapp', back_populates="user", lazy=True)
 
-    # password helpers
+    # password helpers (hashing runs in the password_hasher pool)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
+
+    _serialize = compile_serializer(
+        ("memberId", "firstname", "lastname", "email", "phoneno", "role", "email_verified")
+    )
 
     def to_dict(self):
-        return {
-            "memberId": self.memberId,
-            "firstname": self.firstname,
-            "lastname": self.lastname,
-            "email": self.email,
-            "phoneno": self.phoneno,
-            "role": self.role,
-            "email_verified": self.email_verified
-        }
+        return self._serialize()
     
     def __repr__(self):
         return f"<User {self.firstname} {self.lastname} ({self.role})>"
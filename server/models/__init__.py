@@ -1,4 +1,10 @@
 from .User import User
 from .Loanapp import Loanapp
 from .Payments import Payments
-from .Shares import Shares
\ No newline at end of file
+from .Shares import Shares
+from .EmailOutbox import EmailOutbox
+from .GroupLedger import GroupLedger
+from .DividendRun import DividendRun
+from .TableVersion import TableVersion
+from .RateLimitBucket import RateLimitBucket
+from .TokenRevocation import TokenRevocation
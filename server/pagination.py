@@ -0,0 +1,49 @@
+# server/pagination.py
+"""
+Keyset (cursor) pagination helpers.
+
+Instead of OFFSET, each page asks for rows past the last key the client saw,
+so page 1000 costs the same index range scan as page 1 and no COUNT is run.
+"""
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def wants_keyset(args):
+    """Keyset mode is used as soon as the client sends a cursor or a limit."""
+    return "cursor" in args or "limit" in args
+
+
+def parse_keyset_args(args, default_limit=DEFAULT_LIMIT, max_limit=MAX_LIMIT):
+    """
+    Read ?cursor= and ?limit= from the query string.
+    Returns (cursor, limit); an empty cursor means the first page.
+    Raises ValueError on non-integer values.
+    """
+    raw_cursor = args.get("cursor") or None
+    cursor = int(raw_cursor) if raw_cursor is not None else None
+
+    limit = int(args.get("limit", default_limit))
+    if limit <= 0:
+        raise ValueError("limit must be greater than 0")
+    return cursor, min(limit, max_limit)
+
+
+def keyset_paginate(query, key_column, cursor, limit, descending=True):
+    """
+    Apply the keyset predicate, ordering and limit to query.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    One extra row is fetched to know whether another page exists.
+    """
+    if cursor is not None:
+        query = query.filter(key_column < cursor if descending else key_column > cursor)
+
+    order = key_column.desc() if descending else key_column.asc()
+    rows = query.order_by(order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(getattr(rows[-1], key_column.key))
+    return rows, next_cursor
@@ -0,0 +1,135 @@
+# server/passwords.py
+"""
+Password hashing off the request thread.
+
+werkzeug's scrypt/pbkdf2 are deliberately CPU-heavy; run inline, a burst of
+logins pins every worker. PasswordHasher sends the work to a small process
+pool (PASSWORD_HASH_WORKERS, 0 = inline) and caps how many hashes may be
+waiting for it, so excess logins fail fast instead of piling up: a caller
+that finds the queue full, or whose hash isn't done within
+PASSWORD_HASH_TIMEOUT, gets PasswordHasherBusy (a 503 from the routes).
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+DEFAULT_METHOD = "scrypt"
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hashes are already queued for the pool, or ours took too long."""
+
+
+def canonical_method(method):
+    """
+    Expand a werkzeug method string to the form stored in hashes, e.g.
+    "scrypt" -> "scrypt:32768:8:1", "pbkdf2" -> "pbkdf2:sha256:1000000".
+    """
+    name, *args = method.split(":")
+    if name == "scrypt":
+        n, r, p = args if args else (2**15, 8, 1)
+        return f"scrypt:{int(n)}:{int(r)}:{int(p)}"
+    if name == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{int(iterations)}"
+    raise ValueError(f"Invalid hash method '{method}'.")
+
+
+def _pid_after(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+class PasswordHasher:
+    def __init__(self, method=DEFAULT_METHOD, workers=0, max_pending=None, timeout=10):
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self.configure(method, workers, max_pending, timeout)
+
+    def init_app(self, app):
+        self.configure(
+            method=app.config.get("PASSWORD_HASH_METHOD", DEFAULT_METHOD),
+            workers=app.config.get("PASSWORD_HASH_WORKERS", 0),
+            max_pending=app.config.get("PASSWORD_HASH_MAX_PENDING"),
+            timeout=app.config.get("PASSWORD_HASH_TIMEOUT", 10),
+        )
+        app.extensions["password_hasher"] = self
+
+    def configure(self, method=DEFAULT_METHOD, workers=0, max_pending=None, timeout=10):
+        self.shutdown()
+        self.method = canonical_method(method)
+        self.workers = workers
+        self.timeout = timeout
+        # hashes running plus queued; beyond this callers get PasswordHasherBusy
+        self._slots = threading.BoundedSemaphore(max_pending or max(workers, 1) * 4)
+
+    def _executor(self):
+        """The pool is created lazily in each process, so it is fork safe."""
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Password hashing queue is full")
+        try:
+            future = self._executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot is held until the hash is really done, even if we stop waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()  # only helps while it is still queued
+            raise PasswordHasherBusy("Password hashing timed out")
+
+    def warm(self):
+        """Start every pool process now rather than on the first logins."""
+        if self.workers <= 0:
+            return 0
+        pool = self._executor()
+        # the pool only spawns a process when none is idle, so keep each busy a moment
+        futures = [pool.submit(_pid_after, 0.1) for _ in range(self.workers)]
+        return len({future.result(timeout=self.timeout) for future in futures})
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with a different method or cost."""
+        stored_method = password_hash.split("$", 1)[0]
+        try:
+            return canonical_method(stored_method) != self.method
+        except ValueError:
+            return True
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,153 @@
+# server/projections.py
+"""
+Column projections for list endpoints.
+
+Each query selects only the columns its response needs and joins related
+names in the same statement, so a page of N rows is one SELECT instead of
+hydrating N ORM entities (and, for relationships, N more lazy loads).
+"""
+from sqlalchemy import func
+from server.extensions import db
+from server.serialization import rows_serializer
+from server.models.Loanapp import Loanapp
+from server.models.Payments import Payments
+from server.models.Shares import Shares
+from server.models.User import User
+
+USER_COLUMNS = (
+    User.memberId,
+    User.firstname,
+    User.lastname,
+    User.email,
+    User.phoneno,
+    User.role,
+    User.email_verified,
+)
+
+LATEST_PAYMENT_COLUMNS = (
+    Payments.paymentId,
+    Payments.payname,
+    Payments.amount,
+    Payments.method,
+    Payments.receipt,
+)
+
+SHARES_COLUMNS = (
+    Shares.memberId,
+    Shares.shares,
+    Shares.dividends,
+    Shares.penalties,
+)
+
+
+def row_to_dict(row):
+    """Plain dict for a projected row; Numeric columns come out as float like to_dict()."""
+    return rows_serializer([row])(row)
+
+
+def rows_to_dicts(rows):
+    if not rows:
+        return []
+    serialize = rows_serializer(rows)
+    return [serialize(row) for row in rows]
+
+
+def users_query(role=None):
+    query = db.session.query(*USER_COLUMNS)
+    if role:
+        query = query.filter(User.role == role)
+    return query
+
+
+def member_directory_query(role="member"):
+    """memberId, names and email only -- what the admin pickers need."""
+    return (
+        db.session.query(User.memberId, User.firstname, User.lastname, User.email)
+        .filter(User.role == role)
+    )
+
+
+def loans_with_names_query():
+    return (
+        db.session.query(
+            Loanapp.memberId,
+            func.coalesce(User.firstname, "").label("firstname"),
+            Loanapp.amount,
+            Loanapp.interest,
+            Loanapp.year,
+            Loanapp.monthrepay,
+        )
+        .outerjoin(User, User.memberId == Loanapp.memberId)
+    )
+
+
+def payments_with_names_query():
+    return (
+        db.session.query(
+            Payments.paymentId,
+            Payments.memberId,
+            User.firstname,
+            Payments.payname,
+            Payments.amount,
+            Payments.method,
+            Payments.receipt,
+        )
+        .join(User, User.memberId == Payments.memberId)
+    )
+
+
+def shares_query(member_id=None):
+    query = db.session.query(*SHARES_COLUMNS)
+    if member_id is not None:
+        query = query.filter(Shares.memberId == member_id)
+    return query
+
+
+def member_summary_query(member_id, latest=0):
+    """
+    Everything the member dashboard shows in one statement: payment totals come
+    from scalar subqueries, shares and the loan from outer joins on the member,
+    and the latest `latest` payments from an outer join on the member's payments
+    numbered newest first. That is one row per latest payment, newest first, each
+    repeating the totals, or one row with NULL payment columns if there are none.
+    """
+    payments_total = (
+        db.session.query(func.coalesce(func.sum(Payments.amount), 0))
+        .filter(Payments.memberId == member_id)
+        .scalar_subquery()
+    )
+    payments_count = (
+        db.session.query(func.count(Payments.paymentId))
+        .filter(Payments.memberId == member_id)
+        .scalar_subquery()
+    )
+    latest_payments = (
+        db.session.query(
+            *LATEST_PAYMENT_COLUMNS,
+            func.row_number().over(order_by=Payments.paymentId.desc()).label("position"),
+        )
+        .filter(Payments.memberId == member_id)
+        .subquery("latest_payments")
+    )
+    return (
+        db.session.query(
+            payments_total.label("total_contributions"),
+            payments_count.label("payment_count"),
+            Shares.shares,
+            Shares.dividends,
+            Shares.penalties,
+            Loanapp.amount.label("loan_amount"),
+            Loanapp.interest.label("loan_interest"),
+            Loanapp.year.label("loan_year"),
+            Loanapp.monthrepay.label("loan_monthrepay"),
+            *(latest_payments.c[column.key] for column in LATEST_PAYMENT_COLUMNS),
+        )
+        .select_from(User)
+        .outerjoin(Shares, Shares.memberId == User.memberId)
+        .outerjoin(Loanapp, Loanapp.memberId == User.memberId)
+        .outerjoin(latest_payments, latest_payments.c.position <= latest)
+        .filter(User.memberId == member_id)
+        .order_by(latest_payments.c.position)
+    )
+
+
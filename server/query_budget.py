@@ -0,0 +1,168 @@
+# server/query_budget.py
+"""
+SQL statement budgets.
+
+A resource declares how many statements one request may run:
+
+    class AllLoans(Resource):
+        query_budget = 4                      # or {"get": 4, "post": 3}
+
+and every request to it is counted from just before the view until just
+after it. Over budget, QUERY_BUDGET_MODE decides what happens:
+  warn   log the statements with the code that issued them (default with DEBUG)
+  raise  raise QueryBudgetExceeded, failing the request or test (default with TESTING)
+  off    don't count (default otherwise)
+
+count_queries() is the same counter for scripts and tests:
+
+    with count_queries(max_queries=3) as counter:
+        client.get("/loans", headers=admin)
+    counter.count
+"""
+import os
+import threading
+import traceback
+from contextlib import contextmanager
+
+from flask import current_app, g, request
+from server.sql_tracking import on_statement
+
+MODES = ("off", "warn", "raise")
+_SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+_local = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    def __init__(self, max_queries=None, label="block", capture_stacks=True):
+        self.max_queries = max_queries
+        self.label = label
+        self.capture_stacks = capture_stacks
+        self.statements = []  # (sql, stack lines)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def exceeded(self):
+        return self.max_queries is not None and self.count > self.max_queries
+
+    def record(self, statement):
+        stack = _app_stack() if self.capture_stacks else []
+        self.statements.append((statement, stack))
+
+    def report(self):
+        lines = [f"{self.label} ran {self.count} SQL statements (budget {self.max_queries}):"]
+        for number, (statement, stack) in enumerate(self.statements, 1):
+            lines.append(f"  {number}. {' '.join(statement.split())[:300]}")
+            lines.extend(f"       {frame}" for frame in stack)
+        return "\n".join(lines)
+
+    def check(self):
+        if self.exceeded:
+            raise QueryBudgetExceeded(self.report())
+
+
+def _app_stack():
+    """The application frames (not library ones) that led to a statement."""
+    return [
+        f"{os.path.relpath(frame.filename, os.path.dirname(_SERVER_DIR))}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(_SERVER_DIR) and not frame.filename.endswith(("sql_tracking.py", "query_budget.py"))
+    ]
+
+
+def _active():
+    if not hasattr(_local, "counters"):
+        _local.counters = []
+    return _local.counters
+
+
+@on_statement
+def _count_statement(conn, statement, parameters, seconds, executemany):
+    for counter in getattr(_local, "counters", ()):
+        counter.record(statement)
+
+
+@contextmanager
+def count_queries(max_queries=None, label="block"):
+    """Count statements run by this thread inside the block; raise if over max_queries."""
+    counter = QueryCounter(max_queries, label)
+    _active().append(counter)
+    try:
+        yield counter
+    finally:
+        _active().remove(counter)
+    counter.check()
+
+
+@contextmanager
+def uncounted():
+    """Statements the framework runs on a request's behalf (e.g. revocation sync), not the view's."""
+    counters = getattr(_local, "counters", None)
+    _local.counters = []
+    try:
+        yield
+    finally:
+        _local.counters = counters if counters is not None else []
+
+
+# ----------------- Per-resource budgets -----------------
+def budget_for(view_class, method):
+    budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(method.lower())
+    return budget
+
+
+def _mode():
+    mode = current_app.config.get("QUERY_BUDGET_MODE")
+    if mode:
+        return mode
+    if current_app.testing:
+        return "raise"
+    return "warn" if current_app.debug else "off"
+
+
+class QueryBudgets:
+    def init_app(self, app):
+        mode = app.config.get("QUERY_BUDGET_MODE")
+        if mode and mode not in MODES:
+            raise ValueError(f"QUERY_BUDGET_MODE must be one of {', '.join(MODES)}")
+        app.before_request(self._start)
+        app.after_request(self._check)
+        app.teardown_request(self._stop)
+        app.extensions["query_budgets"] = self
+
+    def _start(self):
+        view = current_app.view_functions.get(request.endpoint)
+        budget = budget_for(getattr(view, "view_class", None), request.method)
+        if budget is None:
+            return
+        mode = _mode()
+        if mode == "off":
+            return
+        g.query_budget_mode = mode
+        g.query_counter = QueryCounter(budget, f"{request.method} {request.path}")
+        _active().append(g.query_counter)
+
+    def _check(self, response):
+        counter = self._stop()
+        if counter is not None and counter.exceeded:
+            if g.query_budget_mode == "raise":
+                counter.check()
+            current_app.logger.warning("Query budget exceeded: %s", counter.report())
+        return response
+
+    def _stop(self, exc=None):
+        counter = g.pop("query_counter", None)
+        if counter is not None and counter in _active():
+            _active().remove(counter)
+        return counter
+
+
+query_budgets = QueryBudgets()
@@ -0,0 +1,134 @@
+# server/query_plans.py
+"""
+Query-plan regression check for the hot queries behind each route.
+
+`flask check-query-plans` runs EXPLAIN for every entry in HOT_QUERIES against
+the configured database (SQLite locally, Postgres in CI/production) and exits
+non-zero if any of them reads a table with a full scan, so a dropped index or
+a rewritten filter can't silently regress an access path.
+
+Run it against a migrated database:
+
+    DATABASE_URL=sqlite:///plans.db flask db upgrade
+    DATABASE_URL=sqlite:///plans.db flask check-query-plans
+"""
+import re
+import sys
+
+import click
+from sqlalchemy import text
+from server.extensions import db
+from server.models.EmailOutbox import EmailOutbox
+from server.models.Loanapp import Loanapp
+from server.models.Payments import Payments
+from server.models.Shares import Shares
+from server.models.User import User
+from server.projections import (
+    loans_with_names_query,
+    member_directory_query,
+    member_summary_query,
+    payments_with_names_query,
+    users_query,
+)
+
+# Sample values only need the right types; plans don't depend on data here.
+MEMBER_ID = 1
+CURSOR = 1000
+PAGE = 51
+
+# name -> callable returning a Query/Select, built inside an app context
+HOT_QUERIES = {
+    "Login: user by email": lambda: User.query.filter_by(email="member@example.com"),
+    "identity: user by id": lambda: User.query.filter_by(memberId=MEMBER_ID),
+    "ListUsers ?role=": lambda: users_query(role="admin"),
+    "AdminUsers: members": lambda: member_directory_query(role="member"),
+    "ViewMyPayments": lambda: Payments.query.filter_by(memberId=MEMBER_ID),
+    "ViewAllPayments keyset page": lambda: payments_with_names_query()
+        .filter(Payments.paymentId < CURSOR)
+        .order_by(Payments.paymentId.desc()).limit(PAGE),
+    "ViewAllPayments ?memberId=": lambda: payments_with_names_query()
+        .filter(Payments.memberId == MEMBER_ID)
+        .order_by(Payments.paymentId.desc()).limit(PAGE),
+    "ViewAllPayments ?method=": lambda: payments_with_names_query()
+        .filter(Payments.method == "mpesa")
+        .order_by(Payments.paymentId.desc()).limit(PAGE),
+    "ViewAllPayments ?payname=": lambda: payments_with_names_query()
+        .filter(Payments.payname == "contribution")
+        .order_by(Payments.paymentId.desc()).limit(PAGE),
+    "MakePayment: receipt lookup": lambda: Payments.query.filter_by(receipt="RCPT0001"),
+    "MyLoans": lambda: Loanapp.query.filter_by(memberId=MEMBER_ID),
+    "AllLoans keyset page": lambda: loans_with_names_query()
+        .filter(Loanapp.memberId > CURSOR)
+        .order_by(Loanapp.memberId).limit(PAGE),
+    "MemberShares": lambda: Shares.query.filter_by(memberId=MEMBER_ID),
+    "MemberSummary": lambda: member_summary_query(MEMBER_ID, latest=5),
+    "outbox: due emails": lambda: db.session.query(EmailOutbox.id)
+        .filter(EmailOutbox.status == "pending")
+        .order_by(EmailOutbox.id).limit(20),
+}
+
+# SQLite: "SCAN payments" (older versions: "SCAN TABLE payments") is a full scan,
+# "SCAN payments USING [COVERING] INDEX ..." is not
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+_POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def _compile(query):
+    stmt = getattr(query, "statement", query)
+    return str(stmt.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def explain(query):
+    """Return the plan lines for query on the current database."""
+    sql = _compile(query)
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        rows = db.session.execute(text("EXPLAIN QUERY PLAN " + sql)).all()
+        return [row[-1] for row in rows]
+    if dialect == "postgresql":
+        # tiny CI tables always favour seq scans; ask whether an index path exists
+        db.session.execute(text("SET LOCAL enable_seqscan = off"))
+        rows = db.session.execute(text("EXPLAIN " + sql)).all()
+        return [row[0] for row in rows]
+    raise click.ClickException(f"EXPLAIN checks are not supported on {dialect}")
+
+
+def full_scans(plan_lines):
+    """Tables the plan reads with a full table scan."""
+    pattern = _SQLITE_FULL_SCAN if db.engine.dialect.name == "sqlite" else _POSTGRES_FULL_SCAN
+    scans = []
+    for line in plan_lines:
+        match = pattern.search(line.strip())
+        if match:
+            scans.append(match.group(1))
+    return scans
+
+
+def check_query_plans(queries=None):
+    """Return {name: (plan_lines, full_scan_tables)} for every hot query."""
+    results = {}
+    for name, build in (queries or HOT_QUERIES).items():
+        try:
+            plan = explain(build())
+        finally:
+            db.session.rollback()
+        results[name] = (plan, full_scans(plan))
+    return results
+
+
+@click.command("check-query-plans")
+@click.option("--verbose", "-v", is_flag=True, help="Print every plan, not just failures.")
+def check_query_plans_command(verbose):
+    """Fail if a hot route query falls back to a full table scan."""
+    failures = 0
+    for name, (plan, scans) in check_query_plans().items():
+        status = "FULL SCAN " + ", ".join(scans) if scans else "ok"
+        click.echo(f"{name:<34} {status}")
+        if scans:
+            failures += 1
+        if scans or verbose:
+            for line in plan:
+                click.echo(f"    {line}")
+    if failures:
+        click.echo(f"{failures} query plan regression(s)", err=True)
+        sys.exit(1)
@@ -0,0 +1,208 @@
+# server/rate_limit.py
+"""
+Token-bucket rate limits for the unauthenticated endpoints that cost CPU
+or mail: Login and Register hash passwords, RequestPasswordReset sends an
+email. A resource opts in by naming its policy:
+
+    class Login(Resource):
+        rate_limit = "login"
+
+and every request to it takes a token from two buckets, one for the client
+IP and one for the submitted email:
+
+    RATE_LIMIT_LOGIN_IP="20/minute"     capacity 20, refilled at 20 per minute
+    RATE_LIMIT_LOGIN_EMAIL="5/minute"   "" turns that bucket off
+
+The check runs in a before_request hook, so a request over the limit gets
+a 429 with Retry-After before any hashing, mail or query of its own.
+
+RATE_LIMIT_STORAGE picks where buckets live:
+  memory    per process (the default); under gunicorn each worker keeps its
+            own buckets, so a client can get up to WEB_CONCURRENCY times the limit
+  database  the rate_limit_buckets table, one upsert per bucket, shared by
+            every worker and dyno
+Behind a proxy or load balancer set RATE_LIMIT_PROXY_COUNT to the number of
+proxies in front of the app so the client IP is read from X-Forwarded-For
+(the production profile assumes one, the Procfile deployment's router).
+With it at 0 every client would share the proxy's address, and so one IP
+bucket; the first request carrying X-Forwarded-For logs an error about it.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+from sqlalchemy import case, delete, func
+
+from server.extensions import db
+from server.models.RateLimitBucket import RateLimitBucket
+from server.sql import dialect_insert
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+STORAGES = ("memory", "database")
+MEMORY_MAX_KEYS = 10000
+PRUNE_EVERY_SECONDS = 3600
+PRUNE_AFTER_SECONDS = 86400
+
+
+def parse_rate(text):
+    """"5/minute" -> (capacity 5, refill 5/60 tokens per second); None for ""."""
+    if not text:
+        return None
+    try:
+        count, period = text.replace(" ", "").split("/")
+        count = int(count)
+        unit = period.rstrip("s")
+        seconds = PERIODS[unit] if unit in PERIODS else float(period)
+    except ValueError:
+        raise ValueError(f"Invalid rate limit {text!r}, expected e.g. '5/minute'")
+    if count < 1 or seconds <= 0:
+        raise ValueError(f"Invalid rate limit {text!r}")
+    return count, count / seconds
+
+
+def _digest(value):
+    # bucket keys never hold an email or IP in the clear
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+class MemoryBackend:
+    """Buckets in this process, least recently used dropped beyond max_keys."""
+
+    def __init__(self, max_keys=MEMORY_MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> [tokens, updated]
+
+    def hit(self, key, capacity, rate, now):
+        """Take one token; returns (allowed, tokens left)."""
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            tokens = capacity if bucket is None else min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = [tokens, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseBackend:
+    """Buckets in rate_limit_buckets, updated with one atomic upsert per hit."""
+
+    def __init__(self):
+        self._last_prune = 0.0
+
+    def hit(self, key, capacity, rate, now):
+        table = RateLimitBucket.__table__
+        engine = db.engine  # always the primary, on its own short transaction
+        least = func.least if engine.dialect.name == "postgresql" else func.min
+        refilled = least(float(capacity), table.c.tokens + (now - table.c.updated_at) * rate)
+
+        stmt = dialect_insert(table, bind=engine)
+        if stmt is None:
+            raise RuntimeError(f"RATE_LIMIT_STORAGE=database needs Postgres or SQLite, not {engine.dialect.name}")
+        stmt = stmt.values(key=key, tokens=float(capacity - 1), updated_at=now, allowed=True)
+        # every SET expression sees the old row, so `allowed` and `tokens` agree
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={
+                "allowed": refilled >= 1,
+                "tokens": case((refilled >= 1, refilled - 1), else_=refilled),
+                "updated_at": now,
+            },
+        ).returning(table.c.allowed, table.c.tokens)
+        with engine.begin() as conn:
+            allowed, tokens = conn.execute(stmt).one()
+            if now - self._last_prune > PRUNE_EVERY_SECONDS:
+                self._last_prune = now
+                conn.execute(delete(table).where(table.c.updated_at < now - PRUNE_AFTER_SECONDS))
+        return bool(allowed), tokens
+
+    def clear(self):
+        with db.engine.begin() as conn:
+            conn.execute(delete(RateLimitBucket.__table__))
+
+
+class RateLimiter:
+    def __init__(self):
+        self.enabled = True
+        self.backend = MemoryBackend()
+        self.proxy_count = 0
+        self._policies = {}
+        self._warned_proxy = False
+
+    def init_app(self, app):
+        self.enabled = app.config.get("RATE_LIMIT_ENABLED", True)
+        storage = app.config.get("RATE_LIMIT_STORAGE", "memory")
+        if storage not in STORAGES:
+            raise ValueError(f"RATE_LIMIT_STORAGE must be one of {', '.join(STORAGES)}")
+        self.backend = DatabaseBackend() if storage == "database" else MemoryBackend()
+        self.proxy_count = app.config.get("RATE_LIMIT_PROXY_COUNT", 0)
+        self._warned_proxy = False
+        # parse every RATE_LIMIT_<POLICY>_<IP|EMAIL> now, so a typo fails at startup
+        self._policies = {
+            name: parse_rate(value)
+            for name, value in app.config.items()
+            if name.startswith("RATE_LIMIT_") and name.endswith(("_IP", "_EMAIL"))
+        }
+        app.before_request(self._check)
+        app.extensions["rate_limiter"] = self
+
+    def client_ip(self):
+        if self.proxy_count:
+            forwarded = [ip.strip() for ip in request.headers.get("X-Forwarded-For", "").split(",") if ip.strip()]
+            if len(forwarded) >= self.proxy_count:
+                return forwarded[-self.proxy_count]
+        elif "X-Forwarded-For" in request.headers and not self._warned_proxy:
+            self._warned_proxy = True
+            current_app.logger.error(
+                "Request came through a proxy (X-Forwarded-For) but RATE_LIMIT_PROXY_COUNT is 0: "
+                "all clients share the proxy's IP rate limit. Set RATE_LIMIT_PROXY_COUNT."
+            )
+        return request.remote_addr or "unknown"
+
+    def _check(self):
+        if not self.enabled or request.method == "OPTIONS":  # CORS preflights are free
+            return None
+        view = current_app.view_functions.get(request.endpoint)
+        policy = getattr(getattr(view, "view_class", None), "rate_limit", None)
+        if policy is None:
+            return None
+
+        buckets = [("ip", self.client_ip())]
+        body = request.get_json(silent=True)
+        email = (body.get("email") if isinstance(body, dict) else None) or request.form.get("email")
+        if isinstance(email, str) and email.strip():
+            buckets.append(("email", email.strip().lower()))
+
+        now = time.time()
+        for kind, value in buckets:
+            rate = self._policies.get(f"RATE_LIMIT_{policy.upper()}_{kind.upper()}")
+            if rate is None:
+                continue
+            capacity, refill = rate
+            try:
+                allowed, tokens = self.backend.hit(f"{policy}:{kind}:{_digest(value)}", capacity, refill, now)
+            except Exception as e:
+                # never lock everyone out because the limiter's storage is down
+                current_app.logger.warning("Rate limiter unavailable, allowing request: %s", e)
+                return None
+            if not allowed:
+                retry_after = max(1, math.ceil((1 - tokens) / refill))
+                return (
+                    {"msg": "Too many attempts, please try again later"},
+                    429,
+                    {"Retry-After": str(retry_after)},
+                )
+        return None
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,137 @@
+# server/replicas.py
+"""
+Read-replica routing.
+
+With REPLICA_DATABASE_URL set, the app gets a "replica" bind and GET/HEAD
+requests read from it (RoutingSession keeps every write on the primary).
+A resource that must read from the primary even on GET sets
+`read_replica = False`.
+
+Read-your-writes: a write request by a logged-in member that committed
+answers with a signed, timestamped mark of their memberId, as the
+replica_sticky cookie and the X-Replica-Sticky header (for clients without
+cookies to send back). For REPLICA_STICKY_SECONDS their GETs carrying it go
+to the primary, so /payments/me shows the payment they just made even while
+the replica lags. The mark lives on the client, so it holds whichever
+gunicorn worker serves the next request and costs the primary nothing.
+
+Locally, two SQLite files stand in for primary and replica:
+
+    DATABASE_URL=sqlite:///primary.db REPLICA_DATABASE_URL=sqlite:///replica.db flask replica sync
+"""
+import click
+from flask import current_app, request
+from flask.cli import AppGroup
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from itsdangerous import BadSignature, TimestampSigner
+from jwt.exceptions import PyJWTError
+from sqlalchemy import event
+from server.extensions import db
+from server.routing_session import USE_REPLICA, RoutingSession
+
+READ_METHODS = ("GET", "HEAD")
+STICKY_COOKIE = "replica_sticky"
+STICKY_HEADER = "X-Replica-Sticky"
+# session.info key set once the request's session has committed
+COMMITTED = "committed"
+
+
+def _request_member_id(verify):
+    """memberId from the request's JWT, or None for anonymous/invalid tokens."""
+    try:
+        if verify:
+            verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except (JWTExtendedException, PyJWTError, RuntimeError):
+        return None
+    try:
+        return int(identity) if identity is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _view_allows_replica():
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(getattr(view, "view_class", None), "read_replica", True)
+
+
+def _signer():
+    return TimestampSigner(current_app.config["JWT_SECRET_KEY"], salt="replica-sticky")
+
+
+def sticky_mark(member_id):
+    """A mark that keeps member_id's reads on the primary, timestamped now."""
+    return _signer().sign(str(member_id)).decode()
+
+
+def is_sticky(member_id, mark, seconds):
+    """True if mark is member_id's, untampered and under `seconds` old."""
+    if not mark:
+        return False
+    try:
+        return _signer().unsign(mark, max_age=seconds).decode() == str(member_id)
+    except BadSignature:  # also a mark that has expired
+        return False
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _note_commit(session):
+    session.info[COMMITTED] = True
+
+
+class ReplicaRouter:
+    def init_app(self, app):
+        app.cli.add_command(replica_cli)
+        if not app.config.get("SQLALCHEMY_BINDS", {}).get("replica"):
+            return
+        app.before_request(self._route_request)
+        app.after_request(self._remember_write)
+        app.extensions["replica_router"] = self
+
+    def _route_request(self):
+        if request.method not in READ_METHODS or not _view_allows_replica():
+            return
+        mark = request.headers.get(STICKY_HEADER) or request.cookies.get(STICKY_COOKIE)
+        if mark:
+            member_id = _request_member_id(verify=True)
+            if member_id is not None and is_sticky(member_id, mark, current_app.config["REPLICA_STICKY_SECONDS"]):
+                return
+        db.session.info[USE_REPLICA] = True
+
+    def _remember_write(self, response):
+        if request.method in READ_METHODS or not db.session.info.get(COMMITTED):
+            return response
+        member_id = _request_member_id(verify=False)
+        if member_id is None:
+            return response
+        mark = sticky_mark(member_id)
+        response.headers[STICKY_HEADER] = mark
+        response.set_cookie(STICKY_COOKIE, mark, max_age=current_app.config["REPLICA_STICKY_SECONDS"],
+                            secure=request.is_secure, httponly=True, samesite="Lax")
+        return response
+
+
+replica_router = ReplicaRouter()
+
+
+# ----------------- CLI -----------------
+replica_cli = AppGroup("replica", help="Read replica helpers.")
+
+
+@replica_cli.command("sync")
+def sync_command():
+    """Copy the primary into the replica (SQLite development setups only)."""
+    replica = db.engines.get("replica")
+    if replica is None:
+        raise click.ClickException("No replica configured (set REPLICA_DATABASE_URL)")
+    if db.engine.dialect.name != "sqlite" or replica.dialect.name != "sqlite":
+        raise click.ClickException("sync only copies SQLite files; use database replication otherwise")
+
+    source, target = db.engine.raw_connection(), replica.raw_connection()
+    try:
+        source.driver_connection.backup(target.driver_connection)
+    finally:
+        source.close()
+        target.close()
+    click.echo(f"Copied {db.engine.url.database} -> {replica.url.database}")
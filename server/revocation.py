@@ -0,0 +1,182 @@
+# server/revocation.py
+"""
+Access-token revocation.
+
+Every user has a token_version; Login puts it in the token as the "ver"
+claim. revoke_tokens() bumps the version and records a token_revocations
+row ("memberId's tokens below version N are revoked"), so a role change,
+a removal or a password reset takes effect on the next request instead
+of when the one-hour token expires.
+
+The check runs in flask-jwt-extended's token_in_blocklist_loader, on every
+authenticated request, without touching the users table: each process
+keeps a Bloom filter of the members that have unexpired revocations. A
+member not in the filter (nearly everyone) is accepted straight away;
+only members in it -- the revoked ones plus ~REVOCATION_BLOOM_ERROR_RATE
+false positives -- cost one indexed lookup in the table.
+
+The filter learns about revocations made by other workers by reading the
+rows created since its last sync, at most every REVOCATION_SYNC_SECONDS
+(0 = before every check). In the worker that revoked, it is immediate.
+Each read reaches REVOCATION_SYNC_OVERLAP_SECONDS further back, because
+created_at is stamped before the revoking transaction commits; ids are no
+watermark either, as Postgres hands them out before commit too.
+Expired rows are pruned and the filter rebuilt once a token lifetime has
+passed or it holds more than REVOCATION_BLOOM_CAPACITY members.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import delete, func, select
+
+from server.extensions import db, jwt
+from server.models.TokenRevocation import TokenRevocation
+from server.query_budget import uncounted
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class BloomFilter:
+    """Fixed-size set of ints with no false negatives and ~error_rate false positives."""
+
+    def __init__(self, capacity=10000, error_rate=0.01):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(str(key).encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class TokenRevocations:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.filter = BloomFilter()
+        self.capacity = 10000
+        self.error_rate = 0.01
+        self.sync_seconds = 1
+        self.token_lifetime = timedelta(hours=1)
+        self.sync_overlap = timedelta(seconds=60)
+        self._synced_until = None  # created_at up to which rows have been read
+        self._seen = {}  # id -> created_at of rows read inside the overlap
+        self._last_sync = 0.0
+        self._built_at = 0.0
+
+    def init_app(self, app):
+        self.capacity = app.config.get("REVOCATION_BLOOM_CAPACITY", 10000)
+        self.error_rate = app.config.get("REVOCATION_BLOOM_ERROR_RATE", 0.01)
+        self.sync_seconds = app.config.get("REVOCATION_SYNC_SECONDS", 1)
+        self.sync_overlap = timedelta(seconds=app.config.get("REVOCATION_SYNC_OVERLAP_SECONDS", 60))
+        expires = app.config.get("JWT_ACCESS_TOKEN_EXPIRES", 3600)
+        self.token_lifetime = expires if isinstance(expires, timedelta) else timedelta(seconds=expires or 0)
+        self._synced_until = None  # rebuild from the table on first use
+        jwt.token_in_blocklist_loader(self._is_revoked)
+        app.extensions["token_revocations"] = self
+
+    # ----------------- Revoking -----------------
+    def revoke(self, user, reason):
+        """Revoke every token issued to user so far (the caller commits)."""
+        version = (user.token_version or 0) + 1
+        user.token_version = version
+        now = _utcnow()
+        db.session.add(TokenRevocation(
+            memberId=user.memberId, min_version=version, reason=reason,
+            created_at=now, expires_at=now + self.token_lifetime,
+        ))
+        # a rollback only leaves a false positive behind, which the table settles
+        with self._lock:
+            self.filter.add(user.memberId)
+
+    # ----------------- Checking -----------------
+    def _is_revoked(self, jwt_header, jwt_payload):
+        if jwt_payload.get("type") != "access":
+            return False
+        try:
+            member_id = int(jwt_payload.get("sub"))
+        except (TypeError, ValueError):
+            return False
+        with uncounted():
+            self._sync()
+            if member_id not in self.filter:
+                return False
+            with db.engine.connect() as conn:  # the primary: a replica may lag behind a revocation
+                min_version = conn.execute(
+                    select(func.max(TokenRevocation.min_version))
+                    .where(TokenRevocation.memberId == member_id, TokenRevocation.expires_at > _utcnow())
+                ).scalar()
+        return min_version is not None and jwt_payload.get("ver", 0) < min_version
+
+    def _sync(self):
+        now = time.monotonic()
+        rebuild = (
+            self._synced_until is None
+            or now - self._built_at > self.token_lifetime.total_seconds()
+            or self.filter.count > self.filter.capacity
+        )
+        if not rebuild and now - self._last_sync < self.sync_seconds:
+            return
+        with self._lock:
+            if rebuild:
+                self._rebuild(now)
+            else:
+                self._load_new()
+            self._last_sync = now
+
+    def _load_new(self):
+        now = _utcnow()
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                select(TokenRevocation.id, TokenRevocation.memberId, TokenRevocation.created_at)
+                .where(TokenRevocation.created_at > self._synced_until - self.sync_overlap)
+            ).all()
+        self._add(rows, now)
+
+    def _rebuild(self, now):
+        started = _utcnow()
+        with db.engine.begin() as conn:
+            conn.execute(delete(TokenRevocation).where(TokenRevocation.expires_at <= started))
+            rows = conn.execute(
+                select(TokenRevocation.id, TokenRevocation.memberId, TokenRevocation.created_at)
+            ).all()
+        members = {member_id for _, member_id, _ in rows}
+        self.filter = BloomFilter(max(self.capacity, len(members) * 2), self.error_rate)
+        self._seen = {}
+        self._add(rows, started)
+        self._built_at = now
+        current_app.logger.debug("Revocation filter rebuilt with %s member(s)", len(members))
+
+    def _add(self, rows, read_at):
+        """Add rows not seen yet; remember those a later read can return again."""
+        for row_id, member_id, created_at in rows:
+            if row_id not in self._seen:
+                self.filter.add(member_id)
+                self._seen[row_id] = created_at
+        self._synced_until = read_at
+        horizon = read_at - self.sync_overlap
+        self._seen = {row_id: created_at for row_id, created_at in self._seen.items() if created_at > horizon}
+
+
+revocations = TokenRevocations()
+
+
+def revoke_tokens(user, reason):
+    """Revoke user's access tokens; takes effect when the caller's transaction commits."""
+    revocations.revoke(user, reason)
@@ -0,0 +1,116 @@
+# server/routes/Export_routes.py
+import csv
+import io
+import zlib
+from flask_restful import Resource
+from flask import Response, request, stream_with_context
+from flask_jwt_extended import jwt_required
+from server.extensions import db
+from server.models.Loanapp import Loanapp
+from server.models.Payments import Payments
+from server.models.Shares import Shares
+from server.models.User import User
+from server.routes.User_route import role_required
+from server.serialization import dumps
+from server.projections import (
+    payments_with_names_query,
+    loans_with_names_query,
+    shares_query,
+    users_query,
+)
+
+# Rows fetched per round-trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+# ----------------- Export queries -----------------
+def _payments_export():
+    return payments_with_names_query().order_by(Payments.paymentId).statement
+
+
+def _loans_export():
+    return loans_with_names_query().order_by(Loanapp.memberId).statement
+
+
+def _shares_export():
+    return shares_query().order_by(Shares.memberId).statement
+
+
+def _users_export():
+    return users_query().order_by(User.memberId).statement
+
+
+EXPORTS = {
+    "payments": _payments_export,
+    "loans": _loans_export,
+    "shares": _shares_export,
+    "users": _users_export,
+}
+
+# ----------------- Helpers -----------------
+def _encode_batch(columns, rows, fmt):
+    """Encode one batch of rows as a single bytes chunk."""
+    if fmt == "csv":
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        return buf.getvalue().encode("utf-8")
+    return b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def _stream_export(stmt, fmt):
+    """
+    Yield the export batch by batch. yield_per makes SQLAlchemy use a
+    server-side cursor, so only one batch of rows is held in memory at a time.
+    """
+    result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    columns = list(result.keys())
+    if fmt == "csv":
+        yield _encode_batch(columns, [columns], fmt)
+    for rows in result.partitions():
+        yield _encode_batch(columns, rows, fmt)
+
+
+def _gzip_stream(chunks):
+    """Gzip a stream of byte chunks without buffering the whole body."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+# ----------------- Admin Routes -----------------
+class AdminExport(Resource):
+    query_budget = 2  # rows are streamed after the view returns
+    @jwt_required()
+    @role_required("admin")
+    def get(self, dataset):
+        """
+        Stream a full table as NDJSON (default) or CSV.
+        ?format=ndjson|csv, ?gzip=1 to compress the download.
+        """
+        build_query = EXPORTS.get(dataset)
+        if not build_query:
+            return {"msg": f"Unknown export '{dataset}'"}, 404
+
+        fmt = request.args.get("format", "ndjson").lower()
+        if fmt not in EXPORT_FORMATS:
+            return {"msg": "format must be 'ndjson' or 'csv'"}, 400
+        mimetype, extension = EXPORT_FORMATS[fmt]
+        filename = f"{dataset}.{extension}"
+
+        body = _stream_export(build_query(), fmt)
+        if request.args.get("gzip", "").lower() in ("true", "1", "t", "yes"):
+            body = _gzip_stream(body)
+            mimetype = "application/gzip"
+            filename += ".gz"
+
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
@@ -0,0 +1,69 @@
+# server/routes/Internal_routes.py
+import hmac
+from functools import wraps
+from flask_restful import Resource
+from flask import Response, current_app, request
+from flask_jwt_extended import jwt_required
+from server.extensions import db
+from server.db_pool import pool_stats
+from server.metrics import metrics, render
+from server.slow_queries import slow_query_log
+from server.routes.User_route import role_required
+
+
+def internal_access(fn):
+    """
+    Operational endpoints: open to monitoring that sends INTERNAL_API_TOKEN
+    (as X-Internal-Token or "Authorization: Bearer <token>", which is what
+    Prometheus' bearer_token sends), otherwise admins only.
+    """
+    admin_only = jwt_required()(role_required("admin")(fn))
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = current_app.config.get("INTERNAL_API_TOKEN")
+        supplied = request.headers.get("X-Internal-Token")
+        if supplied is None:
+            scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+            supplied = credentials if scheme == "Bearer" else None
+        if token and supplied and hmac.compare_digest(supplied.encode(), token.encode()):
+            return fn(*args, **kwargs)
+        return admin_only(*args, **kwargs)
+    return wrapper
+
+
+class PoolStats(Resource):
+    """Connection pool usage of the worker process serving the request"""
+    query_budget = 1
+    @internal_access
+    def get(self):
+        stats = {"pool": pool_stats(db.engine)}
+        replica = db.engines.get("replica")
+        if replica is not None:
+            stats["replica"] = pool_stats(replica)
+        return stats, 200
+
+
+class Metrics(Resource):
+    """Prometheus scrape target (all gunicorn workers when METRICS_DIR is shared)"""
+    query_budget = 1
+    @internal_access
+    def get(self):
+        return Response(render(metrics.collect()), mimetype="text/plain; version=0.0.4")
+
+
+class SlowQueries(Resource):
+    """Recent slow statements with their plans, and totals per statement"""
+    query_budget = 1
+    @internal_access
+    def get(self):
+        try:
+            limit = max(0, min(int(request.args.get("limit", 50)), 500))
+        except ValueError:
+            return {"msg": "limit must be an integer"}, 400
+        return {"slow_queries": slow_query_log.snapshot(limit)}, 200
+
+    @internal_access
+    def delete(self):
+        slow_query_log.clear()
+        return {"msg": "Slow query log cleared"}, 200
@@ -0,0 +1,16 @@
+# server/routes/Ledger_routes.py
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required
+from server.ledger import ledger_snapshot
+from server.routes.User_route import role_required
+from server.versioning import conditional_get
+
+
+class GroupTotals(Resource):
+    """Group-wide totals read from the maintained ledger, not the base tables"""
+    query_budget = 3
+    @jwt_required()
+    @role_required("admin")
+    @conditional_get("group_ledger")
+    def get(self):
+        return {"ledger": ledger_snapshot()}, 200
@@ -1,45 +1,66 @@
 # server/routes/Loan_routes.py
-from flask_restful import Resource, reqparse
+from flask_restful import Resource
 from flask import request, current_app
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import jwt_required
 from server.extensions import db
 from server.models.Loanapp import Loanapp
-from server.models.User import User
+from server.identity import current_user
+from server.pagination import wants_keyset, parse_keyset_args, keyset_paginate
+from server.projections import loans_with_names_query, rows_to_dicts
+from server.ledger import record_loan
+from server.versioning import conditional_get
+from server.validation import Schema, Field
+from server.amortization import monthly_payment, loan_schedule, portfolio_projection
 from server.routes.User_route import role_required  # ensure import path/casing matches your project
 
-# Loan input parser
-loan_parser = reqparse.RequestParser()
-loan_parser.add_argument("amount", type=float, required=True, help="Loan amount is required")
-loan_parser.add_argument("interest", type=float, required=False, default=0.08)
-loan_parser.add_argument("year", type=int, required=True, help="Loan year is required")
-loan_parser.add_argument("monthrepay", type=float, required=True, help="Monthly repayment is required")
+# Loan input schema
+loan_schema = Schema(
+    amount=Field(float, required=True, help="Loan amount is required",
+                 gt=0, message="Amount must be greater than 0"),
+    interest=Field(float, default=0.08, min=0, max=5,  # adjust upper bound to your business rules
+                   message="Interest value out of range"),
+    year=Field(int, required=True, help="Loan year is required",
+               gt=0, max=50, message="Year value out of range"),
+    monthrepay=Field(float, gt=0, message="Monthly repayment must be > 0"),  # computed if omitted
+)
+
+PROJECTION_MAX_MONTHS = 600
+
+
+def _resolve_monthrepay(amount, interest, year, monthrepay):
+    """
+    Check a client-supplied monthly repayment against the amortized
+    instalment (within LOAN_MONTHREPAY_TOLERANCE), or fill it in when omitted.
+    Returns (monthrepay, error_response).
+    """
+    expected = round(float(monthly_payment(amount, interest, year)), 2)
+    if monthrepay is None:
+        return expected, None
+    if abs(monthrepay - expected) > current_app.config.get("LOAN_MONTHREPAY_TOLERANCE", 1.0):
+        return None, ({
+            "msg": f"Monthly repayment should be {expected:.2f} for this amount, interest and year",
+            "expected_monthrepay": expected
+        }, 400)
+    return monthrepay, None
 
 
 class ApplyLoan(Resource):
+    query_budget = 6
     @jwt_required()  # ensure user is authenticated
     @role_required("member")   # role_required verifies JWT and role
     def post(self):
-        data = loan_parser.parse_args()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        data = loan_schema.parse()
+        user = current_user()
 
         if not user:
             return {"msg": "User not found"}, 404
 
-        # Basic validation
         amount = data["amount"]
-        interest = data.get("interest", 0.08)
+        interest = data["interest"]
         year = data["year"]
-        monthrepay = data["monthrepay"]
-
-        if amount <= 0:
-            return {"msg": "Amount must be greater than 0"}, 400
-        if not (0 <= interest <= 5):  # adjust upper bound to your business rules
-            return {"msg": "Interest value out of range"}, 400
-        if year <= 0 or year > 50:
-            return {"msg": "Year value out of range"}, 400
-        if monthrepay <= 0:
-            return {"msg": "Monthly repayment must be > 0"}, 400
+        monthrepay, error = _resolve_monthrepay(amount, interest, year, data["monthrepay"])
+        if error:
+            return error
 
         loan = Loanapp(
             memberId=user.memberId,
@@ -51,6 +72,7 @@ class ApplyLoan(Resource):
 
         db.session.add(loan)
         try:
+            record_loan(new_amount=amount)
             db.session.commit()
         except Exception as e:
             db.session.rollback()
@@ -61,11 +83,11 @@ class ApplyLoan(Resource):
 
 
 class MyLoans(Resource):
+    query_budget = 2
     @jwt_required()  # ensure user is authenticated
     @role_required("member")
     def get(self):
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user()
 
         if not user:
             return {"msg": "User not found"}, 404
@@ -75,29 +97,38 @@ class MyLoans(Resource):
 
 
 class AllLoans(Resource):
+    query_budget = 4
     @jwt_required()
     @role_required("admin")
+    @conditional_get("loanapps", "users")
     def get(self):
-        """Admin views all loans with optional pagination"""
+        """
+        Admin views all loans with optional pagination.
+        ?page=&per_page= uses offset pagination; ?limit=&cursor= switches to
+        keyset pagination on memberId, which skips the COUNT and the OFFSET.
+        """
+        keyset = wants_keyset(request.args)
         try:
-            page = int(request.args.get("page", 1))
-            per_page = int(request.args.get("per_page", 25))
+            if keyset:
+                cursor, limit = parse_keyset_args(request.args, default_limit=25)
+            else:
+                page = int(request.args.get("page", 1))
+                per_page = int(request.args.get("per_page", 25))
         except ValueError:
             return {"msg": "Invalid pagination values"}, 400
 
-        paged = Loanapp.query.paginate(page=page, per_page=per_page, error_out=False)
+        # member first name is joined in the same statement
+        query = loans_with_names_query()
+        if keyset:
+            items, next_cursor = keyset_paginate(query, Loanapp.memberId, cursor, limit, descending=False)
+        else:
+            paged = query.order_by(Loanapp.memberId).paginate(page=page, per_page=per_page, error_out=False)
+            items = paged.items
+
+        loans = rows_to_dicts(items)
 
-        # include member first name
-        loans = []
-        for loan in paged.items:
-            loans.append({
-                "memberId": loan.memberId,
-                "firstname": loan.user.firstname if loan.user else "",
-                "amount": float(loan.amount),
-                "interest": float(loan.interest),
-                "year": loan.year,
-                "monthrepay": float(loan.monthrepay)
-            })
+        if keyset:
+            return {"loans": loans, "limit": limit, "next_cursor": next_cursor}, 200
 
         return {
             "loans": loans,
@@ -108,6 +139,7 @@ class AllLoans(Resource):
         }, 200
 
 class UpdateLoan(Resource):
+    query_budget = 7
     @jwt_required()  # ensure user is authenticated
     @role_required("admin")
     def put(self, loan_id):
@@ -115,24 +147,19 @@ class UpdateLoan(Resource):
         if not loan:
             return {"msg": "Loan not found"}, 404
 
-        data = loan_parser.parse_args()
-
-        # validate
-        if data["amount"] <= 0:
-            return {"msg": "Amount must be greater than 0"}, 400
-        if not (0 <= data.get("interest", 0.08) <= 5):
-            return {"msg": "Interest value out of range"}, 400
-        if data["year"] <= 0 or data["year"] > 50:
-            return {"msg": "Year value out of range"}, 400
-        if data["monthrepay"] <= 0:
-            return {"msg": "Monthly repayment must be > 0"}, 400
+        data = loan_schema.parse()
+        monthrepay, error = _resolve_monthrepay(data["amount"], data["interest"], data["year"], data["monthrepay"])
+        if error:
+            return error
 
+        old_amount = loan.amount
         loan.amount = data["amount"]
         loan.interest = data["interest"]
         loan.year = data["year"]
-        loan.monthrepay = data["monthrepay"]
+        loan.monthrepay = monthrepay
 
         try:
+            record_loan(old_amount=old_amount, new_amount=data["amount"])
             db.session.commit()
         except Exception as e:
             db.session.rollback()
@@ -143,6 +170,7 @@ class UpdateLoan(Resource):
 
 
 class DeleteLoan(Resource):
+    query_budget = 6
     @jwt_required()  # ensure user is authenticated
     @role_required("admin")
     def delete(self, loan_id):
@@ -151,6 +179,7 @@ class DeleteLoan(Resource):
             return {"msg": "Loan not found"}, 404
 
         try:
+            record_loan(old_amount=loan.amount)
             db.session.delete(loan)
             db.session.commit()
         except Exception as e:
@@ -159,3 +188,53 @@ class DeleteLoan(Resource):
             return {"msg": "Failed to delete loan"}, 500
 
         return {"msg": "Loan deleted"}, 200
+
+
+class LoanSchedule(Resource):
+    query_budget = 2
+    @jwt_required()
+    @role_required("member", "admin")
+    def get(self, loan_id):
+        """Amortization schedule for one loan; members can only see their own"""
+        user = current_user()
+        if not user:
+            return {"msg": "User not found"}, 404
+        if user.role != "admin" and user.memberId != loan_id:
+            return {"msg": "Access denied"}, 403
+
+        loan = db.session.get(Loanapp, loan_id)
+        if not loan:
+            return {"msg": "Loan not found"}, 404
+
+        return {
+            "loan": loan.to_dict(),
+            "computed_monthrepay": round(float(monthly_payment(loan.amount, loan.interest, loan.year)), 2),
+            "schedule": loan_schedule(loan.amount, loan.interest, loan.year),
+        }, 200
+
+
+class LoanProjection(Resource):
+    query_budget = 2
+    @jwt_required()
+    @role_required("admin")
+    def get(self):
+        """
+        Portfolio cash-flow projection: expected repayments, interest and
+        outstanding principal per month across every loan, as if all started now.
+        Optional ?months= limits the horizon.
+        """
+        try:
+            horizon = int(request.args["months"]) if request.args.get("months") else None
+        except ValueError:
+            return {"msg": "months must be an integer"}, 400
+        if horizon is not None and not (0 < horizon <= PROJECTION_MAX_MONTHS):
+            return {"msg": f"months must be between 1 and {PROJECTION_MAX_MONTHS}"}, 400
+
+        loans = db.session.query(Loanapp.amount, Loanapp.interest, Loanapp.year).all()
+        projection = portfolio_projection(
+            [l.amount for l in loans],
+            [l.interest for l in loans],
+            [l.year for l in loans],
+            horizon=horizon,
+        )
+        return {"loans": len(loans), "projection": projection}, 200
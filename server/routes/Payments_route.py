@@ -1,51 +1,140 @@
 # server/routes/Payments_route.py
-from flask_restful import Resource, reqparse
+from flask_restful import Resource
 from flask import current_app, request
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import jwt_required
 from server.extensions import db
 from server.models.Payments import Payments
+from server.identity import current_user
+from server.pagination import wants_keyset, parse_keyset_args, keyset_paginate
+from server.projections import payments_with_names_query, rows_to_dicts
+from server.ledger import record_payment, record_payments
+from server.versioning import conditional_get
 from server.models.User import User
 from server.routes.User_route import role_required
+from server.sql import dialect_insert
+from server.validation import Schema, Field
 from decimal import Decimal
+import csv
+import io
 
 
-# ----------------- Parsers -----------------
-payment_parser = reqparse.RequestParser()
-payment_parser.add_argument("payname", type=str, required=True, help="Payment name is required")
-payment_parser.add_argument("amount", type=float, required=True, help="Amount is required")
-payment_parser.add_argument("method", type=str, required=True, help="Payment method is required")
-payment_parser.add_argument("receipt", type=str, required=True, help="Receipt number is required")
-payment_parser.add_argument("memberId", type=int, required=False, help="Member ID (admin only)")
-
-# ----------------- Helpers -----------------
-def _validate_amount(val):
-    try:
-        v = float(val)
-    except (TypeError, ValueError):
-        return False, "Amount must be a number"
-    if v <= 0:
-        return False, "Amount must be greater than zero"
-    return True, None
+# ----------------- Schemas -----------------
+PAYMENT_FIELDS = dict(
+    payname=Field(str, required=True, help="Payment name is required", strip=True, max_length=30),
+    amount=Field(Decimal, required=True, help="Amount is required",
+                 gt=0, message="Amount must be greater than zero"),
+    method=Field(str, required=True, help="Payment method is required", strip=True, max_length=10),
+    receipt=Field(str, required=True, help="Receipt number is required", strip=True, max_length=18),
+)
+payment_schema = Schema(**PAYMENT_FIELDS)
+bulk_payment_schema = Schema(memberId=Field(int, required=True), **PAYMENT_FIELDS)
+
+# Bulk import limits
+BULK_MAX_ROWS = 5000
+BULK_INSERT_CHUNK = 500  # rows per INSERT statement (keeps bind params under driver limits)
+BULK_FIELDS = ("memberId", "payname", "amount", "method", "receipt")
+
+
+def _amount_filter(value):
+    """Decimal for ?min_amount=/?max_amount=; ValueError for NaN, infinities and non-numbers."""
+    amount = Decimal(value)
+    if not amount.is_finite():
+        raise ValueError("amount must be finite")
+    return amount
+
+
+def _bulk_rows_from_request():
+    """Rows from a JSON array ({"payments": [...]} or a bare list) or an uploaded CSV file."""
+    upload = request.files.get("file")
+    if upload:
+        text = io.TextIOWrapper(upload.stream, encoding="utf-8-sig")
+        return list(csv.DictReader(text))
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("payments")
+    return data
+
+
+def _validate_bulk_rows(rows):
+    """
+    Validate every row in one pass. Returns (clean_rows, errors) where errors
+    is a list of {"row", "errors"} for rows that can't be inserted.
+    Member existence is checked with a single IN query.
+    """
+    clean, errors, seen_receipts = [], [], {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({"row": index, "errors": ["Row must be an object"]})
+            continue
+
+        values, field_errors = bulk_payment_schema.validate(row)
+        row_errors = list(field_errors.values())
+
+        receipt = values.get("receipt")
+        if receipt is not None:
+            if receipt in seen_receipts:
+                row_errors.append(f"Receipt repeated in this batch (row {seen_receipts[receipt]})")
+            else:
+                seen_receipts[receipt] = index
+
+        if row_errors:
+            errors.append({"row": index, "errors": row_errors})
+            continue
+        values["row"] = index
+        clean.append(values)
+
+    member_ids = {r["memberId"] for r in clean}
+    if member_ids:
+        known = {m for (m,) in db.session.query(User.memberId).filter(User.memberId.in_(member_ids))}
+        for r in clean:
+            if r["memberId"] not in known:
+                errors.append({"row": r["row"], "errors": ["Member not found"]})
+        clean = [r for r in clean if r["memberId"] in known]
+
+    errors.sort(key=lambda e: e["row"])
+    return clean, errors
+
+
+def _insert_payments_skipping_duplicates(rows):
+    """
+    Multi-row INSERT ... ON CONFLICT (receipt) DO NOTHING RETURNING, so the
+    unique constraint on receipt does the duplicate detection.
+    Returns {receipt: paymentId} for the rows actually inserted.
+    """
+    inserted = {}
+    for start in range(0, len(rows), BULK_INSERT_CHUNK):
+        values = [{k: r[k] for k in BULK_FIELDS} for r in rows[start:start + BULK_INSERT_CHUNK]]
+        stmt = dialect_insert(Payments)
+        if stmt is not None:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["receipt"])
+        else:
+            # no portable ON CONFLICT: drop known receipts with one IN query instead
+            existing = {rc for (rc,) in db.session.query(Payments.receipt)
+                        .filter(Payments.receipt.in_([v["receipt"] for v in values]))}
+            values = [v for v in values if v["receipt"] not in existing]
+            if not values:
+                continue
+            stmt = Payments.__table__.insert()
+        result = db.session.execute(
+            stmt.values(values).returning(Payments.receipt, Payments.paymentId)
+        )
+        inserted.update({receipt: payment_id for receipt, payment_id in result})
+    return inserted
 
 # ----------------- Member Routes -----------------
 class MakePayment(Resource):
     """Member makes a payment"""
+    query_budget = 8
     @jwt_required()
     @role_required("member")
     def post(self):
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user()
         if not user:
             return {"msg": "User not found"}, 404
 
-        data = payment_parser.parse_args()
+        data = payment_schema.parse()
         member_id = user.memberId  # Member cannot specify another memberId
 
-        # Validate amount
-        ok, err = _validate_amount(data["amount"])
-        if not ok:
-            return {"msg": err}, 400
-
         # Check duplicate receipt
         if Payments.query.filter_by(receipt=data["receipt"]).first():
             return {"msg": "Receipt already exists"}, 400
@@ -59,6 +148,7 @@ class MakePayment(Resource):
         )
         db.session.add(payment)
         try:
+            record_payment(payment.payname, payment.amount)
             db.session.commit()
         except Exception as e:
             db.session.rollback()
@@ -70,11 +160,11 @@ class MakePayment(Resource):
 
 class ViewMyPayments(Resource):
     """Member views their own payments"""
+    query_budget = 2
     @jwt_required()
     @role_required("member")
     def get(self):
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user()
         if not user:
             return {"msg": "User not found"}, 404
 
@@ -83,44 +173,92 @@ class ViewMyPayments(Resource):
 
 # ----------------- Admin Routes -----------------
 class ViewAllPayments(Resource):
+    query_budget = 3
     @jwt_required()
     @role_required("admin")
+    @conditional_get("payments", "users")
     def get(self):
-        """Admin views all payments"""
-
-        payments = (
-            db.session.query(
-                Payments.paymentId,
-                Payments.memberId,
-                Payments.payname,
-                Payments.amount,
-                Payments.method,
-                Payments.receipt,
-                User.firstname
-            )
-            .join(User, User.memberId == Payments.memberId)
-            .order_by(Payments.paymentId.desc())
-            .all()
-        )
+        """
+        Admin views all payments, newest first.
+        Optional filters: memberId, method, payname, min_amount, max_amount.
+        Pass ?limit= and/or ?cursor= for keyset pagination.
+        """
+        args = request.args
+        query = payments_with_names_query()
 
-        result = []
-        for p in payments:
-            amount = float(p.amount) if isinstance(p.amount, Decimal) else p.amount
-
-            result.append({
-                "paymentId": p.paymentId,
-                "memberId": p.memberId,
-                "firstname": p.firstname,
-                "payname": p.payname,
-                "amount": amount,
-                "method": p.method,
-                "receipt": p.receipt,
-            })
-
-        return {"payments": result}, 200
+        try:
+            if args.get("memberId"):
+                query = query.filter(Payments.memberId == int(args["memberId"]))
+            if args.get("min_amount"):
+                query = query.filter(Payments.amount >= _amount_filter(args["min_amount"]))
+            if args.get("max_amount"):
+                query = query.filter(Payments.amount <= _amount_filter(args["max_amount"]))
+        except (ValueError, ArithmeticError):
+            return {"msg": "memberId, min_amount and max_amount must be numbers"}, 400
+        if args.get("method"):
+            query = query.filter(Payments.method == args["method"])
+        if args.get("payname"):
+            query = query.filter(Payments.payname == args["payname"])
+
+        next_cursor = None
+        if wants_keyset(args):
+            try:
+                cursor, limit = parse_keyset_args(args)
+            except ValueError:
+                return {"msg": "Invalid pagination values"}, 400
+            payments, next_cursor = keyset_paginate(query, Payments.paymentId, cursor, limit)
+        else:
+            payments = query.order_by(Payments.paymentId.desc()).all()
+
+        response = {"payments": rows_to_dicts(payments)}
+        if wants_keyset(args):
+            response["next_cursor"] = next_cursor
+        return response, 200
     
+class BulkPayments(Resource):
+    """Admin imports many payments at once (JSON array or CSV upload)"""
+    query_budget = 25  # one INSERT per chunk of BULK_INSERT_CHUNK rows, one ledger bump per payname
+    @jwt_required()
+    @role_required("admin")
+    def post(self):
+        rows = _bulk_rows_from_request()
+        if not isinstance(rows, list) or not rows:
+            return {"msg": "Send a non-empty 'payments' array or a CSV 'file'"}, 400
+        if len(rows) > BULK_MAX_ROWS:
+            return {"msg": f"At most {BULK_MAX_ROWS} payments per request"}, 400
+
+        clean, errors = _validate_bulk_rows(rows)
+        if errors:
+            return {"msg": "Validation failed, nothing was imported", "errors": errors}, 400
+
+        try:
+            inserted = _insert_payments_skipping_duplicates(clean)
+            record_payments(r for r in clean if r["receipt"] in inserted)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception("Failed to import payments: %s", e)
+            return {"msg": "Failed to import payments"}, 500
+
+        results = []
+        for r in clean:
+            if r["receipt"] in inserted:
+                results.append({"row": r["row"], "receipt": r["receipt"], "status": "inserted",
+                                "paymentId": inserted[r["receipt"]]})
+            else:
+                results.append({"row": r["row"], "receipt": r["receipt"], "status": "duplicate"})
+
+        return {
+            "msg": "Payments imported",
+            "inserted": len(inserted),
+            "duplicates": len(clean) - len(inserted),
+            "results": results,
+        }, 201
+
+
 class DeletePayment(Resource):
     """Admin deletes a payment"""
+    query_budget = 7
     @jwt_required()
     @role_required("admin")
     def delete(self, payment_id):
@@ -130,6 +268,7 @@ class DeletePayment(Resource):
 
         payment_data = payment.to_dict()
         try:
+            record_payment(payment.payname, payment.amount, sign=-1)
             db.session.delete(payment)
             db.session.commit()
         except Exception as e:
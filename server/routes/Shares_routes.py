@@ -1,33 +1,41 @@
 # server/routes/Shares_routes.py
-from flask_restful import Resource, reqparse
+from flask_restful import Resource
 from flask import request, current_app
 from flask_jwt_extended import get_jwt_identity,jwt_required
 from server.models.Shares import Shares
 from server.models.User import User
 from server.extensions import db
 from server.routes.User_route import role_required  # ensure correct import path
-
-# Parser for validating numeric fields
-shares_parser = reqparse.RequestParser()
-shares_parser.add_argument("shares", type=float, required=True, help="Shares amount is required")
-shares_parser.add_argument("dividends", type=float, required=False, default=0.10)
-shares_parser.add_argument("penalties", type=float, required=False, default=0.0)
-
-
-def _validate_currency_value(value_name, value):
-    """Helper to validate numeric input"""
-    try:
-        v = float(value)
-    except (TypeError, ValueError):
-        return False, f"{value_name} must be a number"
-    if v < 0:
-        return False, f"{value_name} must be >= 0"
-    return True, None
+from server.projections import shares_query, rows_to_dicts
+from server.ledger import record_shares
+from server.versioning import conditional_get
+from server.identity import current_user
+from server.dividends import preview_dividends, run_dividends
+from server.models.DividendRun import DividendRun
+from server.validation import Schema, Field
+from decimal import Decimal
+
+# Schemas for validating numeric fields
+SHARES_FIELDS = dict(
+    shares=Field(Decimal, required=True, help="Shares amount is required", min=0),
+    dividends=Field(Decimal, default=Decimal("0.10"), min=0),
+    penalties=Field(Decimal, default=Decimal("0.00"), min=0),
+)
+shares_schema = Schema(**SHARES_FIELDS)
+new_shares_schema = Schema(memberId=Field(int, required=True, help="memberId is required"), **SHARES_FIELDS)
+
+dividend_run_schema = Schema(
+    pool=Field(Decimal, required=True, help="pool must be a number",
+               gt=0, message="pool must be greater than 0"),
+    net_of_penalties=Field(bool, default=False),
+    dry_run=Field(bool, default=False),
+)
 
 
 # -------------------- MEMBER ROUTES --------------------
 class MemberShares(Resource):
     """Members can view their own shares, dividends, and penalties"""
+    query_budget = 2
     @jwt_required()
     @role_required("member")
     def get(self):
@@ -43,44 +51,31 @@ class MemberShares(Resource):
 # -------------------- ADMIN ROUTES --------------------
 class AdminShares(Resource):
     """Admins can create, view, update, and delete shares for any member"""
+    query_budget = {"get": 3, "post": 10, "put": 9, "delete": 8}
     @jwt_required()
     @role_required("admin")
+    @conditional_get("shares")
     def get(self):
         """Get all shares or filter by memberId"""
         member_id = request.args.get("memberId")
-        query = Shares.query
+        mid = None
         if member_id:
             try:
                 mid = int(member_id)
-                query = query.filter_by(memberId=mid)
             except ValueError:
                 return {"msg": "memberId must be an integer"}, 400
 
-        shares = query.all()
-        return {"shares": [s.to_dict() for s in shares]}, 200
+        shares = shares_query(member_id=mid).all()
+        return {"shares": rows_to_dicts(shares)}, 200
     @jwt_required()
     @role_required("admin")
     def post(self):
         """Create a shares record for a selected member"""
-        data = request.json
-        member_id = data.get("memberId")
-        shares_amount = data.get("shares")
-        dividends = data.get("dividends", 0.10)
-        penalties = data.get("penalties", 0.0)
-
-        if not member_id:
-            return {"msg": "memberId is required"}, 400
-
-        # Validate values
-        ok, err = _validate_currency_value("shares", shares_amount)
-        if not ok:
-            return {"msg": err}, 400
-        ok, err = _validate_currency_value("dividends", dividends)
-        if not ok:
-            return {"msg": err}, 400
-        ok, err = _validate_currency_value("penalties", penalties)
-        if not ok:
-            return {"msg": err}, 400
+        data = new_shares_schema.parse()
+        member_id = data["memberId"]
+        shares_amount = data["shares"]
+        dividends = data["dividends"]
+        penalties = data["penalties"]
 
         # Ensure member exists
         member = User.query.filter_by(memberId=member_id).first()
@@ -100,6 +95,7 @@ class AdminShares(Resource):
         )
         db.session.add(shares)
         try:
+            record_shares(new=(shares_amount, dividends, penalties))
             db.session.commit()
         except Exception as e:
             db.session.rollback()
@@ -111,31 +107,22 @@ class AdminShares(Resource):
     @role_required("admin")
     def put(self, member_id):
         """Update shares for a specific member"""
-        data = request.json
-        shares_amount = data.get("shares")
-        dividends = data.get("dividends", 0.10)
-        penalties = data.get("penalties", 0.0)
-
-        # Validate values
-        ok, err = _validate_currency_value("shares", shares_amount)
-        if not ok:
-            return {"msg": err}, 400
-        ok, err = _validate_currency_value("dividends", dividends)
-        if not ok:
-            return {"msg": err}, 400
-        ok, err = _validate_currency_value("penalties", penalties)
-        if not ok:
-            return {"msg": err}, 400
+        data = shares_schema.parse()
+        shares_amount = data["shares"]
+        dividends = data["dividends"]
+        penalties = data["penalties"]
 
         shares = Shares.query.filter_by(memberId=member_id).first()
         if not shares:
             return {"msg": "Shares record not found"}, 404
 
+        old = (shares.shares, shares.dividends, shares.penalties)
         shares.shares = shares_amount
         shares.dividends = dividends
         shares.penalties = penalties
 
         try:
+            record_shares(old=old, new=(shares_amount, dividends, penalties))
             db.session.commit()
         except Exception as e:
             db.session.rollback()
@@ -152,6 +139,7 @@ class AdminShares(Resource):
             return {"msg": "Shares record not found"}, 404
 
         try:
+            record_shares(old=(shares.shares, shares.dividends, shares.penalties))
             db.session.delete(shares)
             db.session.commit()
         except Exception as e:
@@ -160,3 +148,60 @@ class AdminShares(Resource):
             return {"msg": "Failed to delete shares"}, 500
 
         return {"msg": "Shares record deleted"}, 200
+
+
+class DividendRuns(Resource):
+    """Admins distribute a dividend pool across all members in one transaction"""
+    query_budget = {"get": 3, "post": 10}
+    @jwt_required()
+    @role_required("admin")
+    @conditional_get("dividend_runs")
+    def get(self):
+        """Past dividend runs, newest first"""
+        runs = DividendRun.query.order_by(DividendRun.id.desc()).all()
+        return {"runs": [r.to_dict() for r in runs]}, 200
+
+    @jwt_required()
+    @role_required("admin")
+    def post(self):
+        """
+        Split "pool" in proportion to shares, optionally "net_of_penalties".
+        With "dry_run": true only the per-member preview is returned.
+        """
+        data = dividend_run_schema.parse()
+        pool = data["pool"]
+        net_of_penalties = data["net_of_penalties"]
+
+        if data["dry_run"]:
+            total_shares, rows = preview_dividends(pool, net_of_penalties)
+            allocations = [
+                {
+                    "memberId": r.memberId,
+                    "shares": float(r.shares),
+                    "penalties": float(r.penalties),
+                    "dividend": float(r.dividend),
+                }
+                for r in rows
+            ]
+            return {
+                "dry_run": True,
+                "pool": float(pool),
+                "net_of_penalties": net_of_penalties,
+                "total_shares": float(total_shares),
+                "distributed": round(sum(a["dividend"] for a in allocations), 2),
+                "allocations": allocations,
+            }, 200
+
+        user = current_user()
+        try:
+            run = run_dividends(pool, net_of_penalties, created_by=user.memberId if user else None)
+            if run is None:
+                db.session.rollback()
+                return {"msg": "No shares to distribute dividends over"}, 400
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception("Dividend run failed: %s", e)
+            return {"msg": "Dividend run failed"}, 500
+
+        return {"msg": "Dividends distributed", "run": run.to_dict()}, 201
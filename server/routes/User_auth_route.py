@@ -1,33 +1,42 @@
 # server/routes/User_auth_route.py
-from flask_restful import Resource, reqparse
+from flask_restful import Resource
 from flask import current_app
 from flask_jwt_extended import create_access_token, decode_token
-from flask_mail import Message
 from server.models.User import User
-from server.extensions import db, mail
+from server.extensions import db
+from server.mail_outbox import enqueue_email, outbox
+from server.passwords import PasswordHasherBusy
+from server.identity import invalidate_user
+from server.revocation import revoke_tokens
+from server.validation import Schema, Field
 from datetime import timedelta
 from urllib.parse import quote, unquote
 
 # -----------------------------
-# Parsers
+# Schemas
 # -----------------------------
-register_parser = reqparse.RequestParser()
-register_parser.add_argument("firstname", required=True)
-register_parser.add_argument("lastname", required=True)
-register_parser.add_argument("email", required=True)
-register_parser.add_argument("phoneno", required=True)
-register_parser.add_argument("password", required=True)
+# emails are matched stripped and lower-cased everywhere
+EMAIL = Field(str, required=True, help="Email is required", strip=True, lower=True, max_length=50)
 
-login_parser = reqparse.RequestParser()
-login_parser.add_argument("email", required=True)
-login_parser.add_argument("password", required=True)
+register_schema = Schema(
+    firstname=Field(str, required=True, strip=True, max_length=25),
+    lastname=Field(str, required=True, strip=True, max_length=25),
+    email=EMAIL,
+    phoneno=Field(str, required=True, strip=True, max_length=10),
+    password=Field(str, required=True),
+)
 
-request_reset_parser = reqparse.RequestParser()
-request_reset_parser.add_argument("email", required=True, help="Email is required")
+login_schema = Schema(
+    email=EMAIL,
+    password=Field(str, required=True),
+)
 
-reset_confirm_parser = reqparse.RequestParser()
-reset_confirm_parser.add_argument("token", type=str, required=True)
-reset_confirm_parser.add_argument("new_password", type=str, required=True)
+request_reset_schema = Schema(email=EMAIL)
+
+reset_confirm_schema = Schema(
+    token=Field(str, required=True),
+    new_password=Field(str, required=True),
+)
 
 # -----------------------------
 # Helpers
@@ -70,10 +79,12 @@ def _extract_user_id_from_decoded(decoded):
 # -----------------------------
 class Register(Resource):
     """Register a new user and send email verification link."""
+    query_budget = 4
+    rate_limit = "register"
 
     def post(self):
-        data = register_parser.parse_args()
-        email = data["email"].strip().lower()
+        data = register_schema.parse()
+        email = data["email"]
 
         if User.query.filter_by(email=email).first():
             return {"msg": "Email already registered"}, 400
@@ -86,31 +97,35 @@ class Register(Resource):
             role="member",  # default role
             email_verified=False,
         )
-        user.set_password(data["password"])
+        try:
+            user.set_password(data["password"])
+        except PasswordHasherBusy:
+            return {"msg": "Server busy, please try again"}, 503
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()  # assigns memberId for the token
 
         # Create a JWT for email verification (identity as string)
         verify_token = _create_token_for_user(user, purpose="email_verification", expires_delta=timedelta(hours=24))
         safe_token = quote(verify_token)
         verify_url = f"{_frontend_base_url()}/verify-email/{safe_token}"
 
-        try:
-            msg = Message(
-                subject="Verify Your Email",
-                sender=current_app.config.get("MAIL_DEFAULT_SENDER") or "no-reply@example.com",
-                recipients=[email],
-            )
-            msg.body = f"Hi {user.firstname},\n\nPlease verify your email:\n{verify_url}\n\nThis link expires in 24 hours."
-            mail.send(msg)
-        except Exception as e:
-            current_app.logger.exception("Failed to send verification email: %s", e)
+        # Queued in the same transaction as the user; sent in the background
+        enqueue_email(
+            recipients=[email],
+            subject="Verify Your Email",
+            body=f"Hi {user.firstname},\n\nPlease verify your email:\n{verify_url}\n\nThis link expires in 24 hours.",
+            sender=current_app.config.get("MAIL_DEFAULT_SENDER"),
+        )
+        db.session.commit()
+        outbox.notify()
 
         return {"msg": "User registered. Please check your email to verify."}, 201
 
 
 class VerifyEmail(Resource):
     """Verify email using a JWT token."""
+    query_budget = 3
+    read_replica = False  # the user was only just created on the primary
 
     def get(self, token):
         if not token:
@@ -136,6 +151,7 @@ class VerifyEmail(Resource):
 
             user.email_verified = True
             db.session.commit()
+            invalidate_user(user_id)
             return {"msg": "Email verified successfully. You can now login."}, 200
 
         except Exception as e:
@@ -145,22 +161,36 @@ class VerifyEmail(Resource):
 
 class Login(Resource):
     """Login endpoint."""
+    query_budget = 3  # +1 update when the stored hash is upgraded
+    rate_limit = "login"
 
     def post(self):
-        data = login_parser.parse_args()
-        email = data["email"].strip().lower()
+        data = login_schema.parse()
+        email = data["email"]
         password = data["password"]
 
         user = User.query.filter_by(email=email).first()
-        if not user or not user.check_password(password):
-            return {"msg": "Invalid email or password"}, 401
+        try:
+            if not user or not user.check_password(password):
+                return {"msg": "Invalid email or password"}, 401
+        except PasswordHasherBusy:
+            return {"msg": "Server busy, please try again"}, 503
 
         if not getattr(user, "email_verified", False):
             return {"msg": "Please verify your email before logging in."}, 403
 
-        # Create access token also with string identity
+        # Upgrade the stored hash if the configured method/cost changed
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.warning("Password rehash failed for user %s: %s", user.memberId, e)
+
+        # Create access token also with string identity; "ver" lets revoke_tokens() invalidate it
         access_token = create_access_token(identity=str(user.memberId),
-                                           additional_claims={"role": user.role})
+                                           additional_claims={"role": user.role, "ver": user.token_version})
         return {
             "msg": "Login successful",
             "access_token": access_token,
@@ -170,10 +200,12 @@ class Login(Resource):
 
 class RequestPasswordReset(Resource):
     """Request a password reset link via email (JWT-based)."""
+    query_budget = 2
+    rate_limit = "password_reset"
 
     def post(self):
-        data = request_reset_parser.parse_args()
-        email = data["email"].strip().lower()
+        data = request_reset_schema.parse()
+        email = data["email"]
         user = User.query.filter_by(email=email).first()
 
         # Always return 200 to prevent email enumeration
@@ -184,29 +216,33 @@ class RequestPasswordReset(Resource):
         safe_token = quote(reset_token)
         reset_url = f"{_frontend_base_url()}/reset-password/{safe_token}"
 
-        try:
-            msg = Message(
-                subject="Password Reset Request",
-                sender=current_app.config.get("MAIL_DEFAULT_SENDER") or "no-reply@example.com",
-                recipients=[email],
-            )
-            msg.body = (
+        enqueue_email(
+            recipients=[email],
+            subject="Password Reset Request",
+            body=(
                 f"Hi {user.firstname},\n\n"
                 f"Reset your password using the link below (valid for 15 minutes):\n{reset_url}\n\n"
                 f"If you didn't request this, you can safely ignore this email."
-            )
-            mail.send(msg)
+            ),
+            sender=current_app.config.get("MAIL_DEFAULT_SENDER"),
+        )
+        try:
+            db.session.commit()
         except Exception as e:
-            current_app.logger.exception("Failed to send password reset email: %s", e)
+            db.session.rollback()
+            current_app.logger.exception("Failed to queue password reset email: %s", e)
+        else:
+            outbox.notify()
 
         return {"msg": "If that email exists, a reset link has been sent."}, 200
 
 
 class ResetPassword(Resource):
     """Reset password using a JWT token from email."""
+    query_budget = 4
 
     def post(self):
-        data = reset_confirm_parser.parse_args()
+        data = reset_confirm_schema.parse()
         token = data["token"]
         new_password = data["new_password"]
 
@@ -232,9 +268,13 @@ class ResetPassword(Resource):
                 return {"msg": "Invalid or expired token"}, 400
 
             user.set_password(new_password)
+            revoke_tokens(user, "password_reset")  # sign out sessions made with the old password
             db.session.commit()
             return {"msg": "Password reset successful"}, 200
 
+        except PasswordHasherBusy:
+            db.session.rollback()
+            return {"msg": "Server busy, please try again"}, 503
         except Exception as e:
             current_app.logger.exception("Password reset failed: %s", e)
             return {"msg": "Invalid or expired token"}, 400
@@ -1,52 +1,73 @@
-from flask_restful import Resource, reqparse
-from flask import request
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_restful import Resource
+from flask import request, current_app
+from flask_jwt_extended import jwt_required, get_jwt
 from functools import wraps
 from server.models.User import User
 from server.extensions import db
+from server.identity import current_user, invalidate_user
+from server.revocation import revoke_tokens
+from server.member_search import member_search, DEFAULT_LIMIT, MAX_LIMIT, MAX_QUERY_LENGTH
+from server.versioning import conditional_get
+from server.validation import Schema, Field
+from server.projections import (
+    users_query,
+    member_directory_query,
+    member_summary_query,
+    LATEST_PAYMENT_COLUMNS,
+    rows_to_dicts,
+)
 
 # Roles in this system
 ALLOWED_ROLES = {"member", "admin"}
 
 def role_required(*roles):
-    """Decorator to restrict access to certain roles."""
+    """
+    Decorator to restrict access to certain roles. The caller is resolved once
+    per request through server.identity, so handlers calling current_user()
+    afterwards don't hit the DB again. With TRUST_JWT_ROLE_CLAIM the role
+    claim issued by Login is used and no lookup happens here at all.
+    """
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
+            role = None
+            if current_app.config.get("TRUST_JWT_ROLE_CLAIM"):
+                role = get_jwt().get("role")
 
-            if not user:
-                return {"msg": "User not found or token invalid"}, 401
-            if user.role not in roles:
-                return {"msg": f"Access denied for role '{user.role}'"}, 403
+            if role is None:
+                user = current_user()
+                if not user:
+                    return {"msg": "User not found or token invalid"}, 401
+                role = user.role
+
+            if role not in roles:
+                return {"msg": f"Access denied for role '{role}'"}, 403
 
             return fn(*args, **kwargs)
         return decorator
     return wrapper
 
 
-# Parser for assigning new roles
-role_parser = reqparse.RequestParser()
-role_parser.add_argument("role", required=True)
+# Schema for assigning new roles
+role_schema = Schema(role=Field(str, required=True, strip=True, choices=ALLOWED_ROLES, message="Invalid role"))
 
 
 class AssignRole(Resource):
+    query_budget = 6  # identity, user, revocation row, update, table version bump, refresh
     @jwt_required()
     @role_required("admin")
     def put(self, user_id):
-        data = role_parser.parse_args()
+        data = role_schema.parse()
         new_role = data["role"]
 
-        if new_role not in ALLOWED_ROLES:
-            return {"msg": "Invalid role"}, 400
-
         user = User.query.get(user_id)
         if not user:
             return {"msg": "User not found"}, 404
 
         user.role = new_role
+        revoke_tokens(user, "role_change")  # tokens carry the old role claim
         db.session.commit()
+        invalidate_user(user.memberId)
         return {
             "msg": f"{user.firstname} {user.lastname}'s role changed to {new_role}",
             "user": user.to_dict()
@@ -54,18 +75,41 @@ class AssignRole(Resource):
 
 
 class ListUsers(Resource):
+    query_budget = 3
     @jwt_required()
     @role_required("admin")
+    @conditional_get("users")
     def get(self):
+        users = users_query(role=request.args.get("role")).all()
+        return {"users": rows_to_dicts(users)}, 200
+
+
+class SearchUsers(Resource):
+    query_budget = 3  # identity, users table version, index rebuild after a write
+    @jwt_required()
+    @role_required("admin")
+    def get(self):
+        """Typeahead: the best ?limit= (default 10) users matching ?q=, optionally of one ?role=."""
+        q = (request.args.get("q") or "").strip()
+        if not q:
+            return {"msg": "q is required"}, 400
+        if len(q) > MAX_QUERY_LENGTH:
+            return {"msg": f"q must be at most {MAX_QUERY_LENGTH} characters"}, 400
+
+        try:
+            limit = min(max(int(request.args.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            return {"msg": "limit must be an integer"}, 400
+
         role = request.args.get("role")
-        query = User.query
-        if role:
-            query = query.filter_by(role=role)
-        users = query.all()
-        return {"users": [user.to_dict() for user in users]}, 200
+        if role and role not in ALLOWED_ROLES:
+            return {"msg": "Invalid role"}, 400
+
+        return {"users": member_search.search(q, limit, role=role)}, 200
 
 
 class GetSingleUser(Resource):
+    query_budget = 2
     @jwt_required()
     @role_required("admin")
     def get(self, user_id):
@@ -76,6 +120,7 @@ class GetSingleUser(Resource):
 
 
 class DeleteUser(Resource):
+    query_budget = 8  # the ORM loads the related rows it has to detach
     @jwt_required()
     @role_required("admin")
     def delete(self, user_id):
@@ -84,27 +129,29 @@ class DeleteUser(Resource):
             return {"msg": "User not found"}, 404
 
         user_data = user.to_dict()
+        revoke_tokens(user, "removed")
         db.session.delete(user)
         db.session.commit()
+        invalidate_user(user_id)
         return {"msg": "User deleted", "user": user_data}, 200
 
 
 class Me(Resource):
+    query_budget = 1
     @jwt_required()
     def get(self):
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user()
 
         if not user:
             return {"msg": "User not found"}, 404
 
         return {"user": user.to_dict()}, 200
 class MemberProfile(Resource):
+    query_budget = 1
     @jwt_required()
     @role_required("member")
     def get(self):
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user()
 
         if not user:
             return {"msg": "User not found"}, 404
@@ -118,12 +165,60 @@ class MemberProfile(Resource):
             "role": user.role
         }, 200
     
+class MemberSummary(Resource):
+    query_budget = 2  # identity, then totals and latest payments in one statement
+    @jwt_required()
+    @role_required("member")
+    def get(self):
+        """
+        Dashboard data in one call: profile, contribution totals, shares,
+        loan and the latest ?payments=N (default 5) payments.
+        """
+        user = current_user()
+        if not user:
+            return {"msg": "User not found"}, 404
+
+        try:
+            limit = min(max(int(request.args.get("payments", 5)), 0), 50)
+        except ValueError:
+            return {"msg": "payments must be an integer"}, 400
+
+        rows = rows_to_dicts(member_summary_query(user.memberId, latest=limit).all())
+        summary = rows[0]
+        latest = [{column.key: row[column.key] for column in LATEST_PAYMENT_COLUMNS}
+                  for row in rows if row["paymentId"] is not None]
+
+        has_shares = summary["shares"] is not None
+        has_loan = summary["loan_amount"] is not None
+        return {
+            "member": user.to_dict(),
+            "contributions": {
+                "total": summary["total_contributions"],
+                "count": summary["payment_count"],
+            },
+            "shares": {
+                "shares": summary["shares"],
+                "dividends": summary["dividends"],
+                "penalties": summary["penalties"],
+            } if has_shares else None,
+            "loan": {
+                "amount": summary["loan_amount"],
+                "interest": summary["loan_interest"],
+                "year": summary["loan_year"],
+                "monthrepay": summary["loan_monthrepay"],
+            } if has_loan else None,
+            "latest_payments": latest,
+        }, 200
+
+
 class AdminUsers(Resource):
+    query_budget = 3
     @jwt_required()
     @role_required("admin")
+    @conditional_get("users")
     def get(self):
         """Return all users with role 'member'"""
-        members = User.query.filter_by(role="member").all()
+        members = member_directory_query(role="member").all()
 
         # Compute fullName dynamically
         members_list = [
@@ -0,0 +1,28 @@
+# server/routing_session.py
+import sqlalchemy as sa
+from flask_sqlalchemy.session import Session
+
+# session.info key set by server/replicas.py for requests that may read from the replica
+USE_REPLICA = "use_replica"
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to the "replica" bind when the request allows it; flushes,
+    INSERT/UPDATE/DELETE and SELECT ... FOR UPDATE always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(USE_REPLICA) and not self._flushing and _is_read(clause):
+            replica = self._db.engines.get("replica")
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _is_read(clause):
+    if clause is None:
+        return True
+    if isinstance(clause, sa.sql.dml.UpdateBase):
+        return False
+    return getattr(clause, "_for_update_arg", None) is None
@@ -0,0 +1,108 @@
+# server/serialization.py
+"""
+Fast JSON output.
+
+output_json replaces flask-restful's stdlib representation and uses orjson
+when it is installed (falling back to json otherwise).
+
+compile_serializer builds a serializer function once per field list, so
+turning a model or a projected row into output is a single dict literal
+with no per-value type checks. Money columns are Numeric with at most 14
+significant digits, which a float round-trips exactly (floats are exact to
+15), so they are emitted as JSON numbers with the same digits as the DB.
+"""
+import json
+from decimal import Decimal
+
+from flask import current_app, make_response
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used instead
+    orjson = None
+
+
+def _money(value):
+    return value if value is None else float(value)
+
+
+def _maybe_money(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _default(value):
+    """Types neither encoder handles natively."""
+    if isinstance(value, Decimal):
+        as_float = float(value)
+        # keep the exact digits if a float can't carry them
+        return as_float if Decimal(repr(as_float)) == value else str(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(data, pretty=False):
+        """Serialize to JSON bytes."""
+        options = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if pretty else _ORJSON_OPTIONS
+        return orjson.dumps(data, default=_default, option=options)
+else:
+    def dumps(data, pretty=False):
+        """Serialize to JSON bytes."""
+        if pretty:
+            return json.dumps(data, default=_default, indent=2).encode("utf-8")
+        return json.dumps(data, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def output_json(data, code, headers=None):
+    """flask-restful representation for application/json."""
+    resp = make_response(dumps(data, pretty=current_app.debug) + b"\n", code)
+    resp.headers.extend(headers or {})
+    resp.headers["Content-Type"] = "application/json"
+    return resp
+
+
+_compiled = {}
+
+
+def compile_serializer(fields, money=(), by_index=False, maybe_money=()):
+    """
+    Build (once) and return a function turning an object into an output dict.
+    fields are output keys; money lists the Numeric ones (maybe_money: type
+    unknown, checked per value). With by_index the function reads row[i]
+    (SQLAlchemy Row/tuple) instead of obj.<field>.
+    """
+    key = (tuple(fields), frozenset(money), by_index, frozenset(maybe_money))
+    fn = _compiled.get(key)
+    if fn is not None:
+        return fn
+
+    items = []
+    for i, name in enumerate(fields):
+        if not name.isidentifier():
+            raise ValueError(f"Invalid field name {name!r}")
+        value = f"obj[{i}]" if by_index else f"obj.{name}"
+        if name in money:
+            value = f"_money({value})"
+        elif name in maybe_money:
+            value = f"_maybe_money({value})"
+        items.append(f"{name!r}: {value}")
+    source = "def serialize(obj):\n    return {" + ", ".join(items) + "}\n"
+    namespace = {"_money": _money, "_maybe_money": _maybe_money}
+    exec(compile(source, f"<serializer {','.join(fields)}>", "exec"), namespace)
+    fn = _compiled[key] = namespace["serialize"]
+    return fn
+
+
+def rows_serializer(rows):
+    """
+    Serializer for a list of projected rows, picked from the first row:
+    columns holding a Decimal get the money conversion, NULL ones are
+    checked per value.
+    """
+    first = rows[0]
+    money = [name for name, value in zip(first._fields, first) if isinstance(value, Decimal)]
+    unknown = [name for name, value in zip(first._fields, first) if value is None]
+    return compile_serializer(first._fields, money=money, by_index=True, maybe_money=unknown)
@@ -0,0 +1,197 @@
+# server/slow_queries.py
+"""
+Slow-query log.
+
+Every statement slower than SLOW_QUERY_MS (seen through server/sql_tracking.py)
+is folded into per-statement totals keyed by its normalized SQL. At most once
+per SLOW_QUERY_SAMPLE_SECONDS per statement a sample is logged and kept in a
+ring buffer of SLOW_QUERY_BUFFER_SIZE entries: the normalized SQL, the shape
+(types, never values) of its bind parameters, the resource and route that
+ran it, and its EXPLAIN plan. The plan is captured on a background thread
+with its own connection, so the slow request isn't made slower.
+
+Admins read the buffer at GET /internal/slow-queries. Like the other
+/internal endpoints it describes the worker process that answers.
+"""
+import hashlib
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+from flask import current_app, has_request_context, request
+from server.sql_tracking import on_statement
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENTS = 500  # distinct statements kept in the totals
+EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN ", "mysql": "EXPLAIN "}
+_EXPLAINABLE = ("select", "with", "update", "delete")
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_IN_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.\"])-?\d+(?:\.\d+)?(?![\w.])")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(statement):
+    """SQL with literals replaced by ? and placeholder lists collapsed, so variants group together."""
+    sql = _SPACE.sub(" ", statement).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _IN_LIST.sub("(?, ...)", sql)
+
+
+def param_shape(parameters, executemany=False):
+    """Types of the bind parameters (not their values, which may be personal data)."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": param_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def _caller():
+    if not has_request_context():
+        return {"resource": None, "route": None, "method": None, "thread": threading.current_thread().name}
+    view = current_app.view_functions.get(request.endpoint)
+    view_class = getattr(view, "view_class", None)
+    return {
+        "resource": view_class.__name__ if view_class else request.endpoint,
+        "route": request.url_rule.rule if request.url_rule else request.path,
+        "method": request.method,
+    }
+
+
+class SlowQueryLog:
+    def __init__(self):
+        self.threshold = 0.0
+        self.sample_seconds = 30
+        self.explain_enabled = True
+        self._lock = threading.Lock()
+        self.samples = deque(maxlen=200)
+        self.statements = OrderedDict()  # fingerprint -> totals, least recently seen first
+        self._jobs = queue.Queue(maxsize=50)
+        self._worker = None
+        self._worker_pid = None
+
+    def init_app(self, app):
+        self.threshold = app.config.get("SLOW_QUERY_MS", 250) / 1000.0
+        self.sample_seconds = app.config.get("SLOW_QUERY_SAMPLE_SECONDS", 30)
+        self.explain_enabled = app.config.get("SLOW_QUERY_EXPLAIN", True)
+        self.samples = deque(maxlen=app.config.get("SLOW_QUERY_BUFFER_SIZE", 200))
+        app.extensions["slow_queries"] = self
+
+    # ----------------- Recording -----------------
+    def observe(self, conn, statement, parameters, seconds, executemany=False):
+        if not self.threshold or seconds < self.threshold:
+            return
+        if statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+        sql = normalize(statement)
+        fingerprint = hashlib.sha1(sql.encode()).hexdigest()[:12]
+        now = time.time()
+        ms = round(seconds * 1000, 2)
+
+        with self._lock:
+            totals = self.statements.pop(fingerprint, None) or {
+                "fingerprint": fingerprint, "sql": sql, "count": 0,
+                "total_ms": 0.0, "max_ms": 0.0, "last_sampled": 0.0,
+            }
+            totals["count"] += 1
+            totals["total_ms"] = round(totals["total_ms"] + ms, 2)
+            totals["max_ms"] = max(totals["max_ms"], ms)
+            totals["last_seen"] = now
+            self.statements[fingerprint] = totals
+            if len(self.statements) > MAX_STATEMENTS:
+                self.statements.popitem(last=False)
+            if now - totals["last_sampled"] < self.sample_seconds:
+                return
+            totals["last_sampled"] = now
+
+            sample = {
+                "at": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+                "fingerprint": fingerprint,
+                "duration_ms": ms,
+                "sql": sql,
+                "params": param_shape(parameters, executemany),
+                "plan": None,
+                **_caller(),
+            }
+            self.samples.append(sample)
+
+        logger.warning(
+            "Slow query %.1f ms in %s %s (%s): %s",
+            ms, sample["method"], sample["route"], sample["resource"], sql[:500],
+        )
+        if self.explain_enabled and not executemany and sql[:6].lower().startswith(_EXPLAINABLE):
+            self._queue_explain(sample, conn.engine, statement, parameters)
+
+    # ----------------- EXPLAIN capture -----------------
+    def _queue_explain(self, sample, engine, statement, parameters):
+        prefix = EXPLAIN_PREFIX.get(engine.dialect.name)
+        if prefix is None:
+            sample["plan"] = [f"EXPLAIN not supported on {engine.dialect.name}"]
+            return
+        self._ensure_worker()
+        try:
+            self._jobs.put_nowait((sample, engine, prefix + statement, parameters))
+        except queue.Full:
+            sample["plan"] = ["skipped: EXPLAIN queue full"]
+
+    def _ensure_worker(self):
+        # started lazily in each process, so it survives gunicorn forking
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                self._worker_pid = os.getpid()
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            sample, engine, sql, parameters = self._jobs.get()
+            try:
+                with engine.connect() as conn:
+                    rows = conn.exec_driver_sql(sql, parameters).all()
+                    conn.rollback()
+                sample["plan"] = [str(row[-1]) if engine.dialect.name == "sqlite" else str(row[0]) for row in rows]
+            except Exception as e:
+                sample["plan"] = [f"EXPLAIN failed: {e.__class__.__name__}: {e}"]
+
+    # ----------------- Reading -----------------
+    def snapshot(self, limit=50):
+        with self._lock:
+            samples = list(self.samples)[::-1][:limit]
+            statements = sorted(self.statements.values(), key=lambda s: s["total_ms"], reverse=True)[:limit]
+            statements = [
+                {**{k: v for k, v in s.items() if k != "last_sampled"},
+                 "last_seen": datetime.fromtimestamp(s["last_seen"], timezone.utc).isoformat()}
+                for s in statements
+            ]
+        return {
+            "pid": os.getpid(),
+            "threshold_ms": self.threshold * 1000,
+            "samples": samples,
+            "statements": statements,
+        }
+
+    def clear(self):
+        with self._lock:
+            self.samples.clear()
+            self.statements.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+@on_statement
+def _observe(conn, statement, parameters, seconds, executemany):
+    slow_query_log.observe(conn, statement, parameters, seconds, executemany)
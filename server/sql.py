@@ -0,0 +1,17 @@
+# server/sql.py
+from sqlalchemy.dialects import postgresql, sqlite
+from server.extensions import db
+
+
+def dialect_insert(table, bind=None):
+    """
+    INSERT construct with on_conflict_do_* support for the current database
+    (Postgres or SQLite), or None if the dialect has no portable upsert.
+    bind: engine or connection to target instead of the session's.
+    """
+    dialect = (bind if bind is not None else db.session.get_bind()).dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    return None
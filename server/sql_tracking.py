@@ -0,0 +1,57 @@
+# server/sql_tracking.py
+"""
+Per-request SQL accounting shared by metrics and diagnostics.
+
+One pair of engine-wide cursor events times every statement (primary and
+replica alike), adds it to the current request's count and DB time, and
+hands it to any observers registered with on_statement(). Statements run
+outside a request (outbox threads, CLI commands) still reach observers but
+aren't counted against a request.
+"""
+import time
+
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_observers = []
+
+
+def on_statement(fn):
+    """Register fn(conn, statement, parameters, seconds, executemany) to run after every statement."""
+    _observers.append(fn)
+    return fn
+
+
+def reset_request_stats():
+    g.sql_statements = 0
+    g.sql_seconds = 0.0
+
+
+def request_stats():
+    """(statements, seconds) spent in SQL by the current request so far."""
+    return g.get("sql_statements", 0), g.get("sql_seconds", 0.0)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_tracking_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["sql_tracking_started"].pop()
+    seconds = time.perf_counter() - started
+    if has_request_context():
+        g.sql_statements = g.get("sql_statements", 0) + 1
+        g.sql_seconds = g.get("sql_seconds", 0.0) + seconds
+    for observer in _observers:
+        observer(conn, statement, parameters, seconds, executemany)
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_timer(exception_context):
+    # a failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("sql_tracking_started"):
+        conn.info["sql_tracking_started"].pop()
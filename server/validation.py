@@ -0,0 +1,217 @@
+# server/validation.py
+"""
+Declarative request validation.
+
+A Schema is built once at import from Field declarations; each field is
+compiled into a single check function (conversion plus its bound/length/
+choice tests), so validating a body is one pass over the fields with no
+per-request setup. Unlike reqparse, only the JSON body (or form, for
+non-JSON posts) is read, and every failing field is reported at once:
+
+    loan_schema = Schema(
+        amount=Field(float, required=True, gt=0, message="Amount must be greater than 0"),
+        year=Field(int, required=True, gt=0, max=50),
+    )
+
+    data = loan_schema.parse()   # aborts with 400 {"msg", "errors"} on bad input
+"""
+from collections.abc import Mapping
+from decimal import Decimal, InvalidOperation
+
+from flask import request
+from flask_restful import abort
+
+CENT = Decimal("0.01")
+# largest amount a Numeric(9,2) money column holds
+MONEY_MAX = Decimal("9999999.99")
+
+
+class ValidationError(ValueError):
+    pass
+
+
+# ----------------- Converters -----------------
+def _to_str(value):
+    if isinstance(value, (dict, list, bool)):
+        raise ValidationError("must be a string")
+    return value if isinstance(value, str) else str(value)
+
+
+def _to_int(value):
+    if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+        raise ValidationError("must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError("must be an integer") from None
+
+
+def _to_float(value):
+    if isinstance(value, bool):
+        raise ValidationError("must be a number")
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        raise ValidationError("must be a number") from None
+    if result != result or result in (float("inf"), float("-inf")):
+        raise ValidationError("must be a number")
+    return result
+
+
+def _to_money(value):
+    """
+    Exact Decimal rounded to cents (floats go through str, so 0.1 stays 0.10),
+    no larger than MONEY_MAX either way so the database never sees an overflow.
+    """
+    if isinstance(value, (bool, dict, list)):
+        raise ValidationError("must be a number")
+    try:
+        result = Decimal(str(value).strip())
+        if not result.is_finite():
+            raise ValidationError("must be a number")
+        # raises InvalidOperation when 1e30 and the like need more digits than the context has
+        result = result.quantize(CENT)
+    except (InvalidOperation, ValueError):
+        raise ValidationError("must be a number") from None
+    if abs(result) > MONEY_MAX:
+        raise ValidationError(f"must be at most {MONEY_MAX}")
+    return result
+
+
+_TRUE = ("true", "1", "t", "yes")
+_FALSE = ("false", "0", "f", "no", "")
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValidationError("must be true or false")
+
+
+CONVERTERS = {
+    str: _to_str,
+    int: _to_int,
+    float: _to_float,
+    Decimal: _to_money,
+    bool: _to_bool,
+}
+
+
+# ----------------- Declarations -----------------
+class Field:
+    """
+    One input field.
+      type        str, int, float, bool or Decimal (money: rounded to cents, at most MONEY_MAX)
+      required    missing/null/"" is an error (help is the message)
+      default     used when an optional field is missing
+      gt/min/max  numeric bounds (exclusive/inclusive/inclusive)
+      max_length  for strings, after strip
+      choices     allowed values
+      message     replaces the generated message for bound/choice errors
+    """
+
+    __slots__ = ("type", "required", "default", "help", "gt", "min", "max",
+                 "max_length", "choices", "strip", "lower", "message")
+
+    def __init__(self, type=str, required=False, default=None, help=None, gt=None, min=None,
+                 max=None, max_length=None, choices=None, strip=False, lower=False, message=None):
+        if type not in CONVERTERS:
+            raise TypeError(f"Unsupported field type {type!r}")
+        self.type = type
+        self.required = required
+        self.default = default
+        self.help = help
+        self.gt = gt
+        self.min = min
+        self.max = max
+        self.max_length = max_length
+        self.choices = frozenset(choices) if choices is not None else None
+        self.strip = strip
+        self.lower = lower
+        self.message = message
+
+    def compile(self, name):
+        """Return check(value) -> converted value, raising ValidationError."""
+        convert = CONVERTERS[self.type]
+        tests = []  # (predicate that is True when the value is bad, message)
+        if self.gt is not None:
+            tests.append((lambda v, b=self.gt: v <= b, f"{name} must be greater than {self.gt}"))
+        if self.min is not None:
+            tests.append((lambda v, b=self.min: v < b, f"{name} must be >= {self.min}"))
+        if self.max is not None:
+            tests.append((lambda v, b=self.max: v > b, f"{name} must be <= {self.max}"))
+        if self.max_length is not None:
+            tests.append((lambda v, b=self.max_length: len(v) > b,
+                          f"{name} must be at most {self.max_length} characters"))
+        if self.choices is not None:
+            tests.append((lambda v, c=self.choices: v not in c,
+                          f"{name} must be one of: {', '.join(sorted(map(str, self.choices)))}"))
+        if self.message:
+            tests = [(bad, self.message) for bad, _ in tests]
+
+        strip, lower = self.strip, self.lower
+        tests = tuple(tests)
+
+        def check(value):
+            try:
+                value = convert(value)
+            except ValidationError as e:
+                raise ValidationError(f"{name} {e}") from None
+            if strip:
+                value = value.strip()
+            if lower:
+                value = value.lower()
+            for bad, message in tests:
+                if bad(value):
+                    raise ValidationError(message)
+            return value
+
+        return check
+
+
+class Schema:
+    def __init__(self, **fields):
+        self.fields = fields
+        # everything per field is resolved here, once
+        self._compiled = tuple(
+            (name, f.required, f.default, f.help or f"{name} is required", f.compile(name))
+            for name, f in fields.items()
+        )
+
+    def validate(self, data):
+        """Return (values, errors); errors maps field name to message."""
+        if not isinstance(data, Mapping):
+            return None, {"body": "Expected a JSON object"}
+        values, errors = {}, {}
+        for name, required, default, help, check in self._compiled:
+            raw = data.get(name)
+            if raw is None or raw == "":
+                if required:
+                    errors[name] = help
+                else:
+                    values[name] = default
+                continue
+            try:
+                values[name] = check(raw)
+            except ValidationError as e:
+                errors[name] = str(e)
+        return values, errors
+
+    def parse(self, data=None):
+        """
+        Validate data (default: the request's JSON body, or its form for
+        non-JSON posts) and return the values, aborting with 400 otherwise.
+        """
+        if data is None:
+            data = request.get_json(silent=True)
+            if data is None:
+                data = request.form
+        values, errors = self.validate(data)
+        if errors:
+            abort(400, msg=next(iter(errors.values())), errors=errors)
+        return values
@@ -0,0 +1,165 @@
+# server/versioning.py
+"""
+Per-table version counters and conditional GET.
+
+Session events note which VERSIONED_TABLES a transaction writes to (ORM
+flushes as well as insert/update/delete statements run through the session)
+and bump their table_versions rows just before it commits, so the counters
+move in the same transaction as the data.
+
+conditional_get(*tables) turns the counters into ETag/Last-Modified headers
+for a list endpoint and answers a matching If-None-Match/If-Modified-Since
+with 304 before the handler runs any query or serialization.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect as sa_inspect, update
+from werkzeug.http import http_date, parse_date
+from server.extensions import db
+from server.models.TableVersion import TableVersion
+from server.sql import dialect_insert
+
+VERSIONED_TABLES = {
+    "users",
+    "payments",
+    "shares",
+    "loanapps",
+    "group_ledger",
+    "dividend_runs",
+}
+
+_TOUCHED = "versioning_touched_tables"
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# ----------------- Write tracking -----------------
+def _touched(session):
+    return session.info.setdefault(_TOUCHED, set())
+
+
+@event.listens_for(Session, "before_flush")
+def _track_flush(session, flush_context, instances):
+    touched = _touched(session)
+    for obj in list(session.new) + list(session.deleted) + list(session.dirty):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        name = sa_inspect(obj).mapper.local_table.name
+        if name in VERSIONED_TABLES:
+            touched.add(name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    name = getattr(orm_execute_state.statement.table, "name", None)
+    if name in VERSIONED_TABLES:
+        _touched(orm_execute_state.session).add(name)
+
+
+def bump_versions(names):
+    """Increment the counters for names (in sorted order, to keep lock order stable)."""
+    now = _utcnow()
+    table = TableVersion.__table__
+    for name in sorted(names):
+        stmt = dialect_insert(table)
+        if stmt is not None:
+            stmt = stmt.values(name=name, version=1, updated_at=now)
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=["name"],
+                set_={"version": table.c.version + 1, "updated_at": now},
+            ))
+            continue
+        result = db.session.execute(
+            update(table).where(table.c.name == name).values(version=table.c.version + 1, updated_at=now)
+        )
+        if not result.rowcount:
+            db.session.execute(table.insert().values(name=name, version=1, updated_at=now))
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_before_commit(session):
+    session.flush()
+    touched = session.info.pop(_TOUCHED, None)
+    if touched:
+        bump_versions(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop(_TOUCHED, None)
+
+# ----------------- Conditional GET -----------------
+def current_versions(tables):
+    """(etag, last_modified) for the given tables, from one small query."""
+    rows = {
+        row.name: row
+        for row in db.session.query(TableVersion.name, TableVersion.version, TableVersion.updated_at)
+        .filter(TableVersion.name.in_(tables))
+    }
+    parts = [f"{name}:{rows[name].version if name in rows else 0}" for name in sorted(tables)]
+    # the same versions mean different bodies for different filters/pages
+    parts.append(request.full_path)
+    etag = hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]
+    stamps = [row.updated_at for row in rows.values()]
+    last_modified = max(stamps).replace(tzinfo=timezone.utc) if stamps else None
+    return etag, last_modified
+
+
+def _settled(last_modified):
+    """
+    True once last_modified's second is over. HTTP dates have whole seconds,
+    so until then another write could land in the same second unnoticed.
+    """
+    return last_modified < _utcnow().replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def _not_modified(etag, last_modified):
+    # the ETag moves with every write, so If-None-Match decides alone
+    if_none_match = request.if_none_match
+    if if_none_match:
+        return if_none_match.contains(etag)
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since and last_modified and _settled(last_modified):
+        since = parse_date(if_modified_since)
+        return since is not None and last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_get(*tables):
+    """
+    Decorator for GET handlers whose response only depends on tables (and the
+    query string). Adds ETag/Last-Modified and short-circuits with 304.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            etag, last_modified = current_versions(tables)
+            headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+            if last_modified and _settled(last_modified):
+                headers["Last-Modified"] = http_date(last_modified)
+
+            if _not_modified(etag, last_modified):
+                return Response(status=304, headers=headers)
+
+            result = fn(*args, **kwargs)
+            if isinstance(result, Response):
+                result.headers.extend(headers)
+                return result
+            if isinstance(result, tuple):
+                body, status = result[0], result[1] if len(result) > 1 else 200
+                extra = dict(result[2]) if len(result) > 2 else {}
+            else:
+                body, status, extra = result, 200, {}
+            if status != 200:
+                return result
+            extra.update(headers)
+            return body, status, extra
+        return decorator
+    return wrapper
@@ -0,0 +1,31 @@
+# server/warmup.py
+"""
+Worker warm-up.
+
+gunicorn.conf.py runs warm() in post_worker_init, after the worker has
+loaded the app and before it accepts its first connection, so what would
+otherwise happen on the first live requests -- connecting to the database
+and spawning the password hashing processes -- is done before the worker
+takes traffic. It also starts the mail outbox senders, so email left
+pending or in backoff by a restart goes out without waiting for this
+worker to enqueue new mail.
+"""
+import time
+
+from server.db_pool import warm_pool
+from server.extensions import db
+from server.mail_outbox import outbox
+from server.passwords import password_hasher
+
+
+def warm(app):
+    """Warm this process; returns what was done, for the log."""
+    started = time.perf_counter()
+    done = {}
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            done[f"{bind or 'primary'} connections"] = warm_pool(engine)
+    done["hashing processes"] = password_hasher.warm()
+    done["mail senders"] = outbox.resume()
+    done["ms"] = round((time.perf_counter() - started) * 1000)
+    return done
@@ -0,0 +1,71 @@
+# tests/conftest.py
+import itertools
+
+import pytest
+
+from server.app import create_app
+from server.extensions import db
+from server.models.User import User
+
+PASSWORD = "pw"
+_phone_numbers = itertools.count(700000000)
+
+
+def make_app(tmp_path, env="testing", **config):
+    """An app on a fresh SQLite file with the schema created."""
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+        "MAIL_OUTBOX_AUTOSTART": False,
+        "PASSWORD_HASH_WORKERS": 0,
+        **config,
+    }, env=env)
+    with app.app_context():
+        # the primary only: once an app has had a replica bind, db keeps its
+        # (empty) metadata, and later apps without the bind would trip on it
+        db.create_all(bind_key=None)
+    return app
+
+
+def add_user(email, role="member", **fields):
+    user = User(
+        firstname=fields.pop("firstname", email.split("@")[0].title()),
+        lastname=fields.pop("lastname", "Test"),
+        email=email,
+        phoneno=fields.pop("phoneno", f"0{next(_phone_numbers)}"),
+        role=role,
+        email_verified=True,
+        **fields,
+    )
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def login(client, email, password=PASSWORD):
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def users(app):
+    """An admin (id 1) and two members (ids 2, 3)."""
+    with app.app_context():
+        admin = add_user("admin@example.com", role="admin")
+        members = [add_user(f"m{i}@example.com") for i in (1, 2)]
+        return {"admin": admin.memberId, "members": [m.memberId for m in members]}
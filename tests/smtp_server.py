@@ -0,0 +1,69 @@
+# tests/smtp_server.py
+"""A minimal local SMTP server for the outbox tests (stands in for aiosmtpd)."""
+import socket
+import threading
+
+
+class LocalSMTPServer:
+    """Accepts mail on 127.0.0.1; RCPT TO an address in reject gets a 550."""
+
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.messages = []  # (recipients, data)
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        # shutdown first: close() alone leaves the listener open while accept() blocks on it
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._session, args=(conn,), daemon=True).start()
+
+    def _session(self, conn):
+        with conn, conn.makefile("rb") as lines:
+            def reply(text):
+                conn.sendall(text.encode() + b"\r\n")
+
+            reply("220 localhost test SMTP")
+            recipients = []
+            for line in lines:
+                command = line.decode().strip()
+                verb = command.split(" ", 1)[0].split(":", 1)[0].upper()
+                if verb in ("EHLO", "HELO"):
+                    reply("250 localhost")
+                elif verb == "MAIL":
+                    recipients = []
+                    reply("250 OK")
+                elif verb == "RCPT":
+                    address = command.split(":", 1)[1].strip().strip("<>")
+                    if address in self.reject:
+                        reply("550 No such user")
+                    else:
+                        recipients.append(address)
+                        reply("250 OK")
+                elif verb == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = b""
+                    for data_line in lines:
+                        if data_line == b".\r\n":
+                            break
+                        data += data_line
+                    self.messages.append((recipients, data))
+                    reply("250 OK")
+                elif verb == "QUIT":
+                    reply("221 Bye")
+                    return
+                else:
+                    reply("250 OK")
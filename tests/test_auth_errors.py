@@ -0,0 +1,12 @@
+# tests/test_auth_errors.py
+import pytest
+
+from tests.conftest import make_app
+
+
+@pytest.mark.parametrize("env", ["development", "production", "testing"])
+def test_jwt_errors_are_not_500(tmp_path, env):
+    client = make_app(tmp_path, env=env).test_client()
+
+    assert client.get("/me").status_code == 401
+    assert client.get("/me", headers={"Authorization": "Bearer x.y.z"}).status_code == 422
@@ -0,0 +1,41 @@
+# tests/test_dividend_runs.py
+import pytest
+from sqlalchemy import event
+
+from server.extensions import db
+from server.models.DividendRun import DividendRun
+from tests.conftest import add_user, login, make_app
+
+
+def _enforce_foreign_keys(dbapi_connection, connection_record):
+    dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        # SQLite only enforces foreign keys when asked, as Postgres always does
+        db.engine.dispose()
+        event.listen(db.engine, "connect", _enforce_foreign_keys)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        event.remove(db.engine, "connect", _enforce_foreign_keys)
+        db.engine.dispose()
+
+
+def test_deleting_an_admin_keeps_their_dividend_runs(app, client, users):
+    with app.app_context():
+        add_user("treasurer@example.com", role="admin", phoneno="0711111111")
+    treasurer = login(client, "treasurer@example.com")
+    shares = {"memberId": users["members"][0], "shares": "10"}
+    assert client.post("/admin/shares", headers=treasurer, json=shares).status_code == 201
+    run = client.post("/admin/dividends/runs", headers=treasurer, json={"pool": "100"})
+    assert run.status_code == 201, run.get_json()
+    treasurer_id = run.get_json()["run"]["created_by"]
+
+    admin = login(client, "admin@example.com")
+    assert client.delete(f"/users/{treasurer_id}/delete", headers=admin).status_code == 200
+    with app.app_context():
+        assert [r.created_by for r in DividendRun.query.all()] == [None]
@@ -0,0 +1,26 @@
+# tests/test_internal_access.py
+import pytest
+
+from tests.conftest import login, make_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    return make_app(tmp_path, INTERNAL_API_TOKEN="s3cret-tökén")
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({"X-Internal-Token": "s3cret-tökén".encode().decode("latin-1")}, 401),
+    ({"X-Internal-Token": "wrong-token"}, 401),
+    ({"X-Internal-Token": "ünïcode"}, 401),
+    ({"Authorization": "Bearer ünïcode"}, 422),  # then read as a malformed JWT
+])
+def test_wrong_tokens_fall_through_to_admin_check(client, headers, status):
+    assert client.get("/internal/pool", headers=headers).status_code == status
+
+
+def test_token_or_admin_opens_internal_endpoints(client, users):
+    assert client.get("/internal/pool", headers={"X-Internal-Token": "s3cret-tökén"}).status_code == 200
+    assert client.get("/internal/pool", headers={"Authorization": "Bearer s3cret-tökén"}).status_code == 200
+    assert client.get("/internal/pool", headers=login(client, "admin@example.com")).status_code == 200
+    assert client.get("/internal/pool", headers=login(client, "m1@example.com")).status_code == 403
@@ -0,0 +1,94 @@
+# tests/test_ledger.py
+from pathlib import Path
+
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import text
+
+from server.app import create_app
+from server.extensions import db
+from server.ledger import ledger_drift, ledger_snapshot
+from tests.conftest import login
+
+MIGRATIONS = str(Path(__file__).resolve().parent.parent / "migrations")
+
+
+def test_mixed_writes_keep_the_ledger_in_step(app, client, users):
+    admin = login(client, "admin@example.com")
+    member = login(client, "m1@example.com")
+    member_id, other_id = users["members"]
+
+    def call(method, path, headers, expect=200, **kwargs):
+        response = client.open(path, method=method, headers=headers, **kwargs)
+        assert response.status_code == expect, (method, path, response.get_json())
+        with app.app_context():
+            assert ledger_drift() == {}, (method, path)
+        return response
+
+    payment = {"payname": "contribution", "method": "mpesa"}
+    paid = call("POST", "/payments", member, json={**payment, "amount": "150.25", "receipt": "R1"}, expect=201)
+    call("POST", "/payments", member, json={**payment, "payname": "fine", "amount": "20", "receipt": "R2"}, expect=201)
+    call("POST", "/payments/bulk", admin, expect=201, json={"payments": [
+        {**payment, "memberId": member_id, "amount": "10.10", "receipt": "B1"},
+        {**payment, "memberId": other_id, "amount": "0.1", "receipt": "B2"},
+        {**payment, "memberId": other_id, "payname": "fine", "amount": "5", "receipt": "B3"},
+    ]})
+    call("DELETE", f"/payments/{paid.get_json()['payment']['paymentId']}", admin)
+
+    call("POST", "/admin/shares", admin, json={"memberId": member_id, "shares": "100", "penalties": "3"}, expect=201)
+    call("POST", "/admin/shares", admin, json={"memberId": other_id, "shares": "50.50"}, expect=201)
+    call("PUT", f"/admin/shares/{member_id}", admin, json={"shares": "120", "dividends": "1.5", "penalties": "2"})
+    call("POST", "/admin/dividends/runs", admin, json={"pool": "333.33"}, expect=201)
+    call("POST", "/admin/dividends/runs", admin, json={"pool": "100", "net_of_penalties": True}, expect=201)
+    call("DELETE", f"/admin/shares/{other_id}", admin)
+
+    call("POST", "/loans/apply", member, json={"amount": 1000, "year": 1}, expect=201)
+    call("PUT", f"/loans/{member_id}", admin, json={"amount": 2500, "year": 2})
+    call("DELETE", f"/loans/{member_id}", admin)
+
+    with app.app_context():
+        snapshot = ledger_snapshot()
+    assert snapshot["contributions"]["total"] == pytest.approx(35.2)
+    assert snapshot["contributions"]["by_payname"]["fine"] == {"total": 25.0, "count": 2}
+    assert snapshot["shares"] == {"total": 120.0, "members": 1}
+
+
+def test_migration_backfills_the_ledger_from_history(tmp_path, monkeypatch):
+    # migrations/env.py applies alembic.ini's logging, which disables the app's loggers
+    monkeypatch.setattr("logging.config.fileConfig", lambda *args, **kwargs: None)
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'migrated.db'}",
+        "MAIL_OUTBOX_AUTOSTART": False,
+        "PASSWORD_HASH_WORKERS": 0,
+    }, env="testing")
+    with app.app_context():
+        # history written before the ledger existed
+        upgrade(directory=MIGRATIONS, revision="c47e19a0d5b3")
+        for member_id in (1, 2):
+            db.session.execute(text(
+                "INSERT INTO users (\"memberId\", firstname, lastname, email, phoneno, password_hash, role) "
+                f"VALUES ({member_id}, 'M', 'T', 'm{member_id}@example.com', '070000000{member_id}', 'x', 'member')"
+            ))
+        db.session.execute(text(
+            "INSERT INTO payments (\"memberId\", payname, amount, method, receipt) VALUES "
+            "(1, 'contribution', 100.50, 'mpesa', 'R1'), (2, 'contribution', 0.10, 'cash', 'R2'), "
+            "(2, 'fine', 25, 'cash', 'R3')"
+        ))
+        db.session.execute(text(
+            "INSERT INTO shares (\"memberId\", shares, dividends, penalties) VALUES (1, 40, 1.25, 0), (2, 60.5, 0, 2)"
+        ))
+        db.session.execute(text(
+            "INSERT INTO loanapps (\"memberId\", amount, interest, year, monthrepay) VALUES (1, 5000, 0.1, 1, 458.33)"
+        ))
+        db.session.commit()
+
+        upgrade(directory=MIGRATIONS)
+        assert ledger_drift() == {}
+        snapshot = ledger_snapshot()
+        db.session.remove()
+        db.engine.dispose()
+
+    assert snapshot["contributions"]["total"] == pytest.approx(125.6)
+    assert snapshot["contributions"]["by_payname"]["fine"] == {"total": 25.0, "count": 1}
+    assert snapshot["shares"] == {"total": 100.5, "members": 2}
+    assert snapshot["loans"] == {"principal": 5000.0, "count": 1}
@@ -0,0 +1,108 @@
+# tests/test_mail_outbox.py
+import time
+from datetime import timedelta
+
+import pytest
+
+from server.extensions import db
+from server.mail_outbox import _utcnow, enqueue_email, outbox
+from server.models.EmailOutbox import EmailOutbox
+from server.warmup import warm
+from tests.conftest import make_app
+from tests.smtp_server import LocalSMTPServer
+
+BACKOFF = 30
+
+
+@pytest.fixture
+def smtp():
+    server = LocalSMTPServer(reject={"nobody@example.com"})
+    yield server
+    server.close()
+
+
+def _mail_app(tmp_path, port, **config):
+    return make_app(
+        tmp_path,
+        MAIL_SUPPRESS_SEND=False, MAIL_SERVER="127.0.0.1", MAIL_PORT=port, MAIL_USE_TLS=False,
+        MAIL_DEFAULT_SENDER="chama@example.com", MAIL_OUTBOX_MAX_ATTEMPTS=3, MAIL_OUTBOX_BACKOFF_SECONDS=BACKOFF,
+        **config,
+    )
+
+
+@pytest.fixture
+def app(tmp_path, smtp):
+    return _mail_app(tmp_path, smtp.port)
+
+
+def _enqueue(to):
+    row = enqueue_email([to], "Hello", "Body")
+    db.session.commit()
+    return row.id
+
+
+def _make_due(row_id):
+    db.session.get(EmailOutbox, row_id).next_attempt_at = _utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_sends_pending_email(app, smtp):
+    with app.app_context():
+        row_id = _enqueue("member@example.com")
+        assert outbox.drain() == 1
+        row = db.session.get(EmailOutbox, row_id)
+        assert (row.status, row.attempts) == ("sent", 0)
+    assert [recipients for recipients, _ in smtp.messages] == [["member@example.com"]]
+
+
+def test_rejected_email_backs_off_then_goes_dead(app, smtp):
+    with app.app_context():
+        row_id = _enqueue("nobody@example.com")
+        for attempt, delay in ((1, BACKOFF), (2, BACKOFF * 2)):
+            before = _utcnow()
+            outbox.drain()
+            row = db.session.get(EmailOutbox, row_id)
+            assert (row.status, row.attempts) == ("pending", attempt)
+            assert timedelta(seconds=delay - 1) <= row.next_attempt_at - before <= timedelta(seconds=delay + 1)
+            assert outbox.drain() == 0  # not due during the backoff
+            _make_due(row_id)
+
+        outbox.drain()
+        row = db.session.get(EmailOutbox, row_id)
+        assert (row.status, row.attempts) == ("dead", 3)
+        assert "550" in row.last_error
+        _make_due(row_id)
+        assert outbox.drain() == 0
+    assert smtp.messages == []
+
+
+def test_unreachable_server_is_retried(tmp_path, smtp):
+    down = LocalSMTPServer()
+    down.close()  # nothing listens on this port any more
+    app = _mail_app(tmp_path, down.port)
+    with app.app_context():
+        row_id = _enqueue("member@example.com")
+        outbox.drain()
+        row = db.session.get(EmailOutbox, row_id)
+        assert (row.status, row.attempts) == ("pending", 1)
+
+        app.extensions["mail"].port = smtp.port
+        _make_due(row_id)
+        outbox.drain()
+        assert db.session.get(EmailOutbox, row_id).status == "sent"
+    assert len(smtp.messages) == 1
+
+
+def test_worker_warm_up_sends_mail_left_by_a_restart(tmp_path, smtp):
+    app = _mail_app(tmp_path, smtp.port, MAIL_OUTBOX_AUTOSTART=True, MAIL_OUTBOX_WORKERS=1)
+    with app.app_context():
+        row_id = _enqueue("member@example.com")
+    try:
+        assert warm(app)["mail senders"] == 1
+        deadline = time.monotonic() + 5
+        while not smtp.messages and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        outbox.stop()
+    with app.app_context():
+        assert db.session.get(EmailOutbox, row_id).status == "sent"
@@ -0,0 +1,33 @@
+# tests/test_member_summary.py
+from tests.conftest import login
+
+
+def _pay(client, headers, receipt, amount):
+    payment = {"payname": "contribution", "amount": amount, "method": "mpesa", "receipt": receipt}
+    assert client.post("/payments", headers=headers, json=payment).status_code == 201
+
+
+def test_summary_and_latest_payments_in_one_statement(client, users):
+    member = login(client, "m1@example.com")
+    empty = client.get("/member/summary", headers=member).get_json()
+    assert empty["contributions"] == {"total": 0, "count": 0}
+    assert empty["latest_payments"] == []
+    assert empty["shares"] is None and empty["loan"] is None
+
+    for n in range(1, 8):
+        _pay(client, member, f"R{n}", f"{n}0.50")
+    _pay(client, login(client, "m2@example.com"), "OTHER", "99")
+
+    summary = client.get("/member/summary", headers=member).get_json()
+    assert summary["member"]["email"] == "m1@example.com"
+    assert summary["contributions"] == {"total": 283.5, "count": 7}
+    assert [p["receipt"] for p in summary["latest_payments"]] == ["R7", "R6", "R5", "R4", "R3"]
+    assert summary["latest_payments"][0] == {
+        "paymentId": summary["latest_payments"][0]["paymentId"],
+        "payname": "contribution", "amount": 70.5, "method": "mpesa", "receipt": "R7",
+    }
+
+    two = client.get("/member/summary?payments=2", headers=member).get_json()
+    assert [p["receipt"] for p in two["latest_payments"]] == ["R7", "R6"]
+    none = client.get("/member/summary?payments=0", headers=member).get_json()
+    assert none["latest_payments"] == [] and none["contributions"]["count"] == 7
@@ -0,0 +1,45 @@
+# tests/test_metrics.py
+import threading
+
+from server.metrics import Metrics, Registry, _write_json, merge
+
+DEAD_PID = 2 ** 22 + 1  # above Linux's pid_max, never alive
+
+
+def _scraper(directory):
+    # _collect_files() only: in one process every scraper would flush to the same file
+    metrics = Metrics()
+    metrics.directory = str(directory)
+    return metrics
+
+
+def _dead_worker_file(directory, started, amount):
+    registry = Registry()
+    registry.inc("chama_test_total", (), amount)
+    _write_json(str(directory / f"metrics-{DEAD_PID}-{started}.json"), registry.snapshot())
+
+
+def _total(metrics):
+    return merge(metrics._collect_files()).counters.get(("chama_test_total", ()), 0.0)
+
+
+def test_concurrent_scrapes_fold_dead_workers_once(tmp_path):
+    scrapers = [_scraper(tmp_path) for _ in range(4)]
+    errors = []
+
+    def scrape(metrics):
+        try:
+            metrics._collect_files()
+        except Exception as e:  # pragma: no cover - the failure being tested
+            errors.append(e)
+
+    for round_ in range(20):
+        _dead_worker_file(tmp_path, started=round_, amount=1)
+        threads = [threading.Thread(target=scrape, args=(m,)) for m in scrapers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    assert _total(scrapers[0]) == 20
@@ -0,0 +1,75 @@
+# tests/test_passwords.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from server.passwords import PasswordHasher, PasswordHasherBusy, password_hasher
+
+
+@pytest.fixture
+def hasher(monkeypatch):
+    """One worker, one slot, on a thread pool so the test can hold it."""
+    hasher = PasswordHasher(workers=1, max_pending=1, timeout=0.2)
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(hasher, "_executor", lambda: pool)
+    yield hasher
+    pool.shutdown(wait=True)
+
+
+def test_full_queue_fails_fast(hasher):
+    release = threading.Event()
+    holder = threading.Thread(target=lambda: hasher._run(release.wait))
+    holder.start()
+    time.sleep(0.05)
+
+    start = time.perf_counter()
+    with pytest.raises(PasswordHasherBusy):
+        hasher._run(lambda: None)
+    assert time.perf_counter() - start < 0.1
+
+    release.set()
+    holder.join()
+
+
+def test_timeout_is_busy_and_slot_held_until_done(hasher):
+    release = threading.Event()
+    with pytest.raises(PasswordHasherBusy):
+        hasher._run(release.wait)
+    # the abandoned hash still runs, so the slot stays taken
+    with pytest.raises(PasswordHasherBusy):
+        hasher._run(lambda: None)
+
+    release.set()
+    time.sleep(0.05)
+    assert hasher._run(lambda: "done") == "done"
+
+
+@pytest.fixture
+def busy(monkeypatch):
+    def refuse(*args):
+        raise PasswordHasherBusy("test")
+    monkeypatch.setattr(password_hasher, "hash", refuse)
+    monkeypatch.setattr(password_hasher, "verify", refuse)
+
+
+def test_login_returns_503_when_busy(client, users, busy):
+    response = client.post("/auth/login", json={"email": "m1@example.com", "password": "pw"})
+    assert response.status_code == 503
+
+
+def test_register_returns_503_when_busy(client, busy):
+    response = client.post("/auth/register", json={
+        "firstname": "New", "lastname": "Member", "email": "new@example.com",
+        "phoneno": "0799999999", "password": "secret",
+    })
+    assert response.status_code == 503
+
+
+def test_reset_password_returns_503_when_busy(app, client, users, busy):
+    with app.app_context():
+        token = create_access_token(identity=str(users["members"][0]), additional_claims={"purpose": "password_reset"})
+    response = client.post("/auth/reset-password", json={"token": token, "new_password": "new"})
+    assert response.status_code == 503
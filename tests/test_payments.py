@@ -0,0 +1,64 @@
+# tests/test_payments.py
+import pytest
+
+from tests.conftest import login
+
+BAD_NUMBERS = "memberId, min_amount and max_amount must be numbers"
+
+
+@pytest.fixture
+def admin(client, users):
+    admin = login(client, "admin@example.com")
+    member_id, other_id = users["members"]
+    rows = [
+        {"memberId": member_id if n % 2 else other_id, "payname": "contribution", "amount": f"{n}0",
+         "method": "mpesa" if n % 3 else "cash", "receipt": f"R{n}"}
+        for n in range(1, 8)
+    ]
+    assert client.post("/payments/bulk", headers=admin, json={"payments": rows}).status_code == 201
+    return admin
+
+
+def _pages(client, headers, query):
+    receipts, cursor, pages = [], "", 0
+    while True:
+        body = client.get(f"/payments/all?{query}&cursor={cursor}", headers=headers).get_json()
+        receipts += [p["receipt"] for p in body["payments"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return receipts, pages
+
+
+def test_next_cursor_walks_every_payment_once(client, admin):
+    everything = [p["receipt"] for p in client.get("/payments/all", headers=admin).get_json()["payments"]]
+    assert everything == [f"R{n}" for n in range(7, 0, -1)]
+    assert "next_cursor" not in client.get("/payments/all", headers=admin).get_json()
+
+    assert _pages(client, admin, "limit=3") == (everything, 3)
+    assert _pages(client, admin, "limit=7") == (everything, 1)
+    assert _pages(client, admin, "limit=500") == (everything, 1)
+
+
+def test_filters_apply_across_pages(client, admin, users):
+    member_id = users["members"][0]
+    assert _pages(client, admin, f"limit=2&memberId={member_id}") == (["R7", "R5", "R3", "R1"], 2)
+    assert _pages(client, admin, "limit=1&method=cash") == (["R6", "R3"], 2)
+    assert _pages(client, admin, "limit=2&min_amount=20&max_amount=50.5") == (["R5", "R4", "R3", "R2"], 2)
+
+
+@pytest.mark.parametrize("query", [
+    "min_amount=nan", "min_amount=NaN", "max_amount=inf", "max_amount=-Infinity", "min_amount=sNaN",
+    "min_amount=abc", "memberId=x", "memberId=1.5",
+])
+def test_non_numeric_filters_are_rejected(client, admin, query):
+    response = client.get(f"/payments/all?{query}", headers=admin)
+    assert response.status_code == 400
+    assert response.get_json() == {"msg": BAD_NUMBERS}
+
+
+@pytest.mark.parametrize("query", ["cursor=abc", "limit=0", "limit=-5", "limit=x"])
+def test_bad_pagination_values_are_rejected(client, admin, query):
+    response = client.get(f"/payments/all?{query}", headers=admin)
+    assert response.status_code == 400
+    assert response.get_json() == {"msg": "Invalid pagination values"}
@@ -0,0 +1,99 @@
+# tests/test_query_budgets.py
+"""
+Drive every resource method that declares a query_budget once, under the
+testing profile where QUERY_BUDGET_MODE defaults to "raise": a handler
+that outgrows its budget fails here instead of drifting silently.
+"""
+from flask_jwt_extended import create_access_token
+
+from server.query_budget import budget_for
+from tests.conftest import login
+
+
+def _token(app, member_id, purpose):
+    with app.app_context():
+        return create_access_token(identity=str(member_id), additional_claims={"purpose": purpose})
+
+
+def _budgeted_methods(app):
+    pairs = set()
+    for view in app.view_functions.values():
+        view_class = getattr(view, "view_class", None)
+        for method in getattr(view_class, "methods", None) or ():
+            if budget_for(view_class, method) is not None:
+                pairs.add((view_class.__name__, method))
+    return pairs
+
+
+def test_every_budgeted_resource_stays_within_budget(app, client, users):
+    admin = login(client, "admin@example.com")
+    member = login(client, "m1@example.com")
+    member_id, other_id = users["members"]
+    new_member = {"firstname": "New", "lastname": "Member", "email": "new@example.com",
+                  "phoneno": "0799999999", "password": "pw"}
+    payment = {"payname": "contribution", "amount": "100.00", "method": "mpesa"}
+    exercised = set()
+
+    def call(method, path, headers=None, expect=200, **kwargs):
+        response = client.open(path, method=method, headers=headers, **kwargs)
+        assert response.status_code == expect, (method, path, response.get_json())
+        endpoint, _ = app.url_map.bind("localhost").match(path.split("?")[0], method=method)
+        exercised.add((app.view_functions[endpoint].view_class.__name__, method))
+        return response
+
+    # auth
+    call("POST", "/auth/register", json=new_member, expect=201)
+    new_id = users["members"][-1] + 1
+    call("GET", f"/auth/verify-email/{_token(app, new_id, 'email_verification')}")
+    call("POST", "/auth/login", json={"email": "m2@example.com", "password": "pw"})
+    call("POST", "/auth/request-password-reset", json={"email": "m2@example.com"})
+    call("POST", "/auth/reset-password", json={"token": _token(app, new_id, "password_reset"), "new_password": "pw2"})
+
+    # users
+    call("GET", "/users", admin)
+    call("GET", "/users/search?q=m", admin)
+    call("GET", f"/users/{member_id}", admin)
+    call("GET", "/admin/users", admin)
+    call("GET", "/member/profile", member)
+    call("GET", "/member/summary", member)
+    call("GET", "/me", member)
+
+    # loans
+    call("POST", "/loans/apply", member, json={"amount": 1000, "year": 1}, expect=201)
+    call("GET", "/loans/me", member)
+    call("GET", "/loans", admin)
+    call("PUT", f"/loans/{member_id}", admin, json={"amount": 2000, "year": 2})
+    call("GET", f"/loans/{member_id}/schedule", member)
+    call("GET", "/loans/projection", admin)
+
+    # payments
+    paid = call("POST", "/payments", member, json={**payment, "receipt": "R1"}, expect=201)
+    call("GET", "/payments/me", member)
+    call("GET", "/payments/all", admin)
+    call("POST", "/payments/bulk", admin, json={"payments": [{**payment, "memberId": other_id, "receipt": "R2"}]},
+         expect=201)
+    call("DELETE", f"/payments/{paid.get_json()['payment']['paymentId']}", admin)
+
+    # shares and dividends
+    call("POST", "/admin/shares", admin, json={"memberId": member_id, "shares": "10"}, expect=201)
+    call("GET", "/admin/shares", admin)
+    call("PUT", f"/admin/shares/{member_id}", admin, json={"shares": "20"})
+    call("GET", "/shares", member)
+    call("POST", "/admin/dividends/runs", admin, json={"pool": "100"}, expect=201)
+    call("GET", "/admin/dividends/runs", admin)
+    call("DELETE", f"/admin/shares/{member_id}", admin)
+
+    # operational endpoints (admin token; INTERNAL_API_TOKEN is unset)
+    call("GET", "/internal/pool", admin)
+    call("GET", "/metrics", admin)
+    call("GET", "/internal/slow-queries", admin)
+    call("DELETE", "/internal/slow-queries", admin)
+
+    # admin reports, then the destructive ones
+    call("GET", "/admin/ledger", admin)
+    call("GET", "/admin/export/payments", admin)
+    call("DELETE", f"/loans/{member_id}", admin)
+    call("PUT", f"/users/{other_id}/role", admin, json={"role": "admin"})
+    call("DELETE", f"/users/{new_id}/delete", admin)
+
+    assert _budgeted_methods(app) - exercised == set()
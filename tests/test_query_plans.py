@@ -0,0 +1,26 @@
+# tests/test_query_plans.py
+import pytest
+
+from server.query_plans import _SQLITE_FULL_SCAN, check_query_plans
+
+
+@pytest.mark.parametrize("line, table", [
+    ("SCAN payments", "payments"),
+    ("SCAN TABLE payments", "payments"),
+    ("SCAN TABLE payments AS p", "payments"),
+    ("SCAN payments USING INDEX ix_payments_memberId", None),
+    ("SCAN payments USING COVERING INDEX ix_payments_memberId", None),
+    ("SCAN TABLE payments USING INDEX ix_payments_memberId", None),
+    ("SEARCH payments USING INDEX ix_payments_memberId (memberId=?)", None),
+    ("SEARCH TABLE users USING INTEGER PRIMARY KEY (rowid=?)", None),
+])
+def test_sqlite_full_scan_pattern(line, table):
+    match = _SQLITE_FULL_SCAN.search(line)
+    assert (match.group(1) if match else None) == table
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        results = check_query_plans()
+    failures = {name: plan for name, (plan, scans) in results.items() if scans}
+    assert failures == {}
@@ -0,0 +1,29 @@
+# tests/test_rate_limit.py
+import logging
+
+from tests.conftest import make_app
+
+LIMITS = {"RATE_LIMIT_LOGIN_IP": "2/minute", "RATE_LIMIT_LOGIN_EMAIL": ""}
+
+
+def _login(client, forwarded_for):
+    return client.post("/auth/login", json={"email": "x@example.com", "password": "pw"},
+                       headers={"X-Forwarded-For": forwarded_for}).status_code
+
+
+def test_production_limits_each_client_behind_the_router(tmp_path):
+    client = make_app(tmp_path, env="production", **LIMITS).test_client()
+
+    assert [_login(client, "203.0.113.1") for _ in range(3)] == [401, 401, 429]
+    # a different client behind the same router has its own bucket
+    assert _login(client, "203.0.113.2") == 401
+
+
+def test_forwarded_header_without_proxy_count_is_reported(tmp_path, caplog):
+    app = make_app(tmp_path, RATE_LIMIT_PROXY_COUNT=0, **LIMITS)
+    client = app.test_client()
+
+    with caplog.at_level(logging.ERROR):
+        _login(client, "203.0.113.1")
+        _login(client, "203.0.113.2")
+    assert sum("RATE_LIMIT_PROXY_COUNT" in r.getMessage() for r in caplog.records) == 1
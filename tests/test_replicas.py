@@ -0,0 +1,78 @@
+# tests/test_replicas.py
+import pytest
+
+from server.extensions import db
+from server.models.Payments import Payments
+from server.replicas import STICKY_COOKIE, STICKY_HEADER
+from tests.conftest import add_user, login, make_app
+
+PAYMENT = {"payname": "contribution", "amount": "100.00", "method": "mpesa", "receipt": "R1"}
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path, SQLALCHEMY_BINDS={"replica": f"sqlite:///{tmp_path / 'replica.db'}"})
+    with app.app_context():
+        add_user("m1@example.com")
+        add_user("m2@example.com")
+    # the replica starts as a copy of the primary and then never catches up
+    result = app.test_cli_runner().invoke(args=["replica", "sync"])
+    assert result.exit_code == 0, result.output
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def _payments(app, bind):
+    with app.app_context():
+        return db.session.execute(db.select(Payments.receipt), bind_arguments={"bind": db.engines[bind]}).scalars().all()
+
+
+def test_reads_go_to_the_replica_and_writes_to_the_primary(app):
+    member = login(app.test_client(), "m1@example.com")
+    writer = app.test_client()
+    assert writer.post("/payments", headers=member, json=PAYMENT).status_code == 201
+
+    assert _payments(app, None) == ["R1"]
+    assert _payments(app, "replica") == []
+    # another client has no mark, so it reads the lagging replica
+    assert app.test_client().get("/payments/me", headers=member).get_json()["payments"] == []
+
+
+def test_a_member_reads_their_own_write_from_the_primary(app):
+    client = app.test_client()
+    member = login(client, "m1@example.com")
+    response = client.post("/payments", headers=member, json=PAYMENT)
+    assert response.status_code == 201
+    mark = response.headers[STICKY_HEADER]
+
+    # the cookie the test client kept, or the header echoed back, keeps them on the primary
+    assert [p["receipt"] for p in client.get("/payments/me", headers=member).get_json()["payments"]] == ["R1"]
+    other = app.test_client()
+    reply = other.get("/payments/me", headers={**member, STICKY_HEADER: mark})
+    assert [p["receipt"] for p in reply.get_json()["payments"]] == ["R1"]
+
+
+def test_marks_are_per_member_and_signed(app):
+    client = app.test_client()
+    member, other_member = login(client, "m1@example.com"), login(client, "m2@example.com")
+    mark = client.post("/payments", headers=member, json=PAYMENT).headers[STICKY_HEADER]
+    other_mark = client.post("/payments", headers=other_member, json={**PAYMENT, "receipt": "R2"}).headers[STICKY_HEADER]
+
+    fresh = app.test_client()
+    assert fresh.get("/payments/me", headers={**member, STICKY_HEADER: mark + "x"}).get_json()["payments"] == []
+    # someone else's mark is not theirs to use
+    assert fresh.get("/payments/me", headers={**member, STICKY_HEADER: other_mark}).get_json()["payments"] == []
+
+
+def test_requests_that_commit_nothing_are_not_marked(app):
+    client = app.test_client()
+    member = login(client, "m1@example.com")
+    response = client.post("/payments", headers=member, json={**PAYMENT, "amount": "-1"})
+    assert response.status_code == 400
+    assert STICKY_HEADER not in response.headers
+    assert client.get_cookie(STICKY_COOKIE) is None
+    # logging in is anonymous: nobody to mark
+    assert STICKY_HEADER not in client.post("/auth/login", json={"email": "m1@example.com", "password": "pw"}).headers
@@ -0,0 +1,76 @@
+# tests/test_revocation.py
+from datetime import timedelta
+
+import pytest
+
+from server.extensions import db
+from server.identity import UserIdentity, user_cache
+from server.models.TokenRevocation import TokenRevocation
+from server.revocation import _utcnow
+from tests.conftest import add_user, login, make_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path, USER_CACHE_TTL=60, REVOCATION_SYNC_SECONDS=0)
+    user_cache.clear()
+    yield app
+    user_cache.clear()
+
+
+def test_role_change_revokes_tokens(app, client, users):
+    admin = login(client, "admin@example.com")
+    member = login(client, "m1@example.com")
+    assert client.get("/me", headers=member).status_code == 200
+
+    assert client.put(f"/users/{users['members'][0]}/role", json={"role": "admin"}, headers=admin).status_code == 200
+
+    response = client.get("/me", headers=member)
+    assert response.status_code == 401
+    assert response.get_json()["msg"] == "Token has been revoked"
+    assert client.get("/me", headers=login(client, "m1@example.com")).status_code == 200
+
+
+def test_deleted_user_token_is_revoked(client, users):
+    admin = login(client, "admin@example.com")
+    member = login(client, "m2@example.com")
+
+    assert client.delete(f"/users/{users['members'][1]}/delete", headers=admin).status_code == 200
+    assert client.get("/me", headers=member).status_code == 401
+
+
+def test_stale_cached_identity_is_reloaded_for_newer_token(app, client, users):
+    with app.app_context():
+        second_admin = add_user("boss@example.com", role="admin")
+        stale = UserIdentity.from_model(second_admin)
+    admin = login(client, "admin@example.com")
+    old = login(client, "boss@example.com")
+    assert client.get("/users", headers=old).status_code == 200
+
+    assert client.put(f"/users/{stale.memberId}/role", json={"role": "member"}, headers=admin).status_code == 200
+    # another worker still holds the identity cached before the demotion
+    user_cache.set(stale.memberId, stale)
+
+    assert client.get("/users", headers=old).status_code == 401
+    assert client.get("/users", headers=login(client, "boss@example.com")).status_code == 403
+
+
+def test_sync_sees_revocation_committed_out_of_order(app, client, users):
+    member_one, member_two = users["members"]
+    token_one, token_two = login(client, "m1@example.com"), login(client, "m2@example.com")
+    assert client.get("/me", headers=token_one).status_code == 200
+
+    def insert(row_id, member_id, age):
+        created = _utcnow() - timedelta(seconds=age)
+        with app.app_context(), db.engine.begin() as conn:
+            conn.execute(TokenRevocation.__table__.insert().values(
+                id=row_id, memberId=member_id, min_version=1, reason="test",
+                created_at=created, expires_at=created + timedelta(hours=1),
+            ))
+
+    # a higher id commits and is synced first ...
+    insert(100, member_two, age=1)
+    assert client.get("/me", headers=token_two).status_code == 401
+    # ... then a transaction that started earlier, with a lower id, commits
+    insert(50, member_one, age=5)
+    assert client.get("/me", headers=token_one).status_code == 401
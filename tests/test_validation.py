@@ -0,0 +1,67 @@
+# tests/test_validation.py
+from decimal import Decimal
+
+import pytest
+
+from server.validation import MONEY_MAX, Field, Schema
+from tests.conftest import login
+
+schema = Schema(
+    amount=Field(Decimal, required=True, gt=0, message="Amount must be greater than zero"),
+    count=Field(int, default=1, min=1, max=10),
+    ratio=Field(float),
+    flag=Field(bool, default=False),
+)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("12.5", Decimal("12.50")),
+    (" 7 ", Decimal("7.00")),
+    (0.1, Decimal("0.10")),
+    (3, Decimal("3.00")),
+    ("1.005", Decimal("1.00")),  # banker's rounding, as Decimal.quantize does
+    (str(MONEY_MAX), MONEY_MAX),
+])
+def test_money_converts_exactly(raw, expected):
+    values, errors = schema.validate({"amount": raw})
+    assert errors == {}
+    assert values["amount"] == expected
+    assert values["amount"].as_tuple().exponent == -2
+
+
+@pytest.mark.parametrize("raw", ["1e30", "-1e30", "1e1000000", "NaN", "nan", "sNaN", "inf", "-Infinity",
+                                 "abc", "1,000", True, False, [1], {"v": 1}])
+def test_money_rejects_non_numbers(raw):
+    values, errors = schema.validate({"amount": raw})
+    assert errors == {"amount": "amount must be a number"}
+
+
+@pytest.mark.parametrize("raw", ["10000000", "10000000.00", 1e7, "-10000000", "1e25"])
+def test_money_is_bounded_by_the_column(raw):
+    values, errors = schema.validate({"amount": raw})
+    assert errors == {"amount": f"amount must be at most {MONEY_MAX}"}
+
+
+def test_bounds_and_required():
+    values, errors = schema.validate({"amount": "0", "count": 11, "ratio": "nan", "flag": "maybe"})
+    assert errors == {
+        "amount": "Amount must be greater than zero",
+        "count": "count must be <= 10",
+        "ratio": "ratio must be a number",
+        "flag": "flag must be true or false",
+    }
+    values, errors = schema.validate({"amount": ""})
+    assert errors == {"amount": "amount is required"}
+    values, errors = schema.validate({"amount": "1", "count": 2.0, "flag": "yes"})
+    assert errors == {}
+    assert values == {"amount": Decimal("1.00"), "count": 2, "ratio": None, "flag": True}
+    assert schema.validate(["amount"]) == (None, {"body": "Expected a JSON object"})
+
+
+@pytest.mark.parametrize("amount", ["1e30", "NaN", "10000000"])
+def test_out_of_range_payment_is_a_400(client, users, amount):
+    member = login(client, "m1@example.com")
+    response = client.post("/payments", headers=member,
+                           json={"payname": "contribution", "amount": amount, "method": "mpesa", "receipt": "R1"})
+    assert response.status_code == 400
+    assert response.get_json()["errors"].keys() == {"amount"}
@@ -0,0 +1,53 @@
+# tests/test_versioning.py
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.http import http_date
+
+from server import versioning
+from server.extensions import db
+from server.models.TableVersion import TableVersion
+from tests.conftest import login
+
+NOW = datetime(2026, 10, 18, 12, 0, 30, 500000)
+
+
+@pytest.fixture
+def admin(app, client, users, monkeypatch):
+    monkeypatch.setattr(versioning, "_utcnow", lambda: NOW)
+    return login(client, "admin@example.com")
+
+
+def _users_written_at(app, when):
+    with app.app_context():
+        db.session.query(TableVersion).filter_by(name="users").update({"updated_at": when})
+        db.session.commit()
+
+
+def test_if_none_match_decides_alone(app, client, admin):
+    _users_written_at(app, NOW - timedelta(minutes=1))
+    etag = client.get("/users", headers=admin).headers["ETag"]
+
+    assert client.get("/users", headers={**admin, "If-None-Match": etag}).status_code == 304
+    future = http_date(NOW + timedelta(days=1))
+    response = client.get("/users", headers={**admin, "If-None-Match": '"stale"', "If-Modified-Since": future})
+    assert response.status_code == 200
+
+
+def test_if_modified_since_waits_for_the_second_to_end(app, client, admin):
+    # a write earlier in the current second: a later one in the same second
+    # would carry the same HTTP date, so the date is neither sent nor trusted
+    _users_written_at(app, NOW - timedelta(microseconds=400000))
+    response = client.get("/users", headers=admin)
+    assert "Last-Modified" not in response.headers
+    assert client.get("/users", headers={**admin, "If-Modified-Since": http_date(NOW)}).status_code == 200
+
+
+def test_if_modified_since_once_settled(app, client, admin):
+    _users_written_at(app, NOW - timedelta(seconds=1))
+    last_modified = client.get("/users", headers=admin).headers["Last-Modified"]
+    assert last_modified == http_date(NOW - timedelta(seconds=1))
+    assert client.get("/users", headers={**admin, "If-Modified-Since": last_modified}).status_code == 304
+
+    _users_written_at(app, NOW - timedelta(microseconds=400000))
+    assert client.get("/users", headers={**admin, "If-Modified-Since": last_modified}).status_code == 200